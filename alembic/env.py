@@ -5,14 +5,14 @@ from sqlalchemy import engine_from_config, pool, create_engine
 from alembic import context
 
 from app.config.database import Base
+from app.config.settings import settings
 from app.models.post import Post
 from app.models.artifact import Artifact
+from app.models.counter import Counter
+from app.models.job import Job
+from app.models.feed_entry import FeedEntry
 
-import os
-from dotenv import load_dotenv
-load_dotenv()
-
-DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_URL = settings.database_url
 
 
 # this is the Alembic Config object, which provides
@@ -30,6 +30,13 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# Created by migrations and DDL hooks but not mapped (see app/models/post.py),
+# so autogenerate must not try to drop them
+UNMAPPED_SCHEMA_OBJECTS = {("column", "search_vector"), ("index", "ix_posts_search_vector")}
+
+def include_object(object, name, type_, reflected, compare_to):
+    return (type_, name) not in UNMAPPED_SCHEMA_OBJECTS
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -52,6 +59,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -77,7 +85,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,36 @@
+"""add counters table for cached row counts
+
+Revision ID: 4f2a9c1e7b35
+Revises: baf4a9bd9845
+Create Date: 2026-10-18 09:12:40.511243
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2a9c1e7b35'
+down_revision: Union[str, Sequence[str], None] = 'baf4a9bd9845'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 1. Create the table
+    op.create_table('counters',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+    # 2. Seed the posts counter from the current row count
+    op.execute("INSERT INTO counters (name, value) SELECT 'posts', count(*) FROM posts")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('counters')
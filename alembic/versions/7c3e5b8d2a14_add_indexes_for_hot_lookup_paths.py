@@ -0,0 +1,42 @@
+"""add indexes for hot lookup paths
+
+Revision ID: 7c3e5b8d2a14
+Revises: 4f2a9c1e7b35
+Create Date: 2026-10-18 11:03:27.194802
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e5b8d2a14'
+down_revision: Union[str, Sequence[str], None] = '4f2a9c1e7b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and it does not
+    # block writes to the tables while the indexes are built
+    with op.get_context().autocommit_block():
+        # 1. Artifact loading filters on post_id (selectinload: WHERE post_id IN (...))
+        op.create_index('ix_artifacts_post_id', 'artifacts', ['post_id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+        # 2. Time-ordered feeds: ORDER BY created_at DESC, id DESC
+        op.create_index('ix_posts_created_at_id', 'posts', [sa.text('created_at DESC'), sa.text('id DESC')], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+
+    # posts.public_id and artifacts.public_id are already indexed by their
+    # unique constraints, and the id columns by their primary keys
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_posts_created_at_id', table_name='posts', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_artifacts_post_id', table_name='artifacts', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,40 @@
+"""add posts full text search
+
+Revision ID: 9d4e2f6a1b73
+Revises: 7c3e5b8d2a14
+Create Date: 2026-10-18 14:22:51.603917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4e2f6a1b73'
+down_revision: Union[str, Sequence[str], None] = '7c3e5b8d2a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Adding a stored generated column rewrites the table under an exclusive
+    # lock, so on a large table run this in a maintenance window
+    op.execute(
+        "ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(content, '')), 'B')"
+        ") STORED"
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_posts_search_vector', 'posts', ['search_vector'], unique=False, postgresql_using='gin',
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_posts_search_vector', table_name='posts', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('posts', 'search_vector')
@@ -0,0 +1,48 @@
+"""add jobs table and artifact processing status
+
+Revision ID: b5e81c3f9a27
+Revises: 9d4e2f6a1b73
+Create Date: 2026-10-18 16:05:12.384519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e81c3f9a27'
+down_revision: Union[str, Sequence[str], None] = '9d4e2f6a1b73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('run_at', sa.DateTime(), nullable=False),
+        sa.Column('locked_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_status_run_at', 'jobs', ['status', 'run_at'], unique=False)
+
+    # Existing artifacts were never queued, so they start out done. With a
+    # constant default Postgres adds the column without rewriting the table.
+    op.add_column('artifacts', sa.Column('processing_status', sa.String(), server_default='done', nullable=False))
+    op.add_column('artifacts', sa.Column('media_metadata', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('artifacts', 'media_metadata')
+    op.drop_column('artifacts', 'processing_status')
+    op.drop_index('ix_jobs_status_run_at', table_name='jobs')
+    op.drop_table('jobs')
@@ -0,0 +1,41 @@
+"""add feed_entries table
+
+Revision ID: e2a7d41c8f56
+Revises: b5e81c3f9a27
+Create Date: 2026-10-18 17:41:27.905163
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7d41c8f56'
+down_revision: Union[str, Sequence[str], None] = 'b5e81c3f9a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled by `python seed.py rebuild-feed`, not here, so the migration
+    # stays fast on large databases
+    op.create_table('feed_entries',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('public_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('content', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('artifacts', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['id'], ['posts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('feed_entries')
@@ -1,16 +1,34 @@
+import app.startup as Startup  # first, so the startup report covers every import
+import asyncio
 import uuid
-from fastapi import FastAPI, HTTPException, Depends
+from typing import Literal
+from fastapi import FastAPI, HTTPException, Depends, File, Form, Query, Request, Response, UploadFile
+from fastapi.responses import PlainTextResponse
+from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
 
 from sqlalchemy.orm import Session
-from app.config.database import engine, Base, get_db
+from app.config.database import async_engine, pool_metrics, pooled_engines, get_db, stick_to_primary, DB_ASYNC
+import app.config.schema as Schema
 
-from app.schemas import PostResponse
-from app.schemas import PostCreate
+from app.schemas import PostResponse, FeedPageResponse, FeedCursorResponse
+from app.schemas import PostCreate, SignedUrlsRequest, SignedUrlsResponse
 
 import app.services.posts as Posts
-import app.services.artifacts as Artifacts
+import app.services.post_counts as PostCounts
 import app.services.artifact_processing as ArtifactProcessing
+import app.services.response_cache as ResponseCache
+import app.services.bulk_import as BulkImport
+import app.services.feed as Feed
+import app.services.search as Search
+import app.services.storage as Storage
+import app.serialization as Serialization
+import app.http_cache as HttpCache
+import app.compression as Compression
+import app.streaming as Streaming
+import app.profiling as Profiling
+import app.async_endpoints as AsyncEndpoints
+import app.media_endpoints as MediaEndpoints
 
 from app.models import Post as PostModel
 from app.models import Artifact as ArtifactModel 
@@ -19,28 +37,109 @@ from app.models import Artifact as ArtifactModel
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    Base.metadata.create_all(bind=engine)
+    with Startup.phase("schema"):
+        schema = Schema.prepare_schema()
+    # Fails here rather than on the first upload if the provider is misconfigured
+    Storage.get_provider()
+    Startup.report(schema=schema, storage=Storage.STORAGE_PROVIDER, loop=type(asyncio.get_running_loop()).__module__.split(".")[0])
     yield
+    # Shutdown
+    await Storage.close_provider()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 app = FastAPI(lifespan=lifespan)
+app.router.route_class = Profiling.route_class
+
+if Profiling.PROFILING:
+    app.middleware("http")(Profiling.profile_request)
+
+if Compression.COMPRESSION:
+    app.add_middleware(Compression.CompressionMiddleware)
+
+if DB_ASYNC:
+    # Registered before the sync handlers below, so these take precedence
+    app.include_router(AsyncEndpoints.router)
+
+if Storage.STORAGE_PROVIDER == "local":
+    app.include_router(MediaEndpoints.router)
+
+def json_body_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
 
 @app.get("/")
 def root():
     return {"message": "Welcome to my Application"}
 
-@app.get("/posts")
-def get_posts(page: int=None, page_size: int=5, db: Session = Depends(get_db)):
-    total_no_posts = Posts.get_posts_count(db)
-    
+@app.get("/posts", response_model=FeedPageResponse | FeedCursorResponse)
+def get_posts(request: Request, page: int=None, page_size: int = Query(5, ge=1, le=Posts.MAX_PAGE_SIZE), cursor: str=None, pagination: Literal["offset", "cursor"]="offset", include_content: bool=True, stream: Literal["ndjson", "json"]=None, db: Session = Depends(ResponseCache.get_read_db)):
+    # Streamed cursor pages, written out in batches and never cached
+    if stream is not None:
+        try:
+            if Feed.FEED_ENTRIES:
+                first_id, last_id, next_cursor = Feed.get_entries_page_range(db, cursor, page_size)
+            else:
+                first_id, last_id, next_cursor = Posts.get_cursor_page_range(db, cursor, page_size)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        batches = Streaming.stream_posts(db.get_bind(), first_id, last_id, include_content)
+        return Streaming.response(Streaming.iter_body(batches, stream, next_cursor, page_size), stream, next_cursor)
+
+    # Keyset mode: no COUNT(*) and no OFFSET, the client just follows next_cursor
+    if cursor is not None or pagination == "cursor":
+        cache_key = ResponseCache.feed_key(request, cursor=cursor, page_size=page_size, include_content=include_content)
+        validators = HttpCache.cached_validators(cache_key)
+        if HttpCache.needs_validators(validators):
+            fill_key = ResponseCache.fill_key(db, cache_key)
+            try:
+                versions = Posts.get_cursor_page_versions(db, cursor, page_size)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            validators = HttpCache.store_validators(fill_key, versions, cursor, page_size, include_content, feed=True)
+        if validators is not None and HttpCache.is_not_modified(request, validators):
+            return HttpCache.not_modified(validators)
+
+        body = ResponseCache.get(cache_key)
+        if body is not None:
+            return HttpCache.add_headers(json_body_response(body), validators)
+
+        fill_key = ResponseCache.fill_key(db, cache_key)
+        try:
+            if Feed.FEED_ENTRIES:
+                posts, next_cursor = Feed.get_entries_after_cursor(db, cursor, page_size, include_content)
+            else:
+                all_posts, next_cursor = Posts.get_latest_posts_after_cursor(db, cursor, page_size, include_content)
+                for post in all_posts:
+                    Posts.load_artifacts(post)
+                posts = Serialization.posts_to_dicts(all_posts, include_content)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        body = ResponseCache.store(fill_key, {"posts": posts, "next_cursor": next_cursor, "page_size": page_size})
+        return HttpCache.add_headers(json_body_response(body), validators)
+
     if page is None:
         page = 1
+
+    cache_key = ResponseCache.feed_key(request, page=page, page_size=page_size, include_content=include_content)
+    validators = HttpCache.cached_validators(cache_key)
+    if validators is not None and HttpCache.is_not_modified(request, validators):
+        return HttpCache.not_modified(validators)
+    body = ResponseCache.get(cache_key)
+    if body is not None and not HttpCache.needs_validators(validators):
+        return HttpCache.add_headers(json_body_response(body), validators)
+
+    fill_key = ResponseCache.fill_key(db, cache_key)
+    total_no_posts, count_is_exact = PostCounts.get_posts_count(db)
         
     total_pages = (total_no_posts + page_size - 1) // page_size
     
-    if page < 1 or page > total_pages:
+    # An estimated total can be off in either direction, so only an exact one
+    # is trusted to reject pages past the end
+    if page < 1 or (count_is_exact and page > max(total_pages, 1)):
         # A 400 Bad Request might be better than 404 for an invalid page number
         # but matching your original logic:
-        return HTTPException(status_code=404, detail="Page not found")
+        raise HTTPException(status_code=404, detail="Page not found")
         
     # 3. Determine the slice for the *most recent* posts
     # The start/end calculated here represent the *position* in the sorted list (latest first)
@@ -49,47 +148,188 @@ def get_posts(page: int=None, page_size: int=5, db: Session = Depends(get_db)):
     
     # We will fetch posts starting from the post at 'offset' position, up to 'limit' posts.
     
+    # Revalidation only needs the page's versions, not its artifacts
+    if HttpCache.needs_validators(validators):
+        versions = Posts.get_page_versions(db, offset, limit)
+        validators = HttpCache.store_validators(fill_key, versions, page, page_size, include_content, total_no_posts, count_is_exact, feed=True)
+        if HttpCache.is_not_modified(request, validators):
+            return HttpCache.not_modified(validators)
+    if body is not None:
+        return HttpCache.add_headers(json_body_response(body), validators)
+
     # 4. Fetch the posts with ORDER BY ID DESC
-    all_posts = Posts.get_latest_posts_with_pagination(db, offset, limit)
+    if Feed.FEED_ENTRIES:
+        posts = Feed.get_entries_with_pagination(db, offset, limit, include_content)
+    else:
+        all_posts = Posts.get_latest_posts_with_pagination(db, offset, limit, include_content)
+        
+        # Optional: If the post object needs extra data loaded (like its original load_artifacts call)
+        for post in all_posts:
+            Posts.load_artifacts(post)    
+        posts = Serialization.posts_to_dicts(all_posts, include_content)
     
-    # Optional: If the post object needs extra data loaded (like its original load_artifacts call)
+    body = ResponseCache.store(fill_key, {
+        "no_of_posts": total_no_posts,
+        "count_type": "exact" if count_is_exact else "estimated",
+        "posts": posts,
+        "current_page": page,
+        "total_pages": total_pages,
+    })
+    return HttpCache.add_headers(json_body_response(body), validators)
+
+@app.get("/posts/search", response_model=FeedCursorResponse)
+def search_posts(request: Request, q: str, cursor: str=None, page_size: int = Query(5, ge=1, le=Posts.MAX_PAGE_SIZE), include_content: bool=True, db: Session = Depends(ResponseCache.get_read_db)):
+    """
+    Full-text search over post titles and contents, best matches first. Only
+    the newest SEARCH_MAX_CANDIDATES (1000 by default) matching posts are
+    ranked, so an older post can be missing from the results of a common term.
+    """
+    # Registered before /posts/{public_id} so "search" is not taken for an id
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Empty search query")
+
+    cache_key = ResponseCache.feed_key(request, search=q, cursor=cursor, page_size=page_size, include_content=include_content)
+    body = ResponseCache.get(cache_key)
+    if body is not None:
+        return json_body_response(body)
+
+    fill_key = ResponseCache.fill_key(db, cache_key)
+    try:
+        all_posts, next_cursor = Search.search_posts(db, q, cursor, page_size, include_content)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
     for post in all_posts:
-        Posts.load_artifacts(post)    
-    
-    return {"no_of_posts": total_no_posts, "posts": all_posts, "current_page": page, "total_pages": total_pages}
+        Posts.load_artifacts(post)
+
+    body = ResponseCache.store(fill_key, {"posts": Serialization.posts_to_dicts(all_posts, include_content), "next_cursor": next_cursor, "page_size": page_size})
+    return json_body_response(body)
 
 @app.get("/posts/{public_id}")
-def get_post(public_id: uuid.UUID, db: Session = Depends(get_db)) -> PostResponse:
+def get_post(public_id: uuid.UUID, request: Request, db: Session = Depends(ResponseCache.get_read_db)) -> PostResponse:
+    cache_key = ResponseCache.post_key(request, public_id)
+    validators = HttpCache.cached_validators(cache_key)
+    if HttpCache.needs_validators(validators):
+        fill_key = ResponseCache.fill_key(db, cache_key)
+        version = Posts.get_post_version(db, public_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+        validators = HttpCache.store_validators(fill_key, [version])
+    if validators is not None and HttpCache.is_not_modified(request, validators):
+        return HttpCache.not_modified(validators)
+
+    body = ResponseCache.get(cache_key)
+    if body is not None:
+        return HttpCache.add_headers(json_body_response(body), validators)
+
+    fill_key = ResponseCache.fill_key(db, cache_key)
     post = Posts.get_post_by_id(db, public_id)
     
     if post == None:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    return post
+    Posts.load_artifacts(post)
+    body = ResponseCache.store(fill_key, Serialization.post_to_dict(post))
+    return HttpCache.add_headers(json_body_response(body), validators)
 
-@app.post("/posts")
+@app.post("/posts", response_model=PostResponse)
 def create_post(payload: PostCreate, db: Session = Depends(get_db)):        
-    post = Posts.create_post(db, payload.title, payload.content)
-
-    # If artifacts exist, insert them
-    if payload.artifacts:
-        Artifacts.create_artifacts(db, post.id, payload.artifacts)
-        
-    post = Posts.get_post_by_id(db, post.public_id)
-    
-    if post == None:
-        raise HTTPException(status_code=500, detail="Post creation failed")
+    # The post, its artifacts and the posts counter are written in one transaction
+    post = Posts.create_post(db, payload.title, payload.content, payload.artifacts)
         
-    return post
+    response = json_body_response(Serialization.dumps(Serialization.post_to_dict(post)))
+    stick_to_primary(response)
+    return response
+
+@app.post("/posts/bulk")
+async def bulk_create_posts(request: Request, chunk_size: int = None, db: Session = Depends(get_db)):
+    """
+    Creates posts from an NDJSON body (one PostCreate object per line). The body
+    is read as it arrives and written in chunks of `chunk_size` posts, each in
+    its own transaction, so only one chunk is held in memory at a time.
+    """
+    results = []
+    try:
+        lines = BulkImport.aiter_lines(request.stream())
+        async for chunk_no, chunk in BulkImport.aiter_chunks(lines, chunk_size):
+            results.append(await run_in_threadpool(BulkImport.import_chunk, db, chunk_no, chunk))
+    except ValueError as e:
+        # Chunks before the oversized line are already committed
+        raise HTTPException(status_code=413, detail={"error": str(e), **BulkImport.summarize(results)})
+
+    response = json_body_response(Serialization.dumps(BulkImport.summarize(results)))
+    stick_to_primary(response)
+    return response
+
+@app.post("/posts/upload", response_model=PostResponse)
+async def upload_post(title: str = Form(), content: str = Form(""), files: list[UploadFile] = File(default=[]), db: Session = Depends(get_db)):
+    """
+    Creates a post from a multipart form in one call: the files are uploaded
+    to storage concurrently, then the post is created with their artifacts.
+    Large files are spooled to disk while the form is received and streamed
+    to storage from there.
+    """
+    try:
+        artifacts = await Storage.upload_files(files)
+    except Storage.UploadError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+    try:
+        post = await run_in_threadpool(Posts.create_post, db, title, content, artifacts)
+    except Exception:
+        # Don't leave files behind that no post refers to
+        await Storage.delete_files(artifacts)
+        raise
+
+    response = json_body_response(Serialization.dumps(Serialization.post_to_dict(post)))
+    stick_to_primary(response)
+    return response
 
 @app.get("/upload_auth_params")
 def get_auth_params():
     return ArtifactProcessing.generate_auth_params()
 
+@app.get("/upload_auth_params/batch")
+def get_auth_params_batch(count: int = 1):
+    if not 1 <= count <= ArtifactProcessing.SIGNING_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"count must be between 1 and {ArtifactProcessing.SIGNING_BATCH_MAX}")
+    return ArtifactProcessing.generate_auth_params_batch(count)
+
 @app.get("/signed_url")
 def get_signed_url(file_path: str):
     return ArtifactProcessing.generate_signed_url(file_path)
-    
-    
-    
-    
\ No newline at end of file
+
+@app.post("/signed_urls", response_model=SignedUrlsResponse)
+def get_signed_urls(payload: SignedUrlsRequest):
+    if len(payload.file_paths) > ArtifactProcessing.SIGNING_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {ArtifactProcessing.SIGNING_BATCH_MAX} file paths per request")
+    return {"signed_urls": ArtifactProcessing.generate_signed_urls(payload.file_paths)}
+
+@app.get("/internal/cache", include_in_schema=False)
+def get_cache_stats():
+    return {"signed_urls": ArtifactProcessing.signed_url_cache.stats(), "responses": ResponseCache.stats()}
+
+@app.get("/internal/pool", include_in_schema=False)
+def get_pool_stats():
+    return {name: pool_metrics[name].snapshot(pooled.pool) for name, pooled in pooled_engines.items()}
+
+@app.get("/internal/startup", include_in_schema=False)
+def get_startup_report():
+    return Startup.summary
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus text format: request metrics (with PROFILING), pools and caches."""
+    pools = {name: pool_metrics[name].snapshot(pooled.pool) for name, pooled in pooled_engines.items()}
+    caches = {"signed_urls": ArtifactProcessing.signed_url_cache.stats(), "responses": ResponseCache.stats()}
+    families = Profiling.request_metrics.families() + [
+        ("app_db_pool_in_use", "gauge", "Connections checked out.", [("", {"engine": name}, pool["in_use"]) for name, pool in pools.items()]),
+        ("app_db_pool_checkouts_total", "counter", "Connection checkouts.", [("", {"engine": name}, pool["checkouts"]) for name, pool in pools.items()]),
+        ("app_db_pool_timeouts_total", "counter", "Checkouts that timed out.", [("", {"engine": name}, pool["timeouts"]) for name, pool in pools.items()]),
+        ("app_cache_hits_total", "counter", "Cache hits.", [("", {"cache": name}, cache["hits"]) for name, cache in caches.items()]),
+        ("app_cache_misses_total", "counter", "Cache misses.", [("", {"cache": name}, cache["misses"]) for name, cache in caches.items()]),
+        ("app_startup_seconds", "gauge", "Time this worker spent starting up, per phase.", [("", {"phase": name}, seconds) for name, seconds in Startup.phases.items()]),
+    ]
+    return PlainTextResponse(Profiling.render_metrics(families), media_type="text/plain; version=0.0.4")
+
+Startup.mark_imported()
@@ -0,0 +1,176 @@
+import uuid
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config.database import get_async_db, stick_to_primary
+
+from app.schemas import PostResponse, FeedPageResponse, FeedCursorResponse
+from app.schemas import PostCreate
+
+import app.services.async_posts as AsyncPosts
+import app.services.posts as Posts
+import app.services.feed as Feed
+import app.services.response_cache as ResponseCache
+import app.serialization as Serialization
+import app.http_cache as HttpCache
+import app.streaming as Streaming
+import app.profiling as Profiling
+
+# Async versions of the post endpoints in app.py, used when DB_ASYNC is enabled.
+# They keep the same paths, parameters and response shapes.
+router = APIRouter(route_class=Profiling.route_class)
+
+def json_body_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+@router.get("/posts", response_model=FeedPageResponse | FeedCursorResponse)
+async def get_posts(request: Request, page: int=None, page_size: int = Query(5, ge=1, le=Posts.MAX_PAGE_SIZE), cursor: str=None, pagination: Literal["offset", "cursor"]="offset", include_content: bool=True, stream: Literal["ndjson", "json"]=None, db: AsyncSession = Depends(ResponseCache.get_async_read_db)):
+    if stream is not None:
+        try:
+            first_id, last_id, next_cursor = await AsyncPosts.get_cursor_page_range(db, cursor, page_size)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        batches = Streaming.astream_posts(db.bind, first_id, last_id, include_content)
+        return Streaming.response(Streaming.aiter_body(batches, stream, next_cursor, page_size), stream, next_cursor)
+
+    if cursor is not None or pagination == "cursor":
+        cache_key = await ResponseCache.afeed_key(request, cursor=cursor, page_size=page_size, include_content=include_content)
+        validators = await HttpCache.acached_validators(cache_key)
+        if HttpCache.needs_validators(validators):
+            fill_key = await ResponseCache.afill_key(db, cache_key)
+            try:
+                versions = await AsyncPosts.get_cursor_page_versions(db, cursor, page_size)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            validators = await HttpCache.astore_validators(fill_key, versions, cursor, page_size, include_content, feed=True)
+        if validators is not None and HttpCache.is_not_modified(request, validators):
+            return HttpCache.not_modified(validators)
+
+        body = await ResponseCache.aget(cache_key)
+        if body is not None:
+            return HttpCache.add_headers(json_body_response(body), validators)
+
+        fill_key = await ResponseCache.afill_key(db, cache_key)
+        try:
+            if Feed.FEED_ENTRIES:
+                posts, next_cursor = await db.run_sync(Feed.get_entries_after_cursor, cursor, page_size, include_content)
+            else:
+                all_posts, next_cursor = await AsyncPosts.get_latest_posts_after_cursor(db, cursor, page_size, include_content)
+                for post in all_posts:
+                    AsyncPosts.load_artifacts(post)
+                posts = Serialization.posts_to_dicts(all_posts, include_content)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        body = await ResponseCache.astore(fill_key, {"posts": posts, "next_cursor": next_cursor, "page_size": page_size})
+        return HttpCache.add_headers(json_body_response(body), validators)
+
+    if page is None:
+        page = 1
+
+    cache_key = await ResponseCache.afeed_key(request, page=page, page_size=page_size, include_content=include_content)
+    validators = await HttpCache.acached_validators(cache_key)
+    if validators is not None and HttpCache.is_not_modified(request, validators):
+        return HttpCache.not_modified(validators)
+    body = await ResponseCache.aget(cache_key)
+    if body is not None and not HttpCache.needs_validators(validators):
+        return HttpCache.add_headers(json_body_response(body), validators)
+
+    fill_key = await ResponseCache.afill_key(db, cache_key)
+    total_no_posts, count_is_exact = await AsyncPosts.get_posts_count(db)
+
+    total_pages = (total_no_posts + page_size - 1) // page_size
+
+    if page < 1 or (count_is_exact and page > max(total_pages, 1)):
+        raise HTTPException(status_code=404, detail="Page not found")
+
+    offset = (page - 1) * page_size
+    if HttpCache.needs_validators(validators):
+        versions = await AsyncPosts.get_page_versions(db, offset, page_size)
+        validators = await HttpCache.astore_validators(fill_key, versions, page, page_size, include_content, total_no_posts, count_is_exact, feed=True)
+        if HttpCache.is_not_modified(request, validators):
+            return HttpCache.not_modified(validators)
+    if body is not None:
+        return HttpCache.add_headers(json_body_response(body), validators)
+
+    if Feed.FEED_ENTRIES:
+        posts = await db.run_sync(Feed.get_entries_with_pagination, offset, page_size, include_content)
+    else:
+        all_posts = await AsyncPosts.get_latest_posts_with_pagination(db, offset, page_size, include_content)
+        for post in all_posts:
+            AsyncPosts.load_artifacts(post)
+        posts = Serialization.posts_to_dicts(all_posts, include_content)
+
+    body = await ResponseCache.astore(fill_key, {
+        "no_of_posts": total_no_posts,
+        "count_type": "exact" if count_is_exact else "estimated",
+        "posts": posts,
+        "current_page": page,
+        "total_pages": total_pages,
+    })
+    return HttpCache.add_headers(json_body_response(body), validators)
+
+@router.get("/posts/search", response_model=FeedCursorResponse)
+async def search_posts(request: Request, q: str, cursor: str=None, page_size: int = Query(5, ge=1, le=Posts.MAX_PAGE_SIZE), include_content: bool=True, db: AsyncSession = Depends(ResponseCache.get_async_read_db)):
+    """
+    Full-text search over post titles and contents, best matches first. Only
+    the newest SEARCH_MAX_CANDIDATES (1000 by default) matching posts are
+    ranked, so an older post can be missing from the results of a common term.
+    """
+    # Registered before /posts/{public_id} so "search" is not taken for an id
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Empty search query")
+
+    cache_key = await ResponseCache.afeed_key(request, search=q, cursor=cursor, page_size=page_size, include_content=include_content)
+    body = await ResponseCache.aget(cache_key)
+    if body is not None:
+        return json_body_response(body)
+
+    fill_key = await ResponseCache.afill_key(db, cache_key)
+    try:
+        all_posts, next_cursor = await AsyncPosts.search_posts(db, q, cursor, page_size, include_content)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    for post in all_posts:
+        AsyncPosts.load_artifacts(post)
+
+    body = await ResponseCache.astore(fill_key, {"posts": Serialization.posts_to_dicts(all_posts, include_content), "next_cursor": next_cursor, "page_size": page_size})
+    return json_body_response(body)
+
+@router.get("/posts/{public_id}")
+async def get_post(public_id: uuid.UUID, request: Request, db: AsyncSession = Depends(ResponseCache.get_async_read_db)) -> PostResponse:
+    cache_key = await ResponseCache.apost_key(request, public_id)
+    validators = await HttpCache.acached_validators(cache_key)
+    if HttpCache.needs_validators(validators):
+        fill_key = await ResponseCache.afill_key(db, cache_key)
+        version = await AsyncPosts.get_post_version(db, public_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Post not found")
+        validators = await HttpCache.astore_validators(fill_key, [version])
+    if validators is not None and HttpCache.is_not_modified(request, validators):
+        return HttpCache.not_modified(validators)
+
+    body = await ResponseCache.aget(cache_key)
+    if body is not None:
+        return HttpCache.add_headers(json_body_response(body), validators)
+
+    fill_key = await ResponseCache.afill_key(db, cache_key)
+    post = await AsyncPosts.get_post_by_id(db, public_id)
+
+    if post == None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    AsyncPosts.load_artifacts(post)
+    body = await ResponseCache.astore(fill_key, Serialization.post_to_dict(post))
+    return HttpCache.add_headers(json_body_response(body), validators)
+
+@router.post("/posts", response_model=PostResponse)
+async def create_post(payload: PostCreate, db: AsyncSession = Depends(get_async_db)):
+    # The post, its artifacts and the posts counter are written in one transaction
+    post = await AsyncPosts.create_post(db, payload.title, payload.content, payload.artifacts)
+
+    response = json_body_response(Serialization.dumps(Serialization.post_to_dict(post)))
+    stick_to_primary(response)
+    return response
@@ -0,0 +1,164 @@
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.settings import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional (the `compression` extra)
+    brotli = None
+
+# Response compression. Clients get brotli if they accept it and the brotli
+# package is installed, gzip otherwise. Bodies smaller than
+# COMPRESSION_MIN_SIZE bytes are sent as they are; streamed bodies are
+# compressed chunk by chunk, and every chunk is flushed so it reaches the
+# client as it is written. The middleware only relies on the ASGI messages,
+# not on Starlette's GZipMiddleware internals.
+COMPRESSION = settings.compression
+COMPRESSION_MIN_SIZE = settings.compression_min_size
+# Dynamic responses are compressed on every request, so the defaults trade a
+# little ratio for much less CPU than the maximum levels
+COMPRESSION_GZIP_LEVEL = settings.compression_gzip_level
+COMPRESSION_BROTLI_QUALITY = settings.compression_brotli_quality
+
+# Media is compressed already, and a 206 body is a byte range of the file as
+# stored, so both are sent as they are
+UNCOMPRESSED_CONTENT_TYPES = ("image/", "video/", "audio/", "text/event-stream")
+
+def accepted_encodings(accept_encoding: str) -> dict[str, float]:
+    """Parses an Accept-Encoding header into {coding: q}."""
+    encodings = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        encodings[coding] = q
+    return encodings
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    encodings = accepted_encodings(accept_encoding)
+    available = ["br", "gzip"] if brotli is not None else ["gzip"]
+    candidates = [coding for coding in available if encodings.get(coding, encodings.get("*", 0.0)) > 0]
+    # Highest q wins, ties go to the better compression
+    return max(candidates, key=lambda coding: encodings.get(coding, encodings.get("*", 0.0)), default=None)
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        if more_body:
+            return self.compressor.compress(body) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        return self.compressor.compress(body) + self.compressor.flush()
+
+class BrotliCompressor:
+    def __init__(self, quality: int):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, body: bytes, more_body: bool) -> bytes:
+        if more_body:
+            return self.compressor.process(body) + self.compressor.flush()
+        return self.compressor.process(body) + self.compressor.finish()
+
+def is_compressible(start: Message, headers: Headers) -> bool:
+    # 204 and 304 have no body to compress
+    if start["status"] in (204, 206, 304) or "content-encoding" in headers:
+        return False
+    return not headers.get("content-type", "").startswith(UNCOMPRESSED_CONTENT_TYPES)
+
+class CompressionResponder:
+    """
+    Compresses one response. The start message is held back until the first
+    body chunk shows whether the body is large enough (or streamed) to be
+    worth compressing.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int, encoding: str | None, compressor):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoding = encoding
+        self.compressor = compressor
+        self.send = None
+        self.start = None
+        self.compressing = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if message["type"] == "http.response.body" and self.compressing:
+            await self.send({**message, "body": self.compressor.compress(body, more_body)})
+            return
+        if message["type"] != "http.response.body" or self.start is None:
+            if self.start is not None:
+                await self.send(self.start)
+                self.start = None
+            await self.send(message)
+            return
+
+        start, self.start = self.start, None
+        headers = MutableHeaders(raw=start["headers"])
+        if not is_compressible(start, headers) or (not more_body and len(body) < self.minimum_size):
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        if self.encoding is None:
+            await self.send(start)
+            await self.send(message)
+            return
+
+        self.compressing = True
+        body = self.compressor.compress(body, more_body)
+        headers["Content-Encoding"] = self.encoding
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(body))
+        # A compressed body is a different representation, so a strong ETag of
+        # the uncompressed body becomes weak. If-None-Match uses weak
+        # comparison (see app/http_cache.py), so revalidation keeps working.
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
+        await self.send(start)
+        await self.send({**message, "body": body})
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE, gzip_level: int = COMPRESSION_GZIP_LEVEL, brotli_quality: int = COMPRESSION_BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding == "br":
+            compressor = BrotliCompressor(self.brotli_quality)
+        elif encoding == "gzip":
+            compressor = GzipCompressor(self.gzip_level)
+        else:
+            # Still adds Vary: Accept-Encoding to responses that could be compressed
+            compressor = None
+        await CompressionResponder(self.app, self.minimum_size, encoding, compressor)(scope, receive, send)
@@ -1,19 +1,160 @@
-import os
-from dotenv import load_dotenv
+import itertools
+import time
+from uuid import uuid4
+from fastapi import Request, Response
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 
-load_dotenv()  # loads .env into environment
+from app.config.pool_metrics import PoolMetrics, instrument_engine, instrumented_pool_class
+from app.config.settings import settings
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_URL = settings.database_url
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+# DB_ASYNC=true serves the post endpoints from async handlers on an asyncpg engine
+DB_ASYNC = settings.db_async
+
+def to_async_url(url: str) -> str:
+    """Swaps the sync driver in a database URL for its asyncio counterpart."""
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    if dialect in ("postgres", "postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite://{rest}"
+    return url
+
+ASYNC_DATABASE_URL = settings.async_database_url or (to_async_url(DATABASE_URL) if DATABASE_URL else None)
+
+# Optional read replicas. GET endpoints read from them, except for clients that
+# wrote within the last REPLICA_STICKY_SECONDS, who keep reading from the
+# primary. Pages read from a replica that lags behind are not cached (see
+# app/services/response_cache.py).
+DATABASE_REPLICA_URLS = settings.database_replica_urls
+REPLICA_STICKY_SECONDS = settings.replica_sticky_seconds
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+# Connection pool settings (SQLAlchemy's QueuePool defaults unless overridden)
+DB_POOL_SIZE = settings.db_pool_size
+DB_MAX_OVERFLOW = settings.db_max_overflow
+DB_POOL_TIMEOUT = settings.db_pool_timeout
+DB_POOL_RECYCLE = settings.db_pool_recycle
+DB_POOL_PRE_PING = settings.db_pool_pre_ping
+# Behind PgBouncer (transaction pooling) the app must not pool connections
+# itself, and asyncpg must not rely on named prepared statements
+DB_PGBOUNCER = settings.db_pgbouncer
+
+def engine_options(url: str, metrics: PoolMetrics, is_async: bool = False) -> dict:
+    """Builds the create_engine/create_async_engine keyword arguments for `url`."""
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite keeps one connection per thread, there is no pool to tune
+        return options
+
+    if DB_PGBOUNCER:
+        options["poolclass"] = instrumented_pool_class(NullPool, metrics)
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+
+    options.update(
+        poolclass=instrumented_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool, metrics),
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return options
+
+pool_metrics = {}
+pooled_engines = {}
+
+def create_instrumented_engine(name: str, url: str, is_async: bool = False):
+    pool_metrics[name] = PoolMetrics()
+    if is_async:
+        created = create_async_engine(url, **engine_options(url, pool_metrics[name], is_async=True))
+        instrument_engine(created.sync_engine, pool_metrics[name])
+    else:
+        created = create_engine(url, **engine_options(url, pool_metrics[name]))
+        instrument_engine(created, pool_metrics[name])
+    pooled_engines[name] = created
+    return created
+
+engine = create_instrumented_engine("primary", DATABASE_URL)
+replica_engines = [create_instrumented_engine(f"replica_{i}", url) for i, url in enumerate(DATABASE_REPLICA_URLS)]
+_replica_cycle = itertools.cycle(replica_engines)
+
+# Objects stay loaded after commit, so a freshly created post can be returned
+# without selecting it again
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
+async_engine = None
+async_replica_engines = []
+AsyncSessionLocal = None
+if DB_ASYNC:
+    # Imported lazily: the async driver is only needed in async mode
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_engine = create_instrumented_engine("async", ASYNC_DATABASE_URL, is_async=True)
+    async_replica_engines = [create_instrumented_engine(f"async_replica_{i}", to_async_url(url), is_async=True) for i, url in enumerate(DATABASE_REPLICA_URLS)]
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+_async_replica_cycle = itertools.cycle(async_replica_engines)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def reads_from_primary(request: Request) -> bool:
+    """True when the client wrote recently and a replica may not have caught up yet."""
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+def stick_to_primary(response: Response):
+    """
+    Called by write endpoints. Keeps the client's reads on the primary and off
+    the response cache for REPLICA_STICKY_SECONDS, so it reads its own writes
+    despite replica lag and workers that have not seen the write yet.
+    """
+    until = time.time() + REPLICA_STICKY_SECONDS
+    response.set_cookie(READ_PRIMARY_COOKIE, str(until), max_age=REPLICA_STICKY_SECONDS, httponly=True)
+
+def get_read_db(request: Request):
+    """
+    Session for read-only endpoints: bound to the next replica in turn, or to
+    the primary if there are no replicas or the client wrote recently.
+    """
+    if not replica_engines or reads_from_primary(request):
+        yield from get_db()
+        return
+
+    db = SessionLocal(bind=next(_replica_cycle))
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request):
+    if not async_replica_engines or reads_from_primary(request):
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    async with AsyncSessionLocal(bind=next(_async_replica_cycle)) as db:
+        yield db
@@ -0,0 +1,97 @@
+import threading
+import time
+from sqlalchemy import event, exc
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+class PoolMetrics:
+    """
+    Counters for one engine's connection pool. Updated from pool events and from
+    InstrumentedPoolMixin, read by the /internal/pool endpoint.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+
+    def on_connect(self, *args):
+        with self._lock:
+            self.connects += 1
+
+    def on_checkout(self, *args):
+        with self._lock:
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def on_checkin(self, *args):
+        with self._lock:
+            self.in_use -= 1
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            data = {
+                "pool_class": type(pool).__name__,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "wait_avg_ms": self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+                "wait_histogram": {str(bound): count for bound, count in zip(WAIT_BUCKETS, self.wait_buckets)},
+            }
+        # Only queue-style pools have a size and an overflow
+        if hasattr(pool, "overflow"):
+            data["size"] = pool.size()
+            data["idle"] = pool.checkedin()
+            data["overflow"] = max(pool.overflow(), 0)
+        return data
+
+class InstrumentedPoolMixin:
+    """
+    Times how long callers wait for a connection. The metrics live on the class
+    (see instrumented_pool_class) because engine.dispose() recreates the pool
+    from its class.
+    """
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+def instrumented_pool_class(pool_class, metrics: PoolMetrics):
+    return type(f"Instrumented{pool_class.__name__}", (InstrumentedPoolMixin, pool_class), {"metrics": metrics})
+
+def instrument_engine(engine, metrics: PoolMetrics):
+    """Hooks the pool events of a sync Engine (use async_engine.sync_engine for async ones)."""
+    event.listen(engine, "connect", metrics.on_connect)
+    event.listen(engine, "checkout", metrics.on_checkout)
+    event.listen(engine, "checkin", metrics.on_checkin)
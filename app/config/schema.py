@@ -0,0 +1,78 @@
+import logging
+
+from app.config.database import Base, engine
+from app.config.settings import settings
+import app.models  # registers every table on Base.metadata
+import app.services.post_counts as PostCounts
+
+# How the app makes sure the database schema fits the code at startup:
+#   DB_AUTO_CREATE=true   - create missing tables with create_all (development
+#                           databases that are never migrated)
+#   DB_SCHEMA_CHECK=true  - (default) compare the database's Alembic revision
+#                           with the newest migration and refuse to start if
+#                           migrations are missing; one query, no DDL
+#                           introspection
+# serve.py runs the check once before starting its workers and turns it off
+# for them.
+DB_AUTO_CREATE = settings.db_auto_create
+DB_SCHEMA_CHECK = settings.db_schema_check
+ALEMBIC_CONFIG = settings.alembic_config
+
+logger = logging.getLogger("uvicorn.error")
+
+class SchemaError(RuntimeError):
+    pass
+
+def check_schema(bind=engine):
+    """
+    Raises SchemaError unless the database is at the newest Alembic revision.
+    A database at a revision this code does not know about (migrated ahead
+    of a rolling deploy) is only logged.
+    """
+    # Imported here, so workers that skip the check don't load Alembic
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+    from alembic.util import CommandError
+
+    script = ScriptDirectory.from_config(Config(ALEMBIC_CONFIG))
+    expected = set(script.get_heads())
+    with bind.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+
+    if current == expected:
+        return
+    if not current:
+        raise SchemaError(
+            "The database has no Alembic revision. Run `alembic upgrade head` "
+            "(or set DB_AUTO_CREATE=true for a development database)."
+        )
+    for revision in current:
+        try:
+            script.get_revision(revision)
+        except CommandError:
+            logger.warning("Database revision %s is newer than this code (expected %s)", revision, ", ".join(sorted(expected)))
+            return
+    raise SchemaError(
+        f"The database is at revision {', '.join(sorted(current))}, the code expects "
+        f"{', '.join(sorted(expected))}. Run `alembic upgrade head`."
+    )
+
+def create_all(bind=engine):
+    """
+    Creates missing tables and the rows the migrations would have seeded, for
+    databases that are not migrated.
+    """
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as connection:
+        PostCounts.seed_posts_counter(connection)
+
+def prepare_schema():
+    """Called at startup; returns what was done."""
+    if DB_AUTO_CREATE:
+        create_all()
+        return "create_all"
+    if DB_SCHEMA_CHECK:
+        check_schema()
+        return "checked"
+    return "skipped"
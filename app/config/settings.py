@@ -0,0 +1,153 @@
+import os
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+# Every setting the app reads from the environment, loaded once (with .env
+# applied first) when this module is imported. Modules keep their own
+# constants, assigned from `settings`, next to the code they configure; see
+# the README for what each one does.
+
+def env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+def env_list(name: str) -> tuple[str, ...]:
+    return tuple(item.strip() for item in os.getenv(name, "").split(",") if item.strip())
+
+@dataclass(frozen=True)
+class Settings:
+    # Database
+    database_url: str | None
+    async_database_url: str | None
+    database_replica_urls: tuple[str, ...]
+    replica_sticky_seconds: int
+    db_async: bool
+    db_pool_size: int
+    db_max_overflow: int
+    db_pool_timeout: float
+    db_pool_recycle: int
+    db_pool_pre_ping: bool
+    db_pgbouncer: bool
+    db_auto_create: bool
+    db_schema_check: bool
+    alembic_config: str
+
+    # Media storage and uploads
+    storage_provider: str
+    local_storage_dir: str
+    local_storage_url: str
+    local_storage_secret: str | None
+    imagekit_public_key: str | None
+    imagekit_private_key: str | None
+    imagekit_url: str | None
+    imagekit_upload_url: str
+    imagekit_api_url: str
+    upload_concurrency: int
+    upload_max_connections: int
+    upload_timeout: float
+    signed_url_cache_size: int
+    signed_url_refresh_margin: int
+    signing_batch_max: int
+
+    # Feed, caching and responses
+    feed_source: str
+    max_page_size: int
+    post_count_strategy: str
+    post_count_cache_ttl: float
+    search_max_candidates: int
+    cache_redis_url: str | None
+    response_cache_size: int
+    response_cache_ttl: float
+    response_cache_generation_check: float
+    http_cache: bool
+    http_cache_max_age: int
+    compression: bool
+    compression_min_size: int
+    compression_gzip_level: int
+    compression_brotli_quality: int
+    stream_batch_size: int
+    bulk_import_chunk_size: int
+
+    # Background jobs
+    artifact_processing: bool
+    job_batch_size: int
+    job_poll_interval: float
+    job_max_attempts: int
+    job_retry_delay: float
+    job_lock_timeout: float
+
+    # Profiling
+    profiling: bool
+    profile_sample_rate: float
+    profile_dir: str
+    profiler: str
+    n_plus_one_threshold: int
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        load_dotenv()  # loads .env into environment
+        return cls(
+            database_url=os.getenv("DATABASE_URL"),
+            async_database_url=os.getenv("ASYNC_DATABASE_URL"),
+            database_replica_urls=env_list("DATABASE_REPLICA_URLS"),
+            replica_sticky_seconds=int(os.getenv("REPLICA_STICKY_SECONDS", "5")),
+            db_async=env_flag("DB_ASYNC"),
+            db_pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            db_max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            db_pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            db_pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "-1")),
+            db_pool_pre_ping=env_flag("DB_POOL_PRE_PING"),
+            db_pgbouncer=env_flag("DB_PGBOUNCER"),
+            db_auto_create=env_flag("DB_AUTO_CREATE"),
+            db_schema_check=env_flag("DB_SCHEMA_CHECK", "true"),
+            alembic_config=os.getenv("ALEMBIC_CONFIG", os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini")),
+
+            storage_provider=os.getenv("STORAGE_PROVIDER", "imagekit"),
+            local_storage_dir=os.getenv("LOCAL_STORAGE_DIR", "media"),
+            local_storage_url=os.getenv("LOCAL_STORAGE_URL", "http://localhost:8000/media"),
+            local_storage_secret=os.getenv("LOCAL_STORAGE_SECRET"),
+            imagekit_public_key=os.getenv("IMAGEKIT_PUBLIC_KEY"),
+            imagekit_private_key=os.getenv("IMAGEKIT_PRIVATE_KEY"),
+            imagekit_url=os.getenv("IMAGEKIT_URL"),
+            imagekit_upload_url=os.getenv("IMAGEKIT_UPLOAD_URL", "https://upload.imagekit.io/api/v1/files/upload"),
+            imagekit_api_url=os.getenv("IMAGEKIT_API_URL", "https://api.imagekit.io/v1"),
+            upload_concurrency=int(os.getenv("UPLOAD_CONCURRENCY", "4")),
+            upload_max_connections=int(os.getenv("UPLOAD_MAX_CONNECTIONS", "20")),
+            upload_timeout=float(os.getenv("UPLOAD_TIMEOUT", "300")),
+            signed_url_cache_size=int(os.getenv("SIGNED_URL_CACHE_SIZE", "10000")),
+            signed_url_refresh_margin=int(os.getenv("SIGNED_URL_REFRESH_MARGIN", "60")),
+            signing_batch_max=int(os.getenv("SIGNING_BATCH_MAX", "1000")),
+
+            feed_source=os.getenv("FEED_SOURCE", "posts"),
+            max_page_size=int(os.getenv("MAX_PAGE_SIZE", "1000")),
+            post_count_strategy=os.getenv("POST_COUNT_STRATEGY", "exact"),
+            post_count_cache_ttl=float(os.getenv("POST_COUNT_CACHE_TTL", "30")),
+            search_max_candidates=int(os.getenv("SEARCH_MAX_CANDIDATES", "1000")),
+            cache_redis_url=os.getenv("CACHE_REDIS_URL"),
+            response_cache_size=int(os.getenv("RESPONSE_CACHE_SIZE", "1000")),
+            response_cache_ttl=float(os.getenv("RESPONSE_CACHE_TTL", "30")),
+            response_cache_generation_check=float(os.getenv("RESPONSE_CACHE_GENERATION_CHECK", "1")),
+            http_cache=env_flag("HTTP_CACHE", "true"),
+            http_cache_max_age=int(os.getenv("HTTP_CACHE_MAX_AGE", "300")),
+            compression=env_flag("COMPRESSION", "true"),
+            compression_min_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+            compression_gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+            compression_brotli_quality=int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")),
+            stream_batch_size=int(os.getenv("STREAM_BATCH_SIZE", "100")),
+            bulk_import_chunk_size=int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "1000")),
+
+            artifact_processing=env_flag("ARTIFACT_PROCESSING"),
+            job_batch_size=int(os.getenv("JOB_BATCH_SIZE", "10")),
+            job_poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "1")),
+            job_max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "5")),
+            job_retry_delay=float(os.getenv("JOB_RETRY_DELAY", "10")),
+            job_lock_timeout=float(os.getenv("JOB_LOCK_TIMEOUT", "300")),
+
+            profiling=env_flag("PROFILING"),
+            profile_sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+            profile_dir=os.getenv("PROFILE_DIR", "profiles"),
+            profiler=os.getenv("PROFILER", "cprofile"),
+            n_plus_one_threshold=int(os.getenv("N_PLUS_ONE_THRESHOLD", "5")),
+        )
+
+settings = Settings.from_env()
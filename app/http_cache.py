@@ -0,0 +1,109 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+from app.config.settings import settings
+import app.services.artifact_processing as ArtifactProcessing
+import app.services.response_cache as ResponseCache
+
+# Conditional GETs for the post endpoints. The ETag is derived from the
+# updated_at of the posts on a page and of their artifacts (see
+# Posts.version_columns), so revalidating costs one index lookup and a
+# 304 is sent without loading artifacts or signing URLs. The validators are
+# cached next to the response body, so revalidating a cached response costs
+# no query at all.
+#
+# Responses embed signed URLs, so the signing window is part of the ETag and
+# Last-Modified, and max-age never outlasts the URLs inside a response.
+#
+# Feed pages are only validated by their ETag and sent with no-cache: a new
+# post shifts every page without touching the rows on it, so neither the
+# rows' updated_at nor a max-age would notice, and a client that just wrote
+# would be served a page from before its write.
+HTTP_CACHE = settings.http_cache
+HTTP_CACHE_MAX_AGE = settings.http_cache_max_age
+
+def to_timestamp(value: datetime) -> float:
+    # Timestamps are stored as naive UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def compute_validators(versions: list[tuple], *params, feed: bool = False) -> tuple[str, float | None]:
+    """
+    (ETag, Last-Modified timestamp) for a response made of the posts with the
+    given version rows. `params` are whatever else shapes the response body
+    (page number, total count, include_content, ...). Feed pages get no
+    Last-Modified.
+    """
+    bucket, bucket_start = ArtifactProcessing.signed_url_bucket()
+    digest = hashlib.sha1(repr((params, [tuple(version) for version in versions], bucket)).encode()).hexdigest()
+    if feed:
+        return f'"{digest[:32]}"', None
+    modified = [to_timestamp(value) for version in versions for value in version[1:3] if value is not None]
+    return f'"{digest[:32]}"', max(modified + [bucket_start])
+
+def cached_validators(cache_key: str) -> tuple[str, float | None] | None:
+    if not HTTP_CACHE:
+        return None
+    return ResponseCache.get_validators(cache_key)
+
+async def acached_validators(cache_key: str) -> tuple[str, float | None] | None:
+    if not HTTP_CACHE:
+        return None
+    return await ResponseCache.aget_validators(cache_key)
+
+def needs_validators(validators: tuple[str, float | None] | None) -> bool:
+    return HTTP_CACHE and validators is None
+
+def store_validators(cache_key: str, versions: list[tuple], *params, feed: bool = False) -> tuple[str, float | None]:
+    validators = compute_validators(versions, *params, feed=feed)
+    ResponseCache.store_validators(cache_key, validators)
+    return validators
+
+async def astore_validators(cache_key: str, versions: list[tuple], *params, feed: bool = False) -> tuple[str, float | None]:
+    validators = compute_validators(versions, *params, feed=feed)
+    await ResponseCache.astore_validators(cache_key, validators)
+    return validators
+
+def headers(validators: tuple[str, float | None]) -> dict:
+    etag, last_modified = validators
+    if last_modified is None:
+        return {"ETag": etag, "Cache-Control": "no-cache"}
+    max_age = max(0, min(HTTP_CACHE_MAX_AGE, int(ArtifactProcessing.signed_url_ttl())))
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(datetime.fromtimestamp(int(last_modified), timezone.utc), usegmt=True),
+        "Cache-Control": f"public, max-age={max_age}",
+    }
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison, as required for If-None-Match
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+def is_not_modified(request: Request, validators: tuple[str, float | None]) -> bool:
+    etag, last_modified = validators
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is present
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return int(last_modified) <= to_timestamp(since)
+
+def not_modified(validators: tuple[str, float | None]) -> Response:
+    return Response(status_code=304, headers=headers(validators))
+
+def add_headers(response: Response, validators: tuple[str, float | None] | None) -> Response:
+    if validators is not None:
+        response.headers.update(headers(validators))
+    return response
@@ -0,0 +1,51 @@
+import os
+import time
+from fastapi import APIRouter, HTTPException, File, Form, UploadFile
+from fastapi.responses import FileResponse
+
+import app.services.artifact_processing as ArtifactProcessing
+import app.services.storage as Storage
+import app.profiling as Profiling
+
+# Endpoints of the local storage provider (STORAGE_PROVIDER=local), which
+# stands in for ImageKit's upload API and CDN. Files are only served with a
+# valid signature from Storage.LocalStorage.sign_path().
+router = APIRouter(route_class=Profiling.route_class)
+
+@router.post("/media/upload")
+async def upload_media(file: UploadFile = File(), token: str = Form(), expire: int = Form(), signature: str = Form()):
+    """
+    Direct upload with the parameters from GET /upload_auth_params. Answers
+    with the fields of ImageKit's upload API that clients use.
+    """
+    storage = Storage.get_provider()
+    if not storage.verify_auth_params(token, expire, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired upload signature")
+    try:
+        artifact = await storage.upload(file)
+    except Storage.UploadError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "fileId": artifact.file_id,
+        "filePath": artifact.file_path,
+        "fileType": artifact.file_type,
+        "thumbnailUrl": None,
+        "url": ArtifactProcessing.generate_signed_url(artifact.file_path),
+    }
+
+@router.api_route("/media/{file_path:path}", methods=["GET", "HEAD"])
+def get_media(file_path: str, expires: int, signature: str):
+    """
+    Streams the file in chunks. FileResponse answers Range requests with 206
+    (several ranges as multipart/byteranges), so video can be seeked.
+    """
+    storage = Storage.get_provider()
+    if not storage.verify(file_path, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired signature")
+    path = storage.local_path(file_path)
+    if path is None or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    # The URL stops working when the signature expires, so caches must not
+    # keep the response for longer
+    max_age = max(0, expires - int(time.time()))
+    return FileResponse(path, headers={"Cache-Control": f"private, max-age={max_age}"})
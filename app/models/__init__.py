@@ -1,2 +1,5 @@
 from .post import Post
 from .artifact import Artifact
+from .counter import Counter
+from .job import Job
+from .feed_entry import FeedEntry
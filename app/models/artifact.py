@@ -1,6 +1,6 @@
 from uuid import UUID, uuid4
 from datetime import datetime, timezone
-from sqlalchemy import Column, DateTime, Integer, String, ForeignKey
+from sqlalchemy import JSON, Column, DateTime, Integer, String, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -16,7 +16,11 @@ class Artifact(Base):
     file_id = Column(String, nullable=True)
     file_path = Column(String, nullable=True)
     file_type = Column(String, nullable=True)
+    # pending while a process_artifacts job is queued (see app/services/jobs.py),
+    # then done or failed
+    processing_status = Column(String, nullable=False, default="done", server_default="done")
+    media_metadata = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
-    post_id = Column(Integer, ForeignKey("posts.id"))
+    post_id = Column(Integer, ForeignKey("posts.id"), index=True)
     post = relationship("Post", back_populates="artifacts")
\ No newline at end of file
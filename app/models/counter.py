@@ -0,0 +1,9 @@
+from sqlalchemy import BigInteger, Column, String
+
+from app.config.database import Base
+
+class Counter(Base):
+    __tablename__ = "counters"
+
+    name = Column(String, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,21 @@
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.config.database import Base
+
+class FeedEntry(Base):
+    """
+    One pre-rendered row per post, read by GET /posts when FEED_SOURCE is
+    feed_entries (see app/services/feed.py). `id` is the post's id, so the feed
+    is a range scan over the primary key.
+    """
+    __tablename__ = "feed_entries"
+
+    id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    public_id = Column(UUID(as_uuid=True), nullable=False)
+    title = Column(String, nullable=False)
+    content = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    # Artifact fields of the post response, without the signed url
+    artifacts = Column(JSON, nullable=False, default=list)
@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String
+
+from app.config.database import Base
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(String, nullable=False, default="queued")  # queued | running | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    run_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    __table_args__ = (
+        # Workers claim the oldest queued jobs that are due
+        Index("ix_jobs_status_run_at", status, run_at),
+    )
@@ -1,6 +1,6 @@
 from uuid import UUID, uuid4
 from datetime import datetime, timezone
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import DDL, Column, DateTime, Index, Integer, String, event
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -15,4 +15,40 @@ class Post(Base):
     content = Column(String, nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
-    artifacts = relationship("Artifact", back_populates="post")
\ No newline at end of file
+    artifacts = relationship("Artifact", back_populates="post")
+
+    __table_args__ = (
+        # Newest-first feeds ordered by time, with id as the tie breaker
+        Index("ix_posts_created_at_id", created_at.desc(), id.desc()),
+    )
+
+# Full-text search index, maintained by the database (see app/services/search.py).
+# It is not mapped because the column type only exists on Postgres; these hooks
+# create it together with the table, and the migration adds it to existing ones.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')"
+)
+
+POSTGRES_SEARCH_DDL = (
+    f"ALTER TABLE posts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_VECTOR_SQL}) STORED",
+    "CREATE INDEX ix_posts_search_vector ON posts USING gin (search_vector)",
+)
+
+# SQLite stand-in: an FTS5 index over the posts table, kept in sync by triggers
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE posts_fts USING fts5(title, content, content='posts', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER posts_fts_au AFTER UPDATE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+)
+
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(Post.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Post.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Post.__table__, "before_drop", DDL("DROP TABLE IF EXISTS posts_fts").execute_if(dialect="sqlite"))
\ No newline at end of file
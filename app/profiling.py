@@ -0,0 +1,295 @@
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config.settings import settings
+
+# Opt-in per-request profiling. When enabled, every request records timing
+# spans (SQL, counting, URL signing, serialization) that are returned in a
+# Server-Timing header and aggregated for GET /metrics. With PROFILING off the
+# decorators below return the functions unchanged, so there is no overhead.
+PROFILING = settings.profiling
+
+# Fraction of requests run under a profiler; a request with an `X-Profile: 1`
+# header is always profiled. Profiles are written to PROFILE_DIR/<route>/.
+PROFILE_SAMPLE_RATE = settings.profile_sample_rate
+PROFILE_DIR = settings.profile_dir
+PROFILER = settings.profiler  # cprofile | pyinstrument
+
+# A statement repeated this many times in one request is reported as an N+1
+N_PLUS_ONE_THRESHOLD = settings.n_plus_one_threshold
+
+# Upper bounds (seconds) of the request duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float("inf"))
+
+logger = logging.getLogger(__name__)
+
+class RequestProfile:
+    """Timings collected while handling one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = defaultdict(float)
+        self.active = set()
+        self.statements = Counter()
+        self.profiler = None
+
+    @property
+    def queries(self) -> int:
+        return sum(self.statements.values())
+
+current_profile: contextvars.ContextVar[RequestProfile | None] = contextvars.ContextVar("current_profile", default=None)
+
+@contextmanager
+def span(name: str):
+    """
+    Adds the time spent in the block to the current request's `name` span.
+    Nested spans with the same name are only counted once.
+    """
+    profile = current_profile.get()
+    if profile is None or name in profile.active:
+        yield
+        return
+
+    profile.active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.spans[name] += time.perf_counter() - started
+        profile.active.discard(name)
+
+def timed(name: str):
+    """Decorator form of span(); returns the function unchanged when profiling is off."""
+    def decorator(fn):
+        if not PROFILING:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    profile = current_profile.get()
+    if profile is not None:
+        profile.spans["db"] += time.perf_counter() - started
+        profile.statements[statement] += 1
+
+if PROFILING:
+    # Listening on the Engine class covers every engine, including the sync
+    # engines behind the async ones and the read replicas
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", after_cursor_execute)
+
+def make_profiler(async_mode: bool):
+    if PROFILER == "pyinstrument":
+        from pyinstrument import Profiler
+        return Profiler(async_mode="enabled" if async_mode else "disabled")
+    import cProfile
+    return cProfile.Profile()
+
+# Only one profiler can run in a process at a time (cProfile raises
+# "Another profiling tool is already active" on Python 3.12+), so a request
+# that asks for a profile while another one is being profiled runs without.
+_profiler_lock = threading.Lock()
+
+def start_profiler(profile: RequestProfile | None, async_mode: bool) -> bool:
+    if profile is None or profile.profiler is not True:
+        return False
+    if not _profiler_lock.acquire(blocking=False):
+        logger.info("Another request is being profiled, not profiling this one")
+        profile.profiler = None
+        return False
+    try:
+        profile.profiler = make_profiler(async_mode)
+        if PROFILER == "pyinstrument":
+            profile.profiler.start()
+        else:
+            profile.profiler.enable()
+    except BaseException:
+        profile.profiler = None
+        _profiler_lock.release()
+        raise
+    return True
+
+def stop_profiler(profile: RequestProfile):
+    try:
+        if PROFILER == "pyinstrument":
+            profile.profiler.stop()
+        else:
+            profile.profiler.disable()
+    finally:
+        _profiler_lock.release()
+
+def profiled_endpoint(endpoint):
+    """
+    Runs the endpoint under a profiler when its request asked for one. The
+    profiler is started inside the endpoint call because sync endpoints run in
+    a threadpool thread, which a profiler started by the middleware would not
+    see. For async endpoints, other requests interleaved on the event loop
+    show up in the profile too.
+    """
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            profile = current_profile.get()
+            if not start_profiler(profile, async_mode=True):
+                return await endpoint(*args, **kwargs)
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                stop_profiler(profile)
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profile = current_profile.get()
+        if not start_profiler(profile, async_mode=False):
+            return endpoint(*args, **kwargs)
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            stop_profiler(profile)
+    return wrapper
+
+class ProfiledRoute(APIRoute):
+    def __init__(self, path: str, endpoint, **kwargs):
+        # include_router re-creates routes from already wrapped endpoints
+        if not getattr(endpoint, "profiled", False):
+            endpoint = profiled_endpoint(endpoint)
+            endpoint.profiled = True
+        super().__init__(path, endpoint, **kwargs)
+
+# Route class for the app and its routers: endpoints are only wrapped when
+# profiling is enabled
+route_class = ProfiledRoute if PROFILING else APIRoute
+
+def dump_profile(profile: RequestProfile, route: str) -> str:
+    directory = os.path.join(PROFILE_DIR, re.sub(r"[^A-Za-z0-9_.-]+", "_", route).strip("_") or "root")
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(directory, f"{datetime.now():%Y%m%d-%H%M%S-%f}")
+    if PROFILER == "pyinstrument":
+        path = stem + ".html"
+        with open(path, "w") as f:
+            f.write(profile.profiler.output_html())
+    else:
+        path = stem + ".prof"
+        profile.profiler.dump_stats(path)
+    return path
+
+class RequestMetrics:
+    """Per-route aggregates of the request profiles, rendered by GET /metrics."""
+
+    def __init__(self):
+        self.requests = Counter()
+        self.duration_buckets = defaultdict(lambda: [0] * len(DURATION_BUCKETS))
+        self.duration_sum = defaultdict(float)
+        self.span_seconds = defaultdict(float)
+        self.queries = Counter()
+        self.n_plus_one = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, route: str, method: str, status: int, duration: float, profile: RequestProfile, repeated: bool):
+        with self._lock:
+            self.requests[(route, method, str(status))] += 1
+            self.duration_sum[route] += duration
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    self.duration_buckets[route][i] += 1
+                    break
+            for name, seconds in profile.spans.items():
+                self.span_seconds[(route, name)] += seconds
+            self.queries[route] += profile.queries
+            if repeated:
+                self.n_plus_one[route] += 1
+
+    def families(self) -> list[tuple[str, str, str, list]]:
+        with self._lock:
+            histogram = []
+            for route, buckets in self.duration_buckets.items():
+                cumulative = 0
+                for bound, count in zip(DURATION_BUCKETS, buckets):
+                    cumulative += count
+                    histogram.append(("_bucket", {"route": route, "le": "+Inf" if bound == float("inf") else str(bound)}, cumulative))
+                histogram.append(("_sum", {"route": route}, self.duration_sum[route]))
+                histogram.append(("_count", {"route": route}, cumulative))
+
+            return [
+                ("app_requests_total", "counter", "Requests handled.",
+                 [("", {"route": r, "method": m, "status": s}, n) for (r, m, s), n in self.requests.items()]),
+                ("app_request_duration_seconds", "histogram", "Request handling time.", histogram),
+                ("app_span_seconds_total", "counter", "Time spent per span (db, count, sign, serialize).",
+                 [("", {"route": r, "span": s}, v) for (r, s), v in self.span_seconds.items()]),
+                ("app_db_queries_total", "counter", "SQL statements executed.",
+                 [("", {"route": r}, n) for r, n in self.queries.items()]),
+                ("app_n_plus_one_requests_total", "counter", f"Requests that repeated a statement {N_PLUS_ONE_THRESHOLD}+ times.",
+                 [("", {"route": r}, n) for r, n in self.n_plus_one.items()]),
+            ]
+
+request_metrics = RequestMetrics()
+
+def render_metrics(families: list[tuple[str, str, str, list]]) -> str:
+    """
+    Renders (name, type, help, samples) families in the Prometheus text
+    format, where each sample is (name suffix, labels, value).
+    """
+    lines = []
+    for name, kind, help_text, samples in families:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for suffix, labels, value in samples:
+            label_text = ",".join(f'{key}="{str(val)}"' for key, val in labels.items())
+            lines.append(f"{name}{suffix}{{{label_text}}} {value}")
+    return "\n".join(lines) + "\n"
+
+def server_timing(profile: RequestProfile, total: float) -> str:
+    entries = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in profile.spans.items()]
+    entries.append(f'queries;desc="{profile.queries} SQL statements"')
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+async def profile_request(request: Request, call_next):
+    """HTTP middleware: collects a RequestProfile for the request and reports it."""
+    profile = RequestProfile()
+    if request.headers.get("x-profile") == "1" or random.random() < PROFILE_SAMPLE_RATE:
+        # Replaced by a real profiler inside the endpoint, see profiled_endpoint
+        profile.profiler = True
+    token = current_profile.set(profile)
+    try:
+        response = await call_next(request)
+    finally:
+        current_profile.reset(token)
+
+    total = time.perf_counter() - profile.started
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+
+    repeated = [(statement, n) for statement, n in profile.statements.items() if n >= N_PLUS_ONE_THRESHOLD]
+    for statement, n in repeated:
+        logger.warning("Possible N+1 in %s %s: statement ran %d times: %s", request.method, route, n, statement[:200])
+
+    request_metrics.record(route, request.method, response.status_code, total, profile, bool(repeated))
+    response.headers["Server-Timing"] = server_timing(profile, total)
+    if profile.profiler not in (None, True):
+        response.headers["X-Profile-File"] = dump_profile(profile, route)
+    return response
@@ -1,26 +1,42 @@
-from socketserver import ThreadingUnixStreamServer
-from telnetlib import theNULL
 import uuid
 from datetime import datetime
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, List, Literal, Optional
 
 class ArtifactResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     public_id: uuid.UUID
-    url: str
-    content_type: str
-    
+    url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    file_id: Optional[str] = None
+    file_path: Optional[str] = None
+    file_type: Optional[str] = None
+    processing_status: Optional[str] = None
+    media_metadata: Optional[dict] = None
+
 
 class PostResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     public_id: uuid.UUID
     title: str
-    content: str
+    content: Optional[str] = None  # left out when include_content=false
     created_at: datetime
     updated_at: datetime
     artifacts: Optional[List[ArtifactResponse]] = []
-    
-    class Config:
-        orm_mode = True
+
+class FeedPageResponse(BaseModel):
+    no_of_posts: int
+    count_type: Literal["exact", "estimated"]
+    posts: List[PostResponse]
+    current_page: int
+    total_pages: int
+
+class FeedCursorResponse(BaseModel):
+    posts: List[PostResponse]
+    next_cursor: Optional[str] = None
+    page_size: int
         
 class ArtifactCreate(BaseModel):
     file_id: str
@@ -28,7 +44,13 @@ class ArtifactCreate(BaseModel):
     file_type: str
     thumbnail_url: str
     
+class SignedUrlsRequest(BaseModel):
+    file_paths: List[str]
+
+class SignedUrlsResponse(BaseModel):
+    signed_urls: Dict[str, str]
+
 class PostCreate(BaseModel):
     title: str
     content: str
-    artifacts: Optional[List[ArtifactCreate]] = None  # optional
\ No newline at end of file
+    artifacts: Optional[List[ArtifactCreate]] = None  # optional
@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+
+import orjson
+
+from app.models import Artifact, Post
+import app.profiling as Profiling
+
+# Builds the JSON bodies of the post endpoints straight from ORM rows. The dicts
+# have exactly the fields of PostResponse/ArtifactResponse in app/schemas.py,
+# and orjson encodes UUIDs and datetimes natively, so FastAPI's recursive
+# jsonable_encoder and response model validation are skipped entirely.
+
+def as_utc(value: datetime) -> datetime:
+    """
+    Timestamps are stored as naive UTC, but a post created in this session
+    still holds the aware value it was written with. Both are sent with
+    +00:00, so a post looks the same in every response.
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def artifact_to_dict(artifact: Artifact) -> dict:
+    return {
+        "public_id": artifact.public_id,
+        "url": artifact.url,
+        "thumbnail_url": artifact.thumbnail_url,
+        "file_id": artifact.file_id,
+        "file_path": artifact.file_path,
+        "file_type": artifact.file_type,
+        "processing_status": artifact.processing_status,
+        "media_metadata": artifact.media_metadata,
+    }
+
+@Profiling.timed("serialize")
+def post_to_dict(post: Post, include_content: bool = True) -> dict:
+    data = {"public_id": post.public_id, "title": post.title}
+    if include_content:
+        data["content"] = post.content
+    data["created_at"] = as_utc(post.created_at)
+    data["updated_at"] = as_utc(post.updated_at)
+    data["artifacts"] = [artifact_to_dict(artifact) for artifact in post.artifacts]
+    return data
+
+@Profiling.timed("serialize")
+def posts_to_dicts(posts: list[Post], include_content: bool = True) -> list[dict]:
+    return [post_to_dict(post, include_content) for post in posts]
+
+@Profiling.timed("serialize")
+def dumps(data) -> bytes:
+    return orjson.dumps(data)
@@ -1,28 +1,128 @@
-from imagekitio import ImageKit
+import time
+import uuid
 
-import os
-from dotenv import load_dotenv
-load_dotenv()
+from app.config.settings import settings
+import app.services.cache as Cache
+import app.services.storage as Storage
+import app.profiling as Profiling
 
-imagekit = ImageKit(
-    private_key=os.getenv("IMAGEKIT_PRIVATE_KEY"),
-    public_key=os.getenv("IMAGEKIT_PUBLIC_KEY"),
-    url_endpoint=os.getenv("IMAGEKIT_URL")
-)
+# Signed URLs are cached until SIGNED_URL_REFRESH_MARGIN seconds before they expire
+SIGNED_URL_CACHE_SIZE = settings.signed_url_cache_size
+SIGNED_URL_REFRESH_MARGIN = settings.signed_url_refresh_margin
+
+# Most URLs or upload tokens returned by one batch request
+SIGNING_BATCH_MAX = settings.signing_batch_max
+
+# Upload tokens are valid for 30 minutes, like the ImageKit SDK's
+AUTH_PARAMS_EXPIRE_SECONDS = 60 * 30
+
+signed_url_cache = Cache.LRUCache(SIGNED_URL_CACHE_SIZE)
 
 def generate_auth_params():
-    params = imagekit.get_authentication_parameters()
-    params['public_key'] = os.getenv("IMAGEKIT_PUBLIC_KEY")
-    return params
+    return generate_auth_params_batch(1)[0]
+
+def generate_auth_params_batch(count: int) -> list[dict]:
+    """
+    `count` upload tokens for direct uploads to the storage provider, all
+    expiring at the same time.
+    """
+    provider = Storage.get_provider()
+    expire = int(time.time()) + AUTH_PARAMS_EXPIRE_SECONDS
+    return [provider.auth_params(str(uuid.uuid4()), expire) for _ in range(count)]
+
+def get_file_details(file_id: str) -> dict:
+    """
+    Thumbnail URL and media metadata of an uploaded file, from the storage
+    provider. Raises if the file can't be fetched.
+    """
+    return Storage.get_provider().file_details(file_id)
 
 # def generate_auth_params():
 #     return imagekit.get_authentication_parameters()
-    
+
+def signed_url_window(expire_seconds: int, now: float) -> tuple[int, int, int]:
+    """
+    Splits time into fixed windows of (expire_seconds - margin) seconds. Every URL
+    signed during a window expires `margin` seconds after the window ends, so it
+    is never valid for longer than expire_seconds, and it still has at least
+    `margin` seconds left whenever it is served from the cache.
+
+    Because the expiry only depends on the window, every worker signs the same
+    path to the same URL, which is what lets them share cached signatures.
+
+    Returns (bucket, bucket_end, expires_at).
+    """
+    margin = min(SIGNED_URL_REFRESH_MARGIN, expire_seconds // 2)
+    window = expire_seconds - margin
+    bucket = int(now // window)
+    bucket_end = (bucket + 1) * window
+    return bucket, bucket_end, bucket_end + margin
+
+def signed_url_ttl(expire_seconds=600) -> float:
+    """
+    Seconds until the URLs signed now stop being served from the cache. Anything
+    that embeds signed URLs must not be cached for longer than this.
+    """
+    now = time.time()
+    _, bucket_end, _ = signed_url_window(expire_seconds, now)
+    return bucket_end - now
+
+def signed_url_bucket(expire_seconds=600) -> tuple[int, int]:
+    """
+    The current signing window and the time it started. Responses embedding
+    signed URLs change when the window does, even if nothing else changed.
+    """
+    bucket, bucket_end, expires_at = signed_url_window(expire_seconds, time.time())
+    window = expire_seconds - (expires_at - bucket_end)
+    return bucket, bucket_end - window
+
+@Profiling.timed("sign")
 def generate_signed_url(file_path, expire_seconds=600):
-    signed_url = imagekit.url({
-        'path': file_path,
-        'signed': True,
-        'expire_seconds': expire_seconds 
-    })
-    
-    return signed_url
\ No newline at end of file
+    if expire_seconds < 2:
+        return sign_url(file_path, expire_seconds)
+
+    now = time.time()
+    bucket, bucket_end, expires_at = signed_url_window(expire_seconds, now)
+
+    return cached_signed_url(file_path, expire_seconds, now, bucket, bucket_end, expires_at)
+
+@Profiling.timed("sign")
+def generate_signed_urls(file_paths, expire_seconds=600) -> dict[str, str]:
+    """
+    Signed URLs for several paths, keyed by path. The time window is computed
+    once for the whole batch, so all URLs expire at the same time.
+    """
+    if expire_seconds < 2:
+        return {file_path: sign_url(file_path, expire_seconds) for file_path in file_paths}
+
+    now = time.time()
+    bucket, bucket_end, expires_at = signed_url_window(expire_seconds, now)
+    return {
+        file_path: cached_signed_url(file_path, expire_seconds, now, bucket, bucket_end, expires_at)
+        for file_path in dict.fromkeys(file_paths)
+    }
+
+def cached_signed_url(file_path, expire_seconds, now, bucket, bucket_end, expires_at) -> str:
+    key = (file_path, expire_seconds, bucket)
+    signed_url = signed_url_cache.get(key)
+    if signed_url is not None:
+        return signed_url
+
+    shared_key = f"signed_url:{Storage.STORAGE_PROVIDER}:{expire_seconds}:{bucket}:{file_path}"
+    cached = Cache.shared_backend.get(shared_key) if Cache.shared_backend else None
+    if cached is not None:
+        signed_url = cached.decode()
+    else:
+        signed_url = sign_path(file_path, expires_at)
+        if Cache.shared_backend:
+            Cache.shared_backend.set(shared_key, signed_url, bucket_end - now)
+
+    signed_url_cache.set(key, signed_url, bucket_end - now)
+    return signed_url
+
+def sign_url(file_path, expire_seconds):
+    return sign_path(file_path, int(time.time()) + expire_seconds)
+
+def sign_path(file_path: str, expires_at: int) -> str:
+    """Signs `file_path` until `expires_at` (a unix timestamp)."""
+    return Storage.get_provider().sign_path(file_path, expires_at)
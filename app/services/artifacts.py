@@ -1,5 +1,20 @@
+from uuid import uuid4
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
+from app.config.settings import settings
 from app.models.artifact import Artifact
+import app.services.artifact_processing as ArtifactProcessing
+import app.services.feed as Feed
+import app.services.jobs as Jobs
+import app.services.response_cache as ResponseCache
+
+# ARTIFACT_PROCESSING=true queues a process_artifacts job for every created
+# post's artifacts, which fetches their thumbnails and media metadata from
+# ImageKit outside the request. Run `python worker.py` to process the queue.
+ARTIFACT_PROCESSING = settings.artifact_processing
+
+def initial_processing_status() -> str:
+    return "pending" if ARTIFACT_PROCESSING else "done"
 
 def get_all_artifacts(db: Session):
     return db.query(Artifact).all()
@@ -16,10 +31,77 @@ def get_artifacts_between_ids(db: Session, start_id: int, end_id: int):
 def create_artifact(db: Session, post_id: int, attrs):
     artifact = Artifact(post_id=post_id, file_type=attrs.file_type, file_path=attrs.file_path, file_id=attrs.file_id, thumbnail_url=attrs.thumbnail_url)
     db.add(artifact)
+    db.flush()
+    Feed.append_artifacts(db, post_id, [artifact])
     db.commit()
     db.refresh(artifact)
     return artifact
 
-def create_artifacts(db: Session, post_id: int, artifacts: list[Artifact]):
+def create_artifacts(db: Session, post_id: int, artifacts: list[Artifact], commit: bool = True, update_feed: bool = True) -> list[Artifact]:
+    """
+    Inserts all artifacts of a post with a single multi-row INSERT ... RETURNING,
+    and returns the created rows in the same order as `artifacts`.
+
+    Pass commit=False to leave the rows in the caller's transaction, and
+    update_feed=False if the caller writes the post's feed entry itself.
+    """
+    if not artifacts:
+        return []
+
+    rows = [
+        {"public_id": uuid4(), "post_id": post_id, "file_type": attrs.file_type, "file_path": attrs.file_path, "file_id": attrs.file_id, "thumbnail_url": attrs.thumbnail_url, "processing_status": initial_processing_status()}
+        for attrs in artifacts
+    ]
+    returned = db.scalars(insert(Artifact).returning(Artifact), rows).all()
+
+    # RETURNING order is not guaranteed, so match rows back by their public_id
+    by_public_id = {artifact.public_id: artifact for artifact in returned}
+    created = [by_public_id[row["public_id"]] for row in rows]
+
+    enqueue_processing(db, created)
+    if update_feed:
+        Feed.append_artifacts(db, post_id, created)
+    if commit:
+        db.commit()
+    return created
+
+def enqueue_processing(db: Session, artifacts: list[Artifact]):
+    """Queues processing of new artifacts in the caller's transaction, if enabled."""
+    if ARTIFACT_PROCESSING and artifacts:
+        Jobs.enqueue(db, Jobs.PROCESS_ARTIFACTS, {"artifact_ids": [artifact.id for artifact in artifacts]})
+
+def mark_processing_failed(db: Session, payload: dict):
+    post_ids = db.scalars(
+        update(Artifact)
+        .where(Artifact.id.in_(payload["artifact_ids"]), Artifact.processing_status == "pending")
+        .values(processing_status="failed")
+        .returning(Artifact.post_id)
+    ).all()
+    Feed.refresh_entries(db, list(set(post_ids)))
+    ResponseCache.bump_generation(db)
+    db.commit()
+
+def process_artifacts(db: Session, payload: dict):
+    """
+    Fills in thumbnail_url and media_metadata of the pending artifacts and
+    drops the cached responses that still show them pending.
+    """
+    artifacts = db.scalars(
+        select(Artifact).where(Artifact.id.in_(payload["artifact_ids"]), Artifact.processing_status == "pending")
+    ).all()
+    if not artifacts:
+        return
+
     for artifact in artifacts:
-        create_artifact(db, post_id, artifact)
\ No newline at end of file
+        details = ArtifactProcessing.get_file_details(artifact.file_id)
+        artifact.thumbnail_url = details["thumbnail_url"] or artifact.thumbnail_url
+        artifact.media_metadata = details["metadata"]
+        artifact.processing_status = "done"
+    db.flush()
+    Feed.refresh_entries(db, list({artifact.post_id for artifact in artifacts}))
+    ResponseCache.bump_generation(db)
+    db.commit()
+
+def register_handlers():
+    """Called by worker.py, the only process that runs jobs."""
+    Jobs.register_handler(Jobs.PROCESS_ARTIFACTS, process_artifacts, on_failure=mark_processing_failed)
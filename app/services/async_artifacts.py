@@ -0,0 +1,52 @@
+from uuid import uuid4
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.artifact import Artifact
+import app.services.artifacts as Artifacts
+import app.services.feed as Feed
+
+async def get_all_artifacts(db: AsyncSession):
+    return (await db.scalars(select(Artifact))).all()
+
+async def get_artifacts_count(db: AsyncSession) -> int:
+    return await db.scalar(select(func.count()).select_from(Artifact))
+
+async def get_artifact_by_id(db: AsyncSession, public_id: int):
+    return await db.scalar(select(Artifact).where(Artifact.public_id == public_id).limit(1))
+
+async def get_artifacts_between_ids(db: AsyncSession, start_id: int, end_id: int):
+    return (await db.scalars(select(Artifact).where(Artifact.id.between(start_id, end_id)))).all()
+
+async def create_artifact(db: AsyncSession, post_id: int, attrs):
+    artifact = Artifact(post_id=post_id, file_type=attrs.file_type, file_path=attrs.file_path, file_id=attrs.file_id, thumbnail_url=attrs.thumbnail_url)
+    db.add(artifact)
+    await db.flush()
+    await db.run_sync(Feed.append_artifacts, post_id, [artifact])
+    await db.commit()
+    await db.refresh(artifact)
+    return artifact
+
+async def create_artifacts(db: AsyncSession, post_id: int, artifacts: list[Artifact], commit: bool = True, update_feed: bool = True) -> list[Artifact]:
+    """
+    Async version of artifacts.create_artifacts: one multi-row INSERT ... RETURNING,
+    rows returned in the same order as `artifacts`.
+    """
+    if not artifacts:
+        return []
+
+    rows = [
+        {"public_id": uuid4(), "post_id": post_id, "file_type": attrs.file_type, "file_path": attrs.file_path, "file_id": attrs.file_id, "thumbnail_url": attrs.thumbnail_url, "processing_status": Artifacts.initial_processing_status()}
+        for attrs in artifacts
+    ]
+    returned = (await db.scalars(insert(Artifact).returning(Artifact), rows)).all()
+
+    # RETURNING order is not guaranteed, so match rows back by their public_id
+    by_public_id = {artifact.public_id: artifact for artifact in returned}
+    created = [by_public_id[row["public_id"]] for row in rows]
+
+    await db.run_sync(Artifacts.enqueue_processing, created)
+    if update_feed:
+        await db.run_sync(Feed.append_artifacts, post_id, created)
+    if commit:
+        await db.commit()
+    return created
@@ -0,0 +1,118 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models.post import Post
+import app.services.async_artifacts as AsyncArtifacts
+import app.services.feed as Feed
+import app.services.post_counts as PostCounts
+import app.services.posts as Posts
+import app.services.response_cache as ResponseCache
+import app.services.search as Search
+
+# Async versions of the services in posts.py. Relationships cannot be lazy
+# loaded on an AsyncSession, so every query eager loads the artifacts.
+
+async def get_all_posts(db: AsyncSession):
+    return (await db.scalars(select(Post).options(*Posts.post_load_options()).order_by(Post.id.asc()))).all()
+
+async def get_posts_count(db: AsyncSession, strategy: str = None) -> tuple[int, bool]:
+    # The counting strategies are plain Session code, run on the async connection
+    return await db.run_sync(PostCounts.get_posts_count, strategy)
+
+# Version rows for HTTP validators (see Posts.version_columns)
+
+async def get_post_version(db: AsyncSession, public_id) -> tuple | None:
+    return await db.run_sync(Posts.get_post_version, public_id)
+
+async def get_page_versions(db: AsyncSession, offset: int, limit: int) -> list[tuple]:
+    return await db.run_sync(Posts.get_page_versions, offset, limit)
+
+async def get_cursor_page_versions(db: AsyncSession, cursor: str | None, limit: int) -> list[tuple]:
+    return await db.run_sync(Posts.get_cursor_page_versions, cursor, limit)
+
+async def get_cursor_page_range(db: AsyncSession, cursor: str | None, limit: int) -> tuple[int | None, int | None, str | None]:
+    if Feed.FEED_ENTRIES:
+        return await db.run_sync(Feed.get_entries_page_range, cursor, limit)
+    return await db.run_sync(Posts.get_cursor_page_range, cursor, limit)
+
+async def search_posts(db: AsyncSession, q: str, cursor: str | None, limit: int, include_content: bool = True):
+    """
+    Async version of search.search_posts.
+    """
+    rows = (await db.execute(Search.search_page_query(db.get_bind().dialect.name, q, cursor, limit))).all()
+    ids, next_cursor = Search.paginate(rows, limit)
+    if not ids:
+        return [], next_cursor
+
+    posts = (await db.scalars(select(Post).options(*Posts.post_load_options(include_content)).where(Post.id.in_(ids)))).all()
+    return Search.order_by_ids(posts, ids), next_cursor
+
+async def get_post_by_id(db: AsyncSession, public_id: int):
+    return await db.scalar(select(Post).options(*Posts.post_load_options()).where(Post.public_id == public_id).limit(1))
+
+async def get_latest_posts_with_pagination(db: AsyncSession, offset: int, limit: int, include_content: bool = True):
+    """
+    Async version of posts.get_latest_posts_with_pagination.
+    """
+    return (await db.scalars(
+        select(Post)
+        .options(*Posts.post_load_options(include_content))
+        .where(Post.id.in_(Posts.page_ids(offset, limit)))
+        .order_by(Post.id.desc())
+    )).all()
+
+async def get_latest_posts_after_cursor(db: AsyncSession, cursor: str | None, limit: int, include_content: bool = True):
+    """
+    Async version of posts.get_latest_posts_after_cursor.
+    """
+    query = select(Post).options(*Posts.post_load_options(include_content))
+
+    if cursor:
+        query = query.where(Post.id < Posts.decode_cursor(cursor))
+
+    # Fetch one extra row to find out whether there is a next page
+    posts = (await db.scalars(query.order_by(Post.id.desc()).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = Posts.encode_cursor(posts[-1])
+
+    return posts, next_cursor
+
+async def stream_posts(db: AsyncSession, first_id: int, last_id: int, include_content: bool = True, batch_size: int = 100):
+    """
+    Async version of posts.stream_posts (and feed.stream_entries when the
+    feed is read from feed_entries).
+    """
+    if Feed.FEED_ENTRIES:
+        result = await db.stream_scalars(Feed.stream_query(first_id, last_id, include_content).execution_options(yield_per=batch_size))
+        async for entries in result.partitions():
+            yield Feed.entries_to_dicts(entries, include_content)
+        return
+
+    result = await db.stream_scalars(Posts.stream_query(first_id, last_id, include_content).execution_options(yield_per=batch_size))
+    async for posts in result.partitions():
+        yield Posts.posts_batch_to_dicts(posts, include_content)
+        Posts.expunge_posts(db.sync_session, posts)
+
+async def create_post(db: AsyncSession, title: str, content: str, artifacts=None):
+    """
+    Async version of posts.create_post: the post, the posts counter and the
+    artifacts are written in one transaction.
+    """
+    post = Post(title=title, content=content)
+    db.add(post)
+    await db.flush()
+
+    created = await AsyncArtifacts.create_artifacts(db, post.id, artifacts or [], commit=False, update_feed=False)
+    set_committed_value(post, "artifacts", created)
+    await db.run_sync(Feed.add_entry, post, created)
+    await db.run_sync(ResponseCache.bump_generation, new_posts=1)
+
+    await db.commit()
+    return post
+
+def load_artifacts(post: Post):
+    # Signing is CPU work and needs no database access
+    Posts.load_artifacts(post)
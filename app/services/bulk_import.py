@@ -0,0 +1,166 @@
+from typing import AsyncIterable, Iterable, Iterator
+from uuid import uuid4
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.config.settings import settings
+from app.models.artifact import Artifact
+from app.models.post import Post
+from app.schemas import PostCreate
+import app.services.artifacts as Artifacts
+import app.services.feed as Feed
+import app.services.response_cache as ResponseCache
+
+# Posts written per transaction. Each chunk is one multi-row INSERT for the
+# posts and one for their artifacts, so memory stays bounded by the chunk size
+# whatever the size of the input.
+BULK_IMPORT_CHUNK_SIZE = settings.bulk_import_chunk_size
+
+# A single NDJSON line larger than this is rejected instead of being buffered
+MAX_LINE_BYTES = 1024 * 1024
+
+# Rejected lines reported per chunk; the rest are only counted
+MAX_REPORTED_ERRORS = 20
+
+def parse_line(raw: str | bytes) -> PostCreate:
+    """
+    Validates one NDJSON line against the same schema as POST /posts.
+    Raises ValueError (ValidationError is a subclass) if the line is not a valid post.
+    """
+    return PostCreate.model_validate_json(raw)
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, err['loc']))}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in error.errors()
+    )
+
+def insert_posts(db: Session, posts: list[PostCreate]):
+    """
+    Inserts posts and their artifacts with two multi-row INSERTs, inside the
+    caller's transaction. Artifacts are queued for processing like those of
+    POST /posts (see Artifacts.create_artifacts).
+    """
+    post_rows = [{"public_id": uuid4(), "title": post.title, "content": post.content} for post in posts]
+    returned = db.execute(insert(Post).returning(Post.id, Post.public_id), post_rows).all()
+
+    # RETURNING order is not guaranteed, so match ids back by public_id
+    ids = {public_id: id for id, public_id in returned}
+    artifact_rows = [
+        {"public_id": uuid4(), "post_id": ids[row["public_id"]], "file_type": attrs.file_type, "file_path": attrs.file_path, "file_id": attrs.file_id, "thumbnail_url": attrs.thumbnail_url, "processing_status": Artifacts.initial_processing_status()}
+        for row, post in zip(post_rows, posts)
+        for attrs in post.artifacts or []
+    ]
+    if artifact_rows:
+        created = db.execute(insert(Artifact).returning(Artifact.id, Artifact.post_id), artifact_rows).all()
+        # One job per post, as for posts created one at a time
+        by_post = {}
+        for artifact in created:
+            by_post.setdefault(artifact.post_id, []).append(artifact)
+        for post_artifacts in by_post.values():
+            Artifacts.enqueue_processing(db, post_artifacts)
+    Feed.refresh_entries(db, list(ids.values()))
+
+def import_chunk(db: Session, chunk_no: int, lines: list[tuple[int, str | bytes]]) -> dict:
+    """
+    Validates and writes one chunk of numbered NDJSON lines in a single
+    transaction. Invalid lines are skipped and reported; if the insert itself
+    fails, the whole chunk is rolled back and nothing from it is written.
+    """
+    posts, rejected, errors = [], 0, []
+    for line_no, raw in lines:
+        try:
+            posts.append(parse_line(raw))
+        except ValidationError as e:
+            rejected += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line_no, "error": format_validation_error(e)})
+
+    result = {
+        "chunk": chunk_no,
+        "first_line": lines[0][0],
+        "last_line": lines[-1][0],
+        "imported": 0,
+        "rejected": rejected,
+        "errors": errors,
+    }
+    if not posts:
+        return result
+
+    try:
+        insert_posts(db, posts)
+        # Cached feed pages no longer include every post
+        ResponseCache.bump_generation(db, new_posts=len(posts))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        result["error"] = str(e.__cause__ or e).splitlines()[0]
+        return result
+
+    result["imported"] = len(posts)
+    return result
+
+def iter_chunks(lines: Iterable[str | bytes], chunk_size: int = None) -> Iterator[tuple[int, list]]:
+    """
+    Groups non-blank lines into numbered chunks of (line number, line) pairs.
+    """
+    chunk_size = chunk_size or BULK_IMPORT_CHUNK_SIZE
+    chunk_no, chunk = 1, []
+    for line_no, raw in enumerate(lines, start=1):
+        if not raw.strip():
+            continue
+        chunk.append((line_no, raw))
+        if len(chunk) >= chunk_size:
+            yield chunk_no, chunk
+            chunk_no, chunk = chunk_no + 1, []
+    if chunk:
+        yield chunk_no, chunk
+
+def import_posts(db: Session, lines: Iterable[str | bytes], chunk_size: int = None) -> Iterator[dict]:
+    """
+    Imports an NDJSON stream of posts chunk by chunk, yielding each chunk's
+    result as soon as it is committed.
+    """
+    for chunk_no, chunk in iter_chunks(lines, chunk_size):
+        yield import_chunk(db, chunk_no, chunk)
+
+async def aiter_chunks(lines: AsyncIterable[bytes], chunk_size: int = None):
+    """
+    Async counterpart of iter_chunks for lines read from a request body.
+    """
+    chunk_size = chunk_size or BULK_IMPORT_CHUNK_SIZE
+    chunk_no, chunk, line_no = 1, [], 0
+    async for raw in lines:
+        line_no += 1
+        if not raw.strip():
+            continue
+        chunk.append((line_no, raw))
+        if len(chunk) >= chunk_size:
+            yield chunk_no, chunk
+            chunk_no, chunk = chunk_no + 1, []
+    if chunk:
+        yield chunk_no, chunk
+
+async def aiter_lines(byte_chunks: AsyncIterable[bytes]):
+    """
+    Splits a streamed request body into lines without buffering more than one
+    line at a time. Raises ValueError for a line above MAX_LINE_BYTES.
+    """
+    buffer = b""
+    async for data in byte_chunks:
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+        if len(buffer) > MAX_LINE_BYTES:
+            raise ValueError(f"Line longer than {MAX_LINE_BYTES} bytes")
+    if buffer:
+        yield buffer
+
+def summarize(results: list[dict]) -> dict:
+    return {
+        "imported": sum(result["imported"] for result in results),
+        "rejected": sum(result["rejected"] for result in results),
+        "failed_chunks": sum(1 for result in results if "error" in result),
+        "chunks": results,
+    }
@@ -0,0 +1,94 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from app.config.settings import settings
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with a per-entry time to live.
+
+    Expired entries are dropped lazily when they are read, and the least
+    recently used entry is evicted once the cache holds `maxsize` items.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.memory_bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.time():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def set(self, key, value, ttl: float):
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, time.time() + ttl)
+            self.memory_bytes += sys.getsizeof(key) + sys.getsizeof(value)
+            while len(self._data) > self.maxsize:
+                self._remove(next(iter(self._data)))
+
+    def _remove(self, key):
+        value, _ = self._data.pop(key)
+        self.memory_bytes -= sys.getsizeof(key) + sys.getsizeof(value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.memory_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                # Shallow size of the cached keys and values
+                "memory_bytes": self.memory_bytes,
+            }
+
+class RedisBackend:
+    """
+    Cache shared by every worker process, backed by Redis. Only needed when the
+    app runs with several uvicorn workers; requires the `redis` extra.
+    """
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> bytes | None:
+        return self._client.get(key)
+
+    def set(self, key: str, value, ttl: float):
+        ttl_ms = int(ttl * 1000)
+        if ttl_ms > 0:
+            self._client.set(key, value, px=ttl_ms)
+
+def get_shared_backend(url: str | None) -> RedisBackend | None:
+    if not url:
+        return None
+    return RedisBackend(url)
+
+# Set CACHE_REDIS_URL to share cached values between worker processes
+shared_backend = get_shared_backend(settings.cache_redis_url)
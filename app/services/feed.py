@@ -0,0 +1,170 @@
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session, defer, selectinload
+from app.config.settings import settings
+from app.models.artifact import Artifact
+from app.models.feed_entry import FeedEntry
+from app.models.post import Post
+import app.serialization as Serialization
+import app.services.artifact_processing as ArtifactProcessing
+import app.services.posts as Posts
+
+# Where GET /posts reads from:
+#   posts         - posts joined with their artifacts on every request (default)
+#   feed_entries  - the denormalized feed_entries table, one row per post with
+#                   its artifacts as JSON, so a page is a single query
+#
+# feed_entries is only kept up to date while it is the source; run
+# `python seed.py rebuild-feed` after switching to it.
+SOURCES = ("posts", "feed_entries")
+
+FEED_SOURCE = settings.feed_source
+
+if FEED_SOURCE not in SOURCES:
+    raise ValueError(f"FEED_SOURCE must be one of {SOURCES}, got {FEED_SOURCE!r}")
+
+FEED_ENTRIES = FEED_SOURCE == "feed_entries"
+
+REBUILD_BATCH_SIZE = 1000
+
+def artifact_entry(artifact: Artifact) -> dict:
+    # Same keys and order as Serialization.artifact_to_dict; url is signed on read
+    return {
+        "public_id": str(artifact.public_id),
+        "url": None,
+        "thumbnail_url": artifact.thumbnail_url,
+        "file_id": artifact.file_id,
+        "file_path": artifact.file_path,
+        "file_type": artifact.file_type,
+        "processing_status": artifact.processing_status,
+        "media_metadata": artifact.media_metadata,
+    }
+
+def entry_values(post: Post, artifacts: list[Artifact]) -> dict:
+    return {
+        "id": post.id,
+        "public_id": post.public_id,
+        "title": post.title,
+        "content": post.content,
+        "created_at": post.created_at,
+        "updated_at": post.updated_at,
+        "artifacts": [artifact_entry(artifact) for artifact in artifacts],
+    }
+
+def add_entry(db: Session, post: Post, artifacts: list[Artifact]):
+    """Adds the entry of a new post to the caller's transaction."""
+    if FEED_ENTRIES:
+        db.add(FeedEntry(**entry_values(post, artifacts)))
+
+def append_artifacts(db: Session, post_id: int, artifacts: list[Artifact]):
+    """Adds artifacts created for an existing post to its entry."""
+    if not FEED_ENTRIES or not artifacts:
+        return
+    entry = db.get(FeedEntry, post_id)
+    if entry is None:
+        refresh_entries(db, [post_id])
+        return
+    # Assigned as a new list, in-place changes of a JSON column are not tracked
+    entry.artifacts = entry.artifacts + [artifact_entry(artifact) for artifact in artifacts]
+
+def insert_entries(db: Session, posts: list[Post]):
+    db.execute(insert(FeedEntry), [entry_values(post, sorted(post.artifacts, key=lambda artifact: artifact.id)) for post in posts])
+
+def refresh_entries(db: Session, post_ids: list[int]):
+    """Re-renders the entries of the given posts from posts/artifacts, in the caller's transaction."""
+    if not FEED_ENTRIES or not post_ids:
+        return
+    posts = db.query(Post).options(selectinload(Post.artifacts)).filter(Post.id.in_(post_ids)).all()
+    db.execute(delete(FeedEntry).where(FeedEntry.id.in_(post_ids)))
+    if posts:
+        insert_entries(db, posts)
+
+def rebuild(db: Session, batch_size: int = REBUILD_BATCH_SIZE):
+    """
+    Regenerates feed_entries from posts and artifacts, oldest posts first.
+    Every batch replaces its entries in one transaction, so the feed stays
+    readable throughout. Yields the number of entries written so far.
+    """
+    written = 0
+    last_id = 0
+    while True:
+        posts = (
+            db.query(Post)
+            .options(selectinload(Post.artifacts))
+            .filter(Post.id > last_id)
+            .order_by(Post.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not posts:
+            break
+        db.execute(delete(FeedEntry).where(FeedEntry.id.between(last_id + 1, posts[-1].id)))
+        insert_entries(db, posts)
+        db.commit()
+        db.expunge_all()
+        written += len(posts)
+        last_id = posts[-1].id
+        yield written
+
+    # Entries past the newest post
+    db.execute(delete(FeedEntry).where(FeedEntry.id > last_id))
+    db.commit()
+
+def entries_to_dicts(entries: list[FeedEntry], include_content: bool = True) -> list[dict]:
+    """
+    Post response dicts (see app/serialization.py) for the entries. All
+    artifact URLs of the page are signed in one pass.
+    """
+    signed_urls = ArtifactProcessing.generate_signed_urls(
+        [artifact["file_path"] for entry in entries for artifact in entry.artifacts]
+    )
+    posts = []
+    for entry in entries:
+        data = {"public_id": entry.public_id, "title": entry.title}
+        if include_content:
+            data["content"] = entry.content
+        data["created_at"] = Serialization.as_utc(entry.created_at)
+        data["updated_at"] = Serialization.as_utc(entry.updated_at)
+        data["artifacts"] = [{**artifact, "url": signed_urls[artifact["file_path"]]} for artifact in entry.artifacts]
+        posts.append(data)
+    return posts
+
+def entries_query(include_content: bool):
+    query = select(FeedEntry)
+    if not include_content:
+        query = query.options(defer(FeedEntry.content))
+    return query
+
+def get_entries_with_pagination(db: Session, offset: int, limit: int, include_content: bool = True) -> list[dict]:
+    # Skipped entries are walked on the index, without reading their rows
+    query = entries_query(include_content).where(FeedEntry.id.in_(Posts.page_ids(offset, limit, FeedEntry.id)))
+    entries = db.scalars(query.order_by(FeedEntry.id.desc())).all()
+    return entries_to_dicts(entries, include_content)
+
+def get_entries_after_cursor(db: Session, cursor: str | None, limit: int, include_content: bool = True) -> tuple[list[dict], str | None]:
+    """
+    feed_entries version of Posts.get_latest_posts_after_cursor, with the same
+    cursors. Returns the post dicts and the cursor for the next page.
+    """
+    query = entries_query(include_content)
+    if cursor:
+        query = query.where(FeedEntry.id < Posts.decode_cursor(cursor))
+    entries = db.scalars(query.order_by(FeedEntry.id.desc()).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = Posts.encode_cursor(entries[-1])
+
+    return entries_to_dicts(entries, include_content), next_cursor
+
+def get_entries_page_range(db: Session, cursor: str | None, limit: int) -> tuple[int | None, int | None, str | None]:
+    return Posts.get_cursor_page_range(db, cursor, limit, FeedEntry.id)
+
+def stream_query(first_id: int, last_id: int, include_content: bool = True):
+    return entries_query(include_content).where(FeedEntry.id.between(last_id, first_id)).order_by(FeedEntry.id.desc())
+
+def stream_entries(db: Session, first_id: int, last_id: int, include_content: bool = True, batch_size: int = 100):
+    """feed_entries version of Posts.stream_posts."""
+    query = stream_query(first_id, last_id, include_content).execution_options(yield_per=batch_size)
+    for entries in db.scalars(query).partitions():
+        yield entries_to_dicts(entries, include_content)
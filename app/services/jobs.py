@@ -0,0 +1,147 @@
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+from app.config.settings import settings
+from app.config.database import SessionLocal
+from app.models.job import Job
+
+# Durable job queue in the `jobs` table. Jobs are added in the transaction of
+# the request that needs them, so they are only visible once that commits, and
+# worker processes (worker.py) claim them with SELECT ... FOR UPDATE SKIP
+# LOCKED, so any number of workers can poll without blocking each other.
+#
+# Delivery is at least once: a worker that dies mid-job leaves it `running`
+# until JOB_LOCK_TIMEOUT passes and it is queued again, so handlers must be
+# idempotent.
+JOB_BATCH_SIZE = settings.job_batch_size
+JOB_POLL_INTERVAL = settings.job_poll_interval
+JOB_MAX_ATTEMPTS = settings.job_max_attempts
+JOB_RETRY_DELAY = settings.job_retry_delay
+JOB_LOCK_TIMEOUT = settings.job_lock_timeout
+
+QUEUED = "queued"
+RUNNING = "running"
+FAILED = "failed"
+
+PROCESS_ARTIFACTS = "process_artifacts"
+
+logger = logging.getLogger(__name__)
+
+# kind -> (handler, on_failure); both are called as fn(db, payload)
+handlers = {}
+
+def register_handler(kind: str, fn, on_failure=None):
+    """
+    Makes `fn` the handler for `kind` jobs. `on_failure` runs once a job has
+    used up JOB_MAX_ATTEMPTS.
+    """
+    handlers[kind] = (fn, on_failure)
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def enqueue(db: Session, kind: str, payload: dict, delay: float = 0) -> Job:
+    """Adds a job to the caller's transaction; it is not committed here."""
+    job = Job(kind=kind, payload=payload, status=QUEUED, run_at=utcnow() + timedelta(seconds=delay))
+    db.add(job)
+    return job
+
+def claim_jobs(db: Session, limit: int) -> list[Job]:
+    """
+    Marks up to `limit` due jobs as running and returns them. Rows locked by
+    another worker's claim are skipped instead of waited for. SQLite has no
+    row locks, but it runs the single UPDATE atomically.
+    """
+    now = utcnow()
+    claimable = (
+        select(Job.id)
+        .where(Job.status == QUEUED, Job.run_at <= now)
+        .order_by(Job.run_at, Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    jobs = db.scalars(
+        update(Job)
+        .where(Job.id.in_(claimable.scalar_subquery()))
+        .values(status=RUNNING, locked_at=now, attempts=Job.attempts + 1)
+        .returning(Job),
+        execution_options={"synchronize_session": False},
+    ).all()
+    db.commit()
+    return jobs
+
+def requeue_stale_jobs(db: Session) -> int:
+    """Queues jobs again whose worker has not finished them within JOB_LOCK_TIMEOUT."""
+    result = db.execute(
+        update(Job)
+        .where(Job.status == RUNNING, Job.locked_at < utcnow() - timedelta(seconds=JOB_LOCK_TIMEOUT))
+        .values(status=QUEUED, locked_at=None)
+    )
+    db.commit()
+    return result.rowcount
+
+def retry_delay(attempts: int) -> float:
+    return min(JOB_RETRY_DELAY * 2 ** (attempts - 1), 3600)
+
+def run_job(job: Job):
+    """
+    Runs a claimed job in its own session. Finished jobs are deleted; failed
+    ones are retried with exponential backoff until JOB_MAX_ATTEMPTS.
+    """
+    db = SessionLocal()
+    try:
+        try:
+            fn, on_failure = handlers[job.kind]
+            fn(db, job.payload)
+        except Exception as e:
+            db.rollback()
+            logger.exception("Job %s (%s) failed on attempt %d", job.id, job.kind, job.attempts)
+            fail_job(db, job, e)
+            return
+        db.execute(delete(Job).where(Job.id == job.id))
+        db.commit()
+    finally:
+        db.close()
+
+def fail_job(db: Session, job: Job, error: Exception):
+    values = {"locked_at": None, "last_error": f"{type(error).__name__}: {error}"[:1000]}
+    if job.attempts < JOB_MAX_ATTEMPTS and job.kind in handlers:
+        values.update(status=QUEUED, run_at=utcnow() + timedelta(seconds=retry_delay(job.attempts)))
+    else:
+        values.update(status=FAILED)
+        _, on_failure = handlers.get(job.kind, (None, None))
+        if on_failure is not None:
+            on_failure(db, job.payload)
+    db.execute(update(Job).where(Job.id == job.id).values(**values))
+    db.commit()
+
+def work(batch_size: int = None) -> int:
+    """Claims and runs one batch of jobs; returns how many were claimed."""
+    db = SessionLocal()
+    try:
+        requeue_stale_jobs(db)
+        jobs = claim_jobs(db, batch_size or JOB_BATCH_SIZE)
+    finally:
+        db.close()
+
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
+
+def run_worker(stop: threading.Event, batch_size: int = None, poll_interval: float = None, drain: bool = False):
+    """
+    Runs jobs until `stop` is set, sleeping `poll_interval` seconds whenever the
+    queue is empty. With drain=True it returns as soon as the queue is empty.
+    """
+    poll_interval = JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+    while not stop.is_set():
+        if work(batch_size) == 0:
+            if drain:
+                return
+            stop.wait(poll_interval)
+
+def queue_stats(db: Session) -> dict:
+    rows = db.execute(select(Job.status, func.count()).group_by(Job.status)).all()
+    return {status: count for status, count in rows}
@@ -0,0 +1,139 @@
+import threading
+import time
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from app.config.settings import settings
+from app.models.counter import Counter
+from app.models.post import Post
+import app.profiling as Profiling
+
+# How GET /posts gets its total:
+#   exact    - SELECT count(*) on every request (slow on large tables)
+#   counter  - read the `counters` row that create_post keeps current. The
+#              row is only maintained under this strategy; run
+#              `python seed.py recount-posts` after switching to it
+#   estimate - planner estimate from pg_class.reltuples (Postgres only)
+#   cached   - exact count, cached in-process for POST_COUNT_CACHE_TTL seconds
+STRATEGIES = ("exact", "counter", "estimate", "cached")
+
+POST_COUNT_STRATEGY = settings.post_count_strategy
+POST_COUNT_CACHE_TTL = settings.post_count_cache_ttl
+
+if POST_COUNT_STRATEGY not in STRATEGIES:
+    raise ValueError(f"POST_COUNT_STRATEGY must be one of {STRATEGIES}, got {POST_COUNT_STRATEGY!r}")
+
+POSTS_COUNTER = "posts"
+
+_cache_lock = threading.Lock()
+_cached_count = None
+_cached_until = 0.0
+
+@Profiling.timed("count")
+def get_posts_count(db: Session, strategy: str = None) -> tuple[int, bool]:
+    """
+    Returns the number of posts and whether that number is exact (False means
+    it is an estimate or may be stale).
+    """
+    strategy = strategy or POST_COUNT_STRATEGY
+
+    if strategy == "counter":
+        value = db.execute(select(Counter.value).where(Counter.name == POSTS_COUNTER)).scalar()
+        if value is not None:
+            return value, True
+    elif strategy == "estimate":
+        value = get_estimated_posts_count(db)
+        if value is not None:
+            return value, False
+    elif strategy == "cached":
+        return get_cached_posts_count(db), False
+
+    return get_exact_posts_count(db), True
+
+def get_exact_posts_count(db: Session) -> int:
+    return db.query(Post).count()
+
+def get_estimated_posts_count(db: Session) -> int | None:
+    """
+    Reads the planner's row estimate for `posts`. Returns None when it is not
+    available: on databases other than Postgres, or before the table has been
+    analyzed (reltuples is -1 then).
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+
+    value = db.execute(text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'posts'::regclass")).scalar()
+    if value is None or value < 0:
+        return None
+    return value
+
+def get_cached_posts_count(db: Session) -> int:
+    global _cached_count, _cached_until
+
+    with _cache_lock:
+        if _cached_count is not None and time.monotonic() < _cached_until:
+            return _cached_count
+
+    count = get_exact_posts_count(db)
+
+    with _cache_lock:
+        _cached_count = count
+        _cached_until = time.monotonic() + POST_COUNT_CACHE_TTL
+    return count
+
+# Postgres and SQLite (3.24+) both have this upsert. Under concurrent
+# writers the losing INSERT turns into the UPDATE, so no increment is lost.
+def increment_counters_statement(count: int):
+    values = ", ".join(f"(:name_{i}, :by_{i})" for i in range(count))
+    return text(
+        f"INSERT INTO counters (name, value) VALUES {values} "
+        "ON CONFLICT (name) DO UPDATE SET value = counters.value + excluded.value"
+    )
+
+# The migration seeds the posts counter; tables made by create_all get it
+# here. SQLite needs the WHERE to parse ON CONFLICT after a SELECT.
+SEED_POSTS_COUNTER = text(
+    "INSERT INTO counters (name, value) SELECT :name, count(*) FROM posts WHERE true "
+    "ON CONFLICT (name) DO NOTHING"
+)
+
+RECOUNT_POSTS_COUNTER = text(
+    "INSERT INTO counters (name, value) SELECT :name, count(*) FROM posts WHERE true "
+    "ON CONFLICT (name) DO UPDATE SET value = excluded.value"
+)
+
+def seed_posts_counter(db):
+    """Creates the posts counter row from the real count if it is missing."""
+    db.execute(SEED_POSTS_COUNTER, {"name": POSTS_COUNTER})
+
+def recount_posts(db: Session):
+    """Resets the posts counter row to the real count."""
+    db.execute(RECOUNT_POSTS_COUNTER, {"name": POSTS_COUNTER})
+
+def increment_counters(db: Session, increments: dict[str, int]):
+    """
+    Adds to rows of `counters` ({name: by}) with a single upsert inside the
+    caller's transaction, so they commit or roll back together with the
+    caller's writes. A missing row starts at `by`. Rows are locked in name
+    order, so concurrent writers cannot deadlock on them.
+    """
+    if not increments:
+        return
+    params = {}
+    for i, name in enumerate(sorted(increments)):
+        params[f"name_{i}"], params[f"by_{i}"] = name, increments[name]
+    db.execute(increment_counters_statement(len(increments)), params)
+
+def increment_counter(db: Session, name: str, by: int = 1):
+    increment_counters(db, {name: by})
+
+def posts_counter_increment(by: int) -> dict[str, int]:
+    """The posts counter is only maintained under the counter strategy."""
+    return {POSTS_COUNTER: by} if POST_COUNT_STRATEGY == "counter" and by else {}
+
+def increment_posts_counter(db: Session, by: int = 1):
+    """
+    Bumps the posts counter together with the new posts, under the counter
+    strategy only. Every writer updates this one row, so call it right before
+    the commit: its row lock is then held for as short as possible.
+    """
+    increment_counters(db, posts_counter_increment(by))
@@ -1,37 +1,231 @@
-from sqlalchemy.orm import Session, joinedload
+import base64
+import json
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, defer, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from app.models.artifact import Artifact
 from app.models.post import Post
 import app.services.artifact_processing as ArtifactProcessing
+import app.services.artifacts as Artifacts
+import app.services.feed as Feed
+import app.services.response_cache as ResponseCache
+import app.serialization as Serialization
+from app.config.settings import settings
+
+# Largest page_size the feed and search endpoints accept, streamed pages included
+MAX_PAGE_SIZE = settings.max_page_size
+
+# Artifact columns the post responses use (keys included so rows can be matched
+# to their posts); created_at/updated_at are never sent to clients
+ARTIFACT_RESPONSE_COLUMNS = (
+    Artifact.id,
+    Artifact.post_id,
+    Artifact.public_id,
+    Artifact.url,
+    Artifact.thumbnail_url,
+    Artifact.file_id,
+    Artifact.file_path,
+    Artifact.file_type,
+    Artifact.processing_status,
+    Artifact.media_metadata,
+)
+
+def post_load_options(include_content: bool = True) -> list:
+    """
+    Loader options shared by the feed and detail queries. Artifacts are fetched
+    by a second `WHERE post_id IN (...)` query instead of a JOIN, so post
+    columns are not repeated once per artifact and LIMIT applies to posts
+    directly instead of through a wrapping subquery.
+    """
+    options = [selectinload(Post.artifacts).load_only(*ARTIFACT_RESPONSE_COLUMNS)]
+    if not include_content:
+        options.append(defer(Post.content))
+    return options
+
+def version_columns() -> tuple:
+    """
+    (id, updated_at, artifacts' newest updated_at, artifact count) of a post,
+    enough to tell whether its response changed. The artifact columns are
+    correlated subqueries on the artifacts.post_id index.
+    """
+    return (
+        Post.id,
+        Post.updated_at,
+        select(func.max(Artifact.updated_at)).where(Artifact.post_id == Post.id).correlate(Post).scalar_subquery(),
+        select(func.count(Artifact.id)).where(Artifact.post_id == Post.id).correlate(Post).scalar_subquery(),
+    )
+
+def get_post_version(db: Session, public_id) -> tuple | None:
+    return db.execute(select(*version_columns()).where(Post.public_id == public_id)).first()
+
+def page_ids(offset: int, limit: int, id_column=Post.id):
+    """
+    Subquery of the ids on an offset page, newest first. Postgres answers it
+    from the primary key index without reading the skipped rows, so the
+    queries built on it only read (and compute columns for) the page's rows.
+    """
+    return select(id_column).order_by(id_column.desc()).offset(offset).limit(limit).scalar_subquery()
+
+def get_page_versions(db: Session, offset: int, limit: int) -> list[tuple]:
+    return db.execute(select(*version_columns()).where(Post.id.in_(page_ids(offset, limit))).order_by(Post.id.desc())).all()
+
+def get_cursor_page_versions(db: Session, cursor: str | None, limit: int) -> list[tuple]:
+    """
+    Versions of the posts on a cursor page, plus the first post of the next
+    page, whose presence decides next_cursor. Raises ValueError for a bad cursor.
+    """
+    query = select(*version_columns())
+    if cursor:
+        query = query.where(Post.id < decode_cursor(cursor))
+    return db.execute(query.order_by(Post.id.desc()).limit(limit + 1)).all()
 
 def get_all_posts(db: Session):
-    return db.query(Post).options(joinedload(Post.artifacts)).order_by(Post.id.asc()).all()
+    return db.query(Post).options(*post_load_options()).order_by(Post.id.asc()).all()
 
 def get_posts_count(db: Session) -> int:
     return db.query(Post).count()
 
 def get_post_by_id(db: Session, public_id: int):
-    return db.query(Post).options(joinedload(Post.artifacts)).filter(Post.public_id == public_id).first()
+    return db.query(Post).options(*post_load_options()).filter(Post.public_id == public_id).first()
 
-def get_latest_posts_with_pagination(db: Session, offset: int, limit: int):
+def get_latest_posts_with_pagination(db: Session, offset: int, limit: int, include_content: bool = True):
     """
     Fetches posts, ordered by ID descending (newest first), with pagination.
+
+    The page is resolved on ids alone first (see page_ids), and only the posts
+    on the page are then hydrated.
     """
     return (
         db.query(Post)
-        .options(joinedload(Post.artifacts))
+        .options(*post_load_options(include_content))
+        .filter(Post.id.in_(page_ids(offset, limit)))
         .order_by(Post.id.desc())
-        .offset(offset)            
-        .limit(limit)
         .all()
     )
 
-def create_post(db: Session, title: str, content: str):
+def encode_cursor(post: Post) -> str:
+    """
+    Builds an opaque cursor pointing at the given post's position in the feed.
+    """
+    raw = json.dumps({"id": post.id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Reverses encode_cursor. Raises ValueError if the cursor was not produced by us.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return int(json.loads(raw)["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def get_latest_posts_after_cursor(db: Session, cursor: str | None, limit: int, include_content: bool = True):
+    """
+    Fetches posts ordered by ID descending (newest first), starting right after
+    the cursor position (or from the newest post if no cursor is given).
+
+    Unlike OFFSET, the `id < :cursor` condition lets Postgres seek straight to the
+    position through the primary key index, so the cost of a page does not grow
+    with its depth. The ordering is the same as the page/page_size mode and is
+    stable because ids are unique and never reused.
+
+    Returns the posts and the cursor for the next page (None on the last page).
+    """
+    query = db.query(Post).options(*post_load_options(include_content))
+
+    if cursor:
+        query = query.filter(Post.id < decode_cursor(cursor))
+
+    # Fetch one extra row to find out whether there is a next page
+    posts = (
+        query
+        .order_by(Post.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_cursor(posts[-1])
+
+    return posts, next_cursor
+
+def get_cursor_page_range(db: Session, cursor: str | None, limit: int, id_column=Post.id) -> tuple[int | None, int | None, str | None]:
+    """
+    Resolves a cursor page to its id range without loading it, for streaming.
+    Returns the newest and oldest id on the page (None, None for an empty page)
+    and the cursor for the next page. Raises ValueError for a bad cursor.
+    """
+    query = select(id_column.label("id"))
+    if cursor:
+        query = query.where(id_column < decode_cursor(cursor))
+    rows = db.execute(query.order_by(id_column.desc()).limit(limit + 1)).all()
+    if not rows:
+        return None, None, None
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1])
+    return rows[0].id, rows[-1].id, next_cursor
+
+def stream_query(first_id: int, last_id: int, include_content: bool = True):
+    return (
+        select(Post)
+        .options(*post_load_options(include_content))
+        .where(Post.id.between(last_id, first_id))
+        .order_by(Post.id.desc())
+    )
+
+def posts_batch_to_dicts(posts: list[Post], include_content: bool = True) -> list[dict]:
+    for post in posts:
+        load_artifacts(post)
+    return Serialization.posts_to_dicts(posts, include_content)
+
+def expunge_posts(db: Session, posts: list[Post]):
+    # Signing the URLs modified the artifacts, and the session holds on to
+    # modified objects until they are expunged
+    for post in posts:
+        for artifact in post.artifacts:
+            db.expunge(artifact)
+        db.expunge(post)
+
+def stream_posts(db: Session, first_id: int, last_id: int, include_content: bool = True, batch_size: int = 100):
+    """
+    Yields the posts with ids from first_id down to last_id as lists of post
+    dicts, `batch_size` posts at a time. Rows are read from a server-side
+    cursor and every batch eager loads only its own artifacts, so memory is
+    bounded by the batch size, not by the page size.
+    """
+    query = stream_query(first_id, last_id, include_content).execution_options(yield_per=batch_size)
+    for posts in db.scalars(query).partitions():
+        yield posts_batch_to_dicts(posts, include_content)
+        expunge_posts(db, posts)
+
+def create_post(db: Session, title: str, content: str, artifacts=None):
+    """
+    Creates a post together with its artifacts in one transaction, so a failure
+    never leaves a post with only some of its artifacts behind.
+
+    The returned post is fully populated from the INSERT ... RETURNING rows and
+    does not need to be queried again.
+    """
     post = Post(title=title, content=content)
     db.add(post)
+    db.flush()
+
+    created = Artifacts.create_artifacts(db, post.id, artifacts or [], commit=False, update_feed=False)
+    set_committed_value(post, "artifacts", created)
+    Feed.add_entry(db, post, created)
+    # Cached feed pages no longer include every post
+    ResponseCache.bump_generation(db, new_posts=1)
+
     db.commit()
-    db.refresh(post)
     return post
 
 def load_artifacts(post: Post):
+    signed_urls = ArtifactProcessing.generate_signed_urls([artifact.file_path for artifact in post.artifacts])
     for artifact in post.artifacts:
-        signed_url = ArtifactProcessing.generate_signed_url(artifact.file_path)
-        artifact.url = signed_url
\ No newline at end of file
+        artifact.url = signed_urls[artifact.file_path]
@@ -0,0 +1,240 @@
+import threading
+import time
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+import app.config.database as Database
+from app.config.settings import settings
+from app.models.counter import Counter
+import app.serialization as Serialization
+import app.services.artifact_processing as ArtifactProcessing
+import app.services.cache as Cache
+import app.services.post_counts as PostCounts
+
+# Serialized GET /posts pages and GET /posts/{public_id} responses.
+#
+# Keys embed a generation number that every write bumps, so a new post makes
+# every cached page unreachable at once instead of invalidating keys one by
+# one. The generation is a row in `counters`, bumped in the write's own
+# transaction, so every API worker and worker.py share it. Processes re-read
+# it at most every RESPONSE_CACHE_GENERATION_CHECK seconds.
+#
+# Two rules keep clients reading their own writes:
+#   - a response read from a replica is only cached if the replica has caught
+#     up with the key's generation (see fill_key); otherwise it may lack the
+#     post that bumped the generation, and would be cached under it
+#   - clients that wrote recently (see Database.stick_to_primary) bypass the
+#     cache, since this process may not have seen the bump yet
+#
+# The a* functions are for the async endpoints: they read the generation
+# through the async engine and run the (sync) Redis client in the threadpool,
+# so they never block the event loop.
+RESPONSE_CACHE_SIZE = settings.response_cache_size
+RESPONSE_CACHE_TTL = settings.response_cache_ttl
+RESPONSE_CACHE_GENERATION_CHECK = settings.response_cache_generation_check
+
+GENERATION_COUNTER = "response_cache_generation"
+
+response_cache = Cache.LRUCache(RESPONSE_CACHE_SIZE)
+
+_generation = 0
+_generation_checked = float("-inf")
+_generation_lock = threading.Lock()
+
+def generation_query():
+    return select(Counter.value).where(Counter.name == GENERATION_COUNTER)
+
+def generation_is_due() -> bool:
+    return time.monotonic() - _generation_checked >= RESPONSE_CACHE_GENERATION_CHECK
+
+def get_generation() -> int:
+    global _generation, _generation_checked
+
+    with _generation_lock:
+        if generation_is_due():
+            with Database.engine.connect() as connection:
+                _generation = connection.scalar(generation_query()) or 0
+            _generation_checked = time.monotonic()
+        return _generation
+
+async def aget_generation() -> int:
+    global _generation, _generation_checked
+
+    # The lock cannot be held across an await; concurrent requests may both
+    # re-read the value, which is harmless
+    if generation_is_due():
+        async with Database.async_engine.connect() as connection:
+            generation = await connection.scalar(generation_query()) or 0
+        with _generation_lock:
+            _generation, _generation_checked = generation, time.monotonic()
+    return _generation
+
+def bump_generation(db: Session, new_posts: int = 0):
+    """
+    Makes every cached response unreachable once the caller's transaction
+    commits, and adds `new_posts` to the posts counter in the same upsert.
+    Both are single rows every writer updates, so call it right before the
+    commit. Nothing is written for a counter that is not in use.
+    """
+    global _generation_checked
+
+    increments = PostCounts.posts_counter_increment(new_posts)
+    if RESPONSE_CACHE_SIZE > 0:
+        increments[GENERATION_COUNTER] = 1
+    PostCounts.increment_counters(db, increments)
+    # This process reads the new value on its next request
+    with _generation_lock:
+        _generation_checked = float("-inf")
+
+def get_read_db(request: Request):
+    """Session for the endpoints that use this cache (see Database.get_read_db)."""
+    yield from Database.get_read_db(request)
+
+async def get_async_read_db(request: Request):
+    async for db in Database.get_async_read_db(request):
+        yield db
+
+def make_key(kind: str, generation: int, args: str) -> str:
+    return f"{kind}:{generation}:{args}"
+
+def key_generation(key: str) -> int:
+    return int(key.split(":", 2)[1])
+
+def feed_args(params: dict) -> str:
+    return ":".join(f"{name}={value}" for name, value in sorted(params.items()))
+
+def feed_key(request: Request, **params) -> str | None:
+    """None for requests that bypass the cache; get() and store() accept it."""
+    if Database.reads_from_primary(request):
+        return None
+    return make_key("feed", get_generation(), feed_args(params))
+
+async def afeed_key(request: Request, **params) -> str | None:
+    if Database.reads_from_primary(request):
+        return None
+    return make_key("feed", await aget_generation(), feed_args(params))
+
+def post_key(request: Request, public_id) -> str | None:
+    if Database.reads_from_primary(request):
+        return None
+    return make_key("post", get_generation(), public_id)
+
+async def apost_key(request: Request, public_id) -> str | None:
+    if Database.reads_from_primary(request):
+        return None
+    return make_key("post", await aget_generation(), public_id)
+
+def fill_key(db: Session, key: str | None) -> str | None:
+    """
+    The key to cache a response read through `db` under: `key` itself, or
+    None when `db` is a replica that has not caught up with the key's
+    generation. Call it before the queries that build the response, so the
+    replica's generation is never newer than what they read.
+    """
+    if key is None or db.get_bind() not in Database.replica_engines:
+        return key
+    if "response_cache_generation" not in db.info:
+        db.info["response_cache_generation"] = db.scalar(generation_query()) or 0
+    return key if db.info["response_cache_generation"] >= key_generation(key) else None
+
+async def afill_key(db: AsyncSession, key: str | None) -> str | None:
+    if key is None or db.bind not in Database.async_replica_engines:
+        return key
+    if "response_cache_generation" not in db.info:
+        db.info["response_cache_generation"] = await db.scalar(generation_query()) or 0
+    return key if db.info["response_cache_generation"] >= key_generation(key) else None
+
+def entry_ttl() -> float:
+    # Responses carry signed URLs, so they must expire before those URLs do
+    return min(RESPONSE_CACHE_TTL, ArtifactProcessing.signed_url_ttl())
+
+def uses_shared_backend() -> bool:
+    return Cache.shared_backend is not None and RESPONSE_CACHE_SIZE > 0
+
+def get_shared(key: str) -> bytes | None:
+    body = Cache.shared_backend.get(key)
+    if body is not None:
+        response_cache.set(key, body, entry_ttl())
+    return body
+
+def get(key: str | None) -> bytes | None:
+    if key is None:
+        return None
+    body = response_cache.get(key)
+    if body is None and uses_shared_backend():
+        body = get_shared(key)
+    return body
+
+async def aget(key: str | None) -> bytes | None:
+    if key is None:
+        return None
+    body = response_cache.get(key)
+    if body is None and uses_shared_backend():
+        body = await run_in_threadpool(get_shared, key)
+    return body
+
+def store(key: str | None, data) -> bytes:
+    """
+    Serializes `data` (plain dicts, see app/serialization.py) to JSON, caches it
+    under `key` and returns the body.
+    """
+    body = Serialization.dumps(data)
+    if key is not None:
+        store_bytes(key, body)
+    return body
+
+async def astore(key: str | None, data) -> bytes:
+    body = Serialization.dumps(data)
+    if key is not None:
+        await astore_bytes(key, body)
+    return body
+
+def store_bytes(key: str, body: bytes):
+    ttl = entry_ttl()
+    response_cache.set(key, body, ttl)
+    if uses_shared_backend():
+        Cache.shared_backend.set(key, body, ttl)
+
+async def astore_bytes(key: str, body: bytes):
+    ttl = entry_ttl()
+    response_cache.set(key, body, ttl)
+    if uses_shared_backend():
+        await run_in_threadpool(Cache.shared_backend.set, key, body, ttl)
+
+# ETag and Last-Modified of the response cached under a key (see
+# app/http_cache.py), so revalidating a cached response needs no query
+
+def decode_validators(raw: bytes | None) -> tuple[str, float | None] | None:
+    if raw is None:
+        return None
+    etag, last_modified = raw.decode().rsplit(" ", 1)
+    return etag, None if last_modified == "None" else float(last_modified)
+
+def encode_validators(validators: tuple[str, float | None]) -> bytes:
+    etag, last_modified = validators
+    return f"{etag} {last_modified}".encode()
+
+def get_validators(key: str | None) -> tuple[str, float | None] | None:
+    if key is None:
+        return None
+    return decode_validators(get(f"{key}:validators"))
+
+async def aget_validators(key: str | None) -> tuple[str, float | None] | None:
+    if key is None:
+        return None
+    return decode_validators(await aget(f"{key}:validators"))
+
+def store_validators(key: str | None, validators: tuple[str, float | None]):
+    if key is not None:
+        store_bytes(f"{key}:validators", encode_validators(validators))
+
+async def astore_validators(key: str | None, validators: tuple[str, float | None]):
+    if key is not None:
+        await astore_bytes(f"{key}:validators", encode_validators(validators))
+
+def stats() -> dict:
+    return {**response_cache.stats(), "generation": get_generation()}
@@ -0,0 +1,97 @@
+import base64
+import json
+from sqlalchemy import Float, Integer, and_, func, literal_column, or_, select, text
+from sqlalchemy.orm import Session
+from app.config.settings import settings
+from app.models.post import Post
+import app.services.posts as Posts
+
+# Ranking is done over the newest SEARCH_MAX_CANDIDATES matching posts only,
+# so a query matching millions of posts costs the same as a rare one
+SEARCH_MAX_CANDIDATES = settings.search_max_candidates
+SEARCH_LANGUAGE = "english"
+
+def encode_cursor(rank: float, id: int) -> str:
+    raw = json.dumps({"rank": rank, "id": id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    """
+    Reverses encode_cursor. Raises ValueError if the cursor was not produced by us.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(data["rank"]), int(data["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+def fts5_query(q: str) -> str:
+    # Quote every term so user input can't be parsed as FTS5 query syntax;
+    # consecutive terms are ANDed like in websearch_to_tsquery
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+def candidates(dialect: str, q: str):
+    """
+    Subquery of (id, rank) for the newest matching posts, higher rank is better.
+    Postgres uses the GIN-indexed search_vector column, SQLite the posts_fts
+    FTS5 table (see app/models/post.py).
+    """
+    if dialect == "sqlite":
+        return (
+            text(
+                "SELECT rowid AS id, -bm25(posts_fts, 10.0, 1.0) AS rank FROM posts_fts "
+                "WHERE posts_fts MATCH :query ORDER BY rowid DESC LIMIT :max_candidates"
+            )
+            .bindparams(query=fts5_query(q), max_candidates=SEARCH_MAX_CANDIDATES)
+            .columns(id=Integer, rank=Float)
+            .subquery("candidates")
+        )
+
+    vector = literal_column("posts.search_vector")
+    tsquery = func.websearch_to_tsquery(SEARCH_LANGUAGE, q)
+    return (
+        # Weights for the D, C, B (content) and A (title) labels
+        select(Post.id.label("id"), func.ts_rank(literal_column("'{0.1, 0.2, 0.4, 1.0}'::real[]"), vector, tsquery).label("rank"))
+        .where(vector.op("@@")(tsquery))
+        .order_by(Post.id.desc())
+        .limit(SEARCH_MAX_CANDIDATES)
+        .subquery("candidates")
+    )
+
+def search_page_query(dialect: str, q: str, cursor: str | None, limit: int):
+    """
+    Best ranked (id, rank) rows after the cursor position, ordered by rank and
+    then id (both descending), with one extra row to detect a next page.
+    """
+    matches = candidates(dialect, q)
+    query = select(matches.c.id, matches.c.rank)
+    if cursor:
+        rank, id = decode_cursor(cursor)
+        query = query.where(or_(matches.c.rank < rank, and_(matches.c.rank == rank, matches.c.id < id)))
+    return query.order_by(matches.c.rank.desc(), matches.c.id.desc()).limit(limit + 1)
+
+def paginate(rows, limit: int) -> tuple[list[int], str | None]:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].rank, rows[-1].id)
+    return [row.id for row in rows], next_cursor
+
+def order_by_ids(posts: list[Post], ids: list[int]) -> list[Post]:
+    by_id = {post.id: post for post in posts}
+    return [by_id[id] for id in ids if id in by_id]
+
+def search_posts(db: Session, q: str, cursor: str | None, limit: int, include_content: bool = True):
+    """
+    Full-text search over post titles (weighted higher) and contents, best
+    matches first, with keyset pagination on (rank, id).
+
+    Returns the posts and the cursor for the next page (None on the last page).
+    """
+    rows = db.execute(search_page_query(db.get_bind().dialect.name, q, cursor, limit)).all()
+    ids, next_cursor = paginate(rows, limit)
+    if not ids:
+        return [], next_cursor
+
+    posts = db.query(Post).options(*Posts.post_load_options(include_content)).filter(Post.id.in_(ids)).all()
+    return order_by_ids(posts, ids), next_cursor
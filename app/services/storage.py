@@ -0,0 +1,318 @@
+import abc
+import asyncio
+import hashlib
+import hmac
+import logging
+import mimetypes
+import os
+import re
+import shutil
+import time
+import uuid
+from urllib.parse import quote
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from app.config.settings import settings
+from app.schemas import ArtifactCreate
+
+# Where media files live. STORAGE_PROVIDER picks the provider:
+#   imagekit - ImageKit.io (default)
+#   local    - files under LOCAL_STORAGE_DIR, served by the API itself from
+#              LOCAL_STORAGE_URL with HMAC-signed URLs (app/media_endpoints.py),
+#              for development and for benchmarking the media path offline
+STORAGE_PROVIDER = settings.storage_provider
+LOCAL_STORAGE_DIR = settings.local_storage_dir
+LOCAL_STORAGE_URL = settings.local_storage_url.rstrip("/")
+LOCAL_STORAGE_SECRET = settings.local_storage_secret
+
+# Server-side uploads to ImageKit (or a compatible stub, see
+# benchmarks/stub_storage.py). Files are streamed from the request's spooled
+# temporary files in chunks, so no whole file is held in memory.
+IMAGEKIT_UPLOAD_URL = settings.imagekit_upload_url
+IMAGEKIT_API_URL = settings.imagekit_api_url
+
+# Files of one request uploaded at the same time, and connections to the
+# storage provider shared by all requests
+UPLOAD_CONCURRENCY = settings.upload_concurrency
+UPLOAD_MAX_CONNECTIONS = settings.upload_max_connections
+UPLOAD_TIMEOUT = settings.upload_timeout
+
+logger = logging.getLogger(__name__)
+
+class UploadError(Exception):
+    pass
+
+class StorageProvider(abc.ABC):
+    """
+    What the app needs from a media store. Signing and auth params are called
+    for every artifact of every response, so they must be local computations;
+    upload and delete may go over the network.
+    """
+    name: str
+
+    @abc.abstractmethod
+    def sign_path(self, file_path: str, expires_at: int) -> str:
+        """URL of the file that is valid until `expires_at` (a unix timestamp)."""
+
+    @abc.abstractmethod
+    def auth_params(self, token: str, expire: int) -> dict:
+        """Parameters that let a client upload one file directly."""
+
+    @abc.abstractmethod
+    def file_details(self, file_id: str) -> dict:
+        """{"thumbnail_url", "metadata"} of an uploaded file."""
+
+    @abc.abstractmethod
+    async def upload(self, file: UploadFile) -> ArtifactCreate:
+        """Raises UploadError if the file could not be stored."""
+
+    @abc.abstractmethod
+    async def delete(self, file_id: str):
+        """Logs instead of raising, callers are cleaning up."""
+
+    async def close(self):
+        pass
+
+class ImageKitStorage(StorageProvider):
+    name = "imagekit"
+
+    def __init__(self):
+        self.url_endpoint = (settings.imagekit_url or "").strip("/")
+        self.public_key = settings.imagekit_public_key
+        # HMAC-SHA1 state with the private key already absorbed. Copying it is
+        # cheaper than hmac.new() for every signature, which hashes the key
+        # pads again.
+        self.private_key_hmac = hmac.new((settings.imagekit_private_key or "").encode(), digestmod=hashlib.sha1)
+        # The SDK (and requests, which it imports) and httpx are loaded on
+        # first use instead of in every worker at import time
+        self._sdk = None
+        self._client = None
+
+    def sdk(self):
+        if self._sdk is None:
+            from imagekitio import ImageKit
+
+            self._sdk = ImageKit(
+                private_key=settings.imagekit_private_key,
+                public_key=settings.imagekit_public_key,
+                url_endpoint=settings.imagekit_url,
+            )
+        return self._sdk
+
+    def client(self):
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                # ImageKit authenticates server-side calls with the private key
+                # as the basic auth user name
+                auth=(settings.imagekit_private_key or "", ""),
+                limits=httpx.Limits(max_connections=UPLOAD_MAX_CONNECTIONS),
+                timeout=UPLOAD_TIMEOUT,
+            )
+        return self._client
+
+    def hmac_sign(self, message: str) -> str:
+        signer = self.private_key_hmac.copy()
+        signer.update(message.encode())
+        return signer.hexdigest()
+
+    def sign_path(self, file_path: str, expires_at: int) -> str:
+        """
+        Signs {IMAGEKIT_URL}/{file_path} the way ImageKit's SDK does, but with
+        the precomputed key state. Paths the SDK would have to URL-encode
+        first are left to the SDK.
+        """
+        path = file_path.strip("/")
+        if not path.isascii() or any(char in path for char in "?#"):
+            return self.sdk().url({
+                'path': file_path,
+                'signed': True,
+                'expire_seconds': expires_at - int(time.time()),
+            })
+
+        signature = self.hmac_sign(f"{path}{expires_at}")
+        return f"{self.url_endpoint}/{path}?ik-t={expires_at}&ik-s={signature}"
+
+    def auth_params(self, token: str, expire: int) -> dict:
+        return {
+            "token": token,
+            "expire": expire,
+            "signature": self.hmac_sign(token + str(expire)),
+            "public_key": self.public_key,
+        }
+
+    def file_details(self, file_id: str) -> dict:
+        # Raises the SDK's errors if the file can't be fetched
+        details = self.sdk().get_file_details(file_id)
+        return {
+            "thumbnail_url": details.thumbnail or None,
+            "metadata": {"width": details.width, "height": details.height, "size": details.size, "mime": details.mime},
+        }
+
+    async def upload(self, file: UploadFile) -> ArtifactCreate:
+        import httpx
+
+        file.file.seek(0)
+        try:
+            # httpx reads file objects in chunks while sending the multipart body
+            response = await self.client().post(
+                IMAGEKIT_UPLOAD_URL,
+                data={"fileName": file.filename or "upload", "useUniqueFileName": "true"},
+                files={"file": (file.filename or "upload", file.file, file.content_type)},
+            )
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise UploadError(f"Uploading {file.filename!r} failed: {str(e).splitlines()[0]}") from e
+
+        result = response.json()
+        return ArtifactCreate(
+            file_id=result["fileId"],
+            file_path=result["filePath"],
+            file_type=result["fileType"],
+            thumbnail_url=result.get("thumbnailUrl") or result.get("url") or "",
+        )
+
+    async def delete(self, file_id: str):
+        import httpx
+
+        try:
+            response = await self.client().delete(f"{IMAGEKIT_API_URL}/files/{file_id}")
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning("Could not delete uploaded file %s: %s", file_id, e)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+class LocalStorage(StorageProvider):
+    """
+    Files are stored as {LOCAL_STORAGE_DIR}/{file_id}/{name}, so the file path
+    is "/{file_id}/{name}" and a file is deleted with its directory. Signed
+    URLs carry `expires` and an HMAC-SHA256 `signature` of the path and
+    expiry, checked by GET /media/{file_path}. Upload tokens can be used more
+    than once until they expire, unlike ImageKit's.
+    """
+    name = "local"
+
+    def __init__(self):
+        if not LOCAL_STORAGE_SECRET:
+            raise RuntimeError("LOCAL_STORAGE_SECRET must be set for STORAGE_PROVIDER=local")
+        self.root = os.path.realpath(LOCAL_STORAGE_DIR)
+        os.makedirs(self.root, exist_ok=True)
+        self.secret_hmac = hmac.new(LOCAL_STORAGE_SECRET.encode(), digestmod=hashlib.sha256)
+
+    def hmac_sign(self, message: str) -> str:
+        signer = self.secret_hmac.copy()
+        signer.update(message.encode())
+        return signer.hexdigest()
+
+    def sign_path(self, file_path: str, expires_at: int) -> str:
+        path = file_path.strip("/")
+        return f"{LOCAL_STORAGE_URL}/{quote(path)}?expires={expires_at}&signature={self.hmac_sign(f'{path}{expires_at}')}"
+
+    def verify(self, file_path: str, expires: int, signature: str) -> bool:
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self.hmac_sign(f"{file_path.strip('/')}{expires}"), signature)
+
+    def auth_params(self, token: str, expire: int) -> dict:
+        return {"token": token, "expire": expire, "signature": self.hmac_sign(token + str(expire)), "public_key": None}
+
+    def verify_auth_params(self, token: str, expire: int, signature: str) -> bool:
+        if expire < time.time():
+            return False
+        return hmac.compare_digest(self.hmac_sign(token + str(expire)), signature)
+
+    def local_path(self, file_path: str) -> str | None:
+        """The file's path on disk, None if `file_path` points outside the root."""
+        path = os.path.realpath(os.path.join(self.root, file_path.strip("/")))
+        return path if os.path.commonpath([self.root, path]) == self.root and path != self.root else None
+
+    def file_details(self, file_id: str) -> dict:
+        directory = self.local_path(file_id)
+        if directory is None:
+            raise FileNotFoundError(file_id)
+        name = os.listdir(directory)[0]
+        return {
+            "thumbnail_url": None,
+            "metadata": {"width": None, "height": None, "size": os.path.getsize(os.path.join(directory, name)), "mime": mimetypes.guess_type(name)[0]},
+        }
+
+    def save(self, file: UploadFile) -> ArtifactCreate:
+        file_id = uuid.uuid4().hex
+        name = re.sub(r"[^A-Za-z0-9._-]", "_", os.path.basename(file.filename or "")).lstrip(".") or "upload"
+        directory = os.path.join(self.root, file_id)
+        os.makedirs(directory)
+        try:
+            file.file.seek(0)
+            with open(os.path.join(directory, name), "wb") as f:
+                shutil.copyfileobj(file.file, f, 1024 * 1024)
+        except BaseException:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+
+        content_type = file.content_type or mimetypes.guess_type(name)[0] or ""
+        file_type = "image" if content_type.startswith("image/") else "video" if content_type.startswith("video/") else "non-image"
+        return ArtifactCreate(file_id=file_id, file_path=f"/{file_id}/{name}", file_type=file_type, thumbnail_url="")
+
+    async def upload(self, file: UploadFile) -> ArtifactCreate:
+        try:
+            return await run_in_threadpool(self.save, file)
+        except OSError as e:
+            raise UploadError(f"Uploading {file.filename!r} failed: {e}") from e
+
+    async def delete(self, file_id: str):
+        directory = self.local_path(file_id)
+        try:
+            if directory is None:
+                raise FileNotFoundError(file_id)
+            await run_in_threadpool(shutil.rmtree, directory)
+        except OSError as e:
+            logger.warning("Could not delete uploaded file %s: %s", file_id, e)
+
+PROVIDERS = {"imagekit": ImageKitStorage, "local": LocalStorage}
+
+_provider: StorageProvider | None = None
+
+def get_provider() -> StorageProvider:
+    global _provider
+    if _provider is None:
+        if STORAGE_PROVIDER not in PROVIDERS:
+            raise RuntimeError(f"Unknown STORAGE_PROVIDER {STORAGE_PROVIDER!r}, expected one of {', '.join(PROVIDERS)}")
+        _provider = PROVIDERS[STORAGE_PROVIDER]()
+    return _provider
+
+async def close_provider():
+    if _provider is not None:
+        await _provider.close()
+
+async def delete_files(artifacts: list[ArtifactCreate]):
+    provider = get_provider()
+    await asyncio.gather(*(provider.delete(artifact.file_id) for artifact in artifacts))
+
+async def upload_files(files: list[UploadFile]) -> list[ArtifactCreate]:
+    """
+    Uploads the files, at most UPLOAD_CONCURRENCY at a time, and returns their
+    artifacts in the order of `files`. If any upload fails, the files that
+    were uploaded are deleted again and UploadError is raised.
+    """
+    provider = get_provider()
+    semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+    async def upload(file: UploadFile) -> ArtifactCreate:
+        async with semaphore:
+            return await provider.upload(file)
+
+    results = await asyncio.gather(*(upload(file) for file in files), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        await delete_files([result for result in results if isinstance(result, ArtifactCreate)])
+        if not isinstance(errors[0], UploadError):
+            raise errors[0]
+        raise UploadError("; ".join(str(error) for error in errors))
+    return results
@@ -0,0 +1,44 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+# Cold-start cost of a worker. app/app.py imports this module first, so
+# IMPORT_STARTED is taken before the app and its dependencies are imported.
+IMPORT_STARTED = time.perf_counter()
+
+logger = logging.getLogger("uvicorn.error")
+
+# Seconds per startup phase, in the order they ran
+phases: dict[str, float] = {}
+summary: dict = {}
+
+def mark_imported():
+    phases["imports"] = time.perf_counter() - IMPORT_STARTED
+
+@contextmanager
+def phase(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] = time.perf_counter() - started
+
+def report(**details) -> dict:
+    """Logs how long this worker took to become ready, and keeps it for /internal/startup."""
+    summary.update(
+        pid=os.getpid(),
+        ready_seconds=time.perf_counter() - IMPORT_STARTED,
+        # CPU time of the whole process, including the interpreter's own startup
+        cpu_seconds=time.process_time(),
+        phases=dict(phases),
+        **details,
+    )
+    logger.info(
+        "Worker %d ready in %.3fs (%s; %.3fs CPU)",
+        summary["pid"],
+        summary["ready_seconds"],
+        ", ".join(f"{name} {seconds:.3f}s" for name, seconds in phases.items()),
+        summary["cpu_seconds"],
+    )
+    return summary
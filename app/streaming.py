@@ -0,0 +1,74 @@
+from fastapi.responses import StreamingResponse
+
+from app.config.settings import settings
+import app.config.database as Database
+import app.services.async_posts as AsyncPosts
+import app.services.feed as Feed
+import app.services.posts as Posts
+import app.serialization as Serialization
+
+# Streamed feed pages (GET /posts?stream=ndjson|json). The page's id range and
+# next cursor are resolved first, then the posts are read from a server-side
+# cursor in batches of STREAM_BATCH_SIZE and written out batch by batch, so a
+# request never holds more than one batch of posts, whatever its page_size.
+STREAM_BATCH_SIZE = settings.stream_batch_size
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+# The json format has the same shape (and key order) as the cursor page body
+def head(stream_format: str) -> bytes:
+    return b'{"posts":[' if stream_format == "json" else b""
+
+def encode_batch(posts: list[dict], stream_format: str, first: bool) -> bytes:
+    if stream_format == "ndjson":
+        return b"".join(Serialization.dumps(post) + b"\n" for post in posts)
+    body = b",".join(Serialization.dumps(post) for post in posts)
+    return body if first else b"," + body
+
+def tail(stream_format: str, next_cursor: str | None, page_size: int) -> bytes:
+    if stream_format != "json":
+        return b""
+    return b'],"next_cursor":' + Serialization.dumps(next_cursor) + b',"page_size":' + Serialization.dumps(page_size) + b"}"
+
+def iter_body(batches, stream_format: str, next_cursor: str | None, page_size: int):
+    yield head(stream_format)
+    first = True
+    for posts in batches:
+        if posts:
+            yield encode_batch(posts, stream_format, first)
+            first = False
+    yield tail(stream_format, next_cursor, page_size)
+
+async def aiter_body(batches, stream_format: str, next_cursor: str | None, page_size: int):
+    yield head(stream_format)
+    first = True
+    async for posts in batches:
+        if posts:
+            yield encode_batch(posts, stream_format, first)
+            first = False
+    yield tail(stream_format, next_cursor, page_size)
+
+def stream_posts(bind, first_id: int | None, last_id: int | None, include_content: bool):
+    """
+    Batches of post dicts for the id range. The posts are read in a session of
+    their own on `bind`, which lives as long as the response body is being
+    sent rather than as long as the request's session.
+    """
+    if first_id is None:
+        return
+    with Database.SessionLocal(bind=bind) as db:
+        stream = Feed.stream_entries if Feed.FEED_ENTRIES else Posts.stream_posts
+        yield from stream(db, first_id, last_id, include_content, STREAM_BATCH_SIZE)
+
+async def astream_posts(bind, first_id: int | None, last_id: int | None, include_content: bool):
+    if first_id is None:
+        return
+    async with Database.AsyncSessionLocal(bind=bind) as db:
+        async for posts in AsyncPosts.stream_posts(db, first_id, last_id, include_content, STREAM_BATCH_SIZE):
+            yield posts
+
+def response(body, stream_format: str, next_cursor: str | None) -> StreamingResponse:
+    # The next cursor is known before the first post is sent, so NDJSON clients
+    # get it from a header
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return StreamingResponse(body, media_type=MEDIA_TYPES[stream_format], headers=headers)
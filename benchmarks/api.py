@@ -0,0 +1,236 @@
+"""
+End-to-end benchmark of the API: starts the app, replays a weighted mix of
+requests from concurrent clients and reports throughput and latency
+percentiles per endpoint.
+
+Usage:
+    # Fresh SQLite database with 10k generated posts, default request mix
+    python -m benchmarks.api --posts 10000 --output results/$(git rev-parse --short HEAD).json
+
+    # Against a local Postgres, async handlers, compared with an earlier run
+    python -m benchmarks.api --database-url postgresql://user:pw@localhost/bench --mode async \\
+        --compare results/baseline.json
+
+    # Replay a recorded mix instead of the synthetic one
+    python -m benchmarks.api --mix recorded.jsonl
+
+A mix file has one request per line:
+    {"name": "detail", "method": "GET", "path": "/posts/{public_id}", "weight": 3}
+    {"name": "create", "method": "POST", "path": "/posts", "body": {...}, "weight": 1}
+`{public_id}` is replaced with the id of a random existing post.
+
+ImageKit is never contacted: URL signing and upload tokens are computed
+locally, and the server is started with dummy ImageKit credentials. Needs
+httpx (the `bench` extra).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import create_engine, inspect, text
+
+from benchmarks.load_test import start_server
+
+STUB_IMAGEKIT_ENV = {
+    "IMAGEKIT_PUBLIC_KEY": "public_bench",
+    "IMAGEKIT_PRIVATE_KEY": "private_bench",
+    "IMAGEKIT_URL": "https://ik.imagekit.invalid/bench",
+}
+
+
+def default_mix(total_posts: int, page_size: int, artifacts: int) -> list[dict]:
+    deep_page = max(1, total_posts // page_size // 2)
+    return [
+        {"name": "feed_first_page", "method": "GET", "path": f"/posts?page=1&page_size={page_size}", "weight": 10},
+        {"name": "feed_deep_page", "method": "GET", "path": f"/posts?page={deep_page}&page_size={page_size}", "weight": 2},
+        {"name": "feed_cursor", "method": "GET", "path": f"/posts?pagination=cursor&page_size={page_size}", "weight": 5},
+        {"name": "post_detail", "method": "GET", "path": "/posts/{public_id}", "weight": 5},
+        {"name": "search", "method": "GET", "path": f"/posts/search?q=beach+sunset&page_size={page_size}", "weight": 2},
+        {
+            "name": f"create_{artifacts}_artifacts",
+            "method": "POST",
+            "path": "/posts",
+            "weight": 1,
+            "body": {
+                "title": "Benchmark post",
+                "content": "Created by benchmarks.api",
+                "artifacts": [
+                    {"file_id": f"bench{n}", "file_path": f"/bench/{n}.jpg", "file_type": "image", "thumbnail_url": f"/bench/tr:n-ik_ml_thumbnail/{n}.jpg"}
+                    for n in range(artifacts)
+                ],
+            },
+        },
+    ]
+
+
+def load_mix(path: str) -> list[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+async def client_loop(client: httpx.AsyncClient, mix: list[dict], public_ids: list[str], rng: random.Random, deadline: float, latencies: dict, errors: dict):
+    weights = [entry.get("weight", 1) for entry in mix]
+    while time.perf_counter() < deadline:
+        (entry,) = rng.choices(mix, weights)
+        path = entry["path"]
+        if "{public_id}" in path:
+            path = path.replace("{public_id}", rng.choice(public_ids))
+        t0 = time.perf_counter()
+        try:
+            response = await client.request(entry.get("method", "GET"), path, json=entry.get("body"))
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            failed = True
+        if failed:
+            errors[entry["name"]] += 1
+        else:
+            latencies[entry["name"]].append((time.perf_counter() - t0) * 1000)
+
+
+async def run_mix(url: str, mix: list[dict], public_ids: list[str], clients: int, duration: float, seed: int) -> tuple[dict, dict, float]:
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            client_loop(client, mix, public_ids, random.Random(seed + n), deadline, latencies, errors)
+            for n in range(clients)
+        ))
+        elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p90_ms": percentile(latencies, 0.90),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ensure_posts(env: dict, count: int):
+    """Tops the database up to `count` posts with the seed.py generator."""
+    engine = create_engine(env["DATABASE_URL"])
+    with engine.connect() as connection:
+        existing = connection.scalar(text("SELECT count(*) FROM posts")) if inspect(connection).has_table("posts") else 0
+    engine.dispose()
+    if existing < count:
+        subprocess.run([sys.executable, "seed.py", "generate", str(count - existing), "--seed", "0"], env=env, check=True)
+
+
+def print_results(results: dict, baseline: dict | None, threshold: float) -> bool:
+    """Prints the per-endpoint table; returns True if any endpoint regressed past `threshold` percent."""
+    regressed = False
+    print(f"{'endpoint':>24} {'req/s':>9} {'p50 (ms)':>9} {'p90 (ms)':>9} {'p99 (ms)':>9} {'errors':>7}  vs baseline")
+    for name, row in results["endpoints"].items():
+        line = f"{name:>24} {row['rps']:>9.1f} {row['p50_ms']:>9.2f} {row['p90_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['errors']:>7}"
+        base = (baseline or {}).get("endpoints", {}).get(name)
+        if base and base["p99_ms"] and base["rps"]:
+            p99_change = (row["p99_ms"] - base["p99_ms"]) / base["p99_ms"] * 100
+            rps_change = (row["rps"] - base["rps"]) / base["rps"] * 100
+            flag = p99_change > threshold or rps_change < -threshold
+            regressed |= flag
+            line += f"  p99 {p99_change:+.1f}%, req/s {rps_change:+.1f}%{'  REGRESSION' if flag else ''}"
+        print(line)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to a new SQLite database in a temporary directory")
+    parser.add_argument("--mode", choices=("sync", "async"), default="sync")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--posts", type=int, default=10_000, help="posts to generate first if the database has fewer")
+    parser.add_argument("--mix", help="JSONL request mix to replay instead of the default one")
+    parser.add_argument("--page-size", type=int, default=5)
+    parser.add_argument("--artifacts", type=int, default=3, help="artifacts per created post in the default mix")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=10, help="percent change in p99 or req/s counted as a regression")
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.db"
+    env = dict(os.environ, **STUB_IMAGEKIT_ENV, DATABASE_URL=database_url, DATABASE_REPLICA_URLS="", CACHE_REDIS_URL="")
+    ensure_posts(env, args.posts)
+
+    mix = load_mix(args.mix) if args.mix else default_mix(args.posts, args.page_size, args.artifacts)
+    url = f"http://127.0.0.1:{args.port}"
+    process = start_server(args.mode, args.port, env)
+    try:
+        feed = httpx.get(url + "/posts", params={"pagination": "cursor", "page_size": 100}).json()
+        public_ids = [post["public_id"] for post in feed["posts"]]
+        if args.warmup:
+            asyncio.run(run_mix(url, mix, public_ids, args.clients, args.warmup, args.seed))
+        latencies, errors, elapsed = asyncio.run(run_mix(url, mix, public_ids, args.clients, args.duration, args.seed))
+    finally:
+        process.terminate()
+        process.wait()
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "mode": args.mode,
+            "database": database_url.split("://")[0],
+            "posts": args.posts,
+            "clients": args.clients,
+            "duration": args.duration,
+            "mix": mix,
+        },
+        "endpoints": {entry["name"]: summarize(latencies[entry["name"]], errors[entry["name"]], elapsed) for entry in mix},
+        "total": summarize([value for values in latencies.values() for value in values], sum(errors.values()), elapsed),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    regressed = print_results(results, baseline, args.threshold)
+    total = results["total"]
+    print(f"{'total':>24} {total['rps']:>9.1f} {total['p50_ms']:>9.2f} {total['p90_ms']:>9.2f} {total['p99_ms']:>9.2f} {total['errors']:>7}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Compares the feed queries before and after the switch from joinedload to
+selectinload with column-restricted loading: number of queries, bytes of row
+data returned by the database, and wall time per page.
+
+Usage:
+    python -m benchmarks.feed_queries --posts 10000 --artifacts-per-post 5
+
+Runs against DATABASE_URL and tops the tables up to --posts posts that each
+have --artifacts-per-post artifacts.
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+
+from app.config.database import SessionLocal, engine, Base
+from app.models.artifact import Artifact
+from app.models.post import Post
+import app.services.posts as Posts
+from benchmarks.utils import QueryRecorder
+
+BATCH_SIZE = 1_000
+CONTENT = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 10
+
+
+def fill_posts(db, target: int, artifacts_per_post: int):
+    existing = Posts.get_posts_count(db)
+    if existing >= target:
+        return
+
+    print(f"Inserting {target - existing} posts with {artifacts_per_post} artifacts each...")
+    for batch_start in range(existing, target, BATCH_SIZE):
+        now = datetime.now(timezone.utc)
+        posts = [
+            {"public_id": uuid4(), "title": f"Benchmark Post {i}", "content": CONTENT, "created_at": now, "updated_at": now}
+            for i in range(batch_start, min(batch_start + BATCH_SIZE, target))
+        ]
+        post_ids = db.scalars(insert(Post).returning(Post.id), posts).all()
+        artifacts = [
+            {
+                "public_id": uuid4(),
+                "post_id": post_id,
+                "file_id": uuid4().hex,
+                "file_path": f"/benchmark/{post_id}_{n}.jpg",
+                "file_type": "image",
+                "thumbnail_url": f"https://ik.imagekit.io/demo/tr:n-ik_ml_thumbnail/benchmark/{post_id}_{n}.jpg",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for post_id in post_ids
+            for n in range(artifacts_per_post)
+        ]
+        if artifacts:
+            db.execute(insert(Artifact), artifacts)
+        db.commit()
+
+
+def joinedload_page(db, offset: int, limit: int):
+    """The feed query as it was: one JOIN, with OFFSET/LIMIT in a subquery."""
+    return (
+        db.query(Post)
+        .options(joinedload(Post.artifacts))
+        .order_by(Post.id.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+
+
+def selectinload_page(db, offset: int, limit: int, include_content: bool = True):
+    return Posts.get_latest_posts_with_pagination(db, offset, limit, include_content)
+
+
+def result_bytes(statements) -> int:
+    """
+    Replays the recorded statements on a raw DBAPI cursor and adds up the size
+    of every value in the returned rows, as an estimate of the bytes on the wire.
+    """
+    total = 0
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        for statement, parameters in statements:
+            cursor.execute(statement, parameters)
+            for row in cursor.fetchall():
+                total += sum(len(str(value).encode()) for value in row if value is not None)
+        cursor.close()
+    finally:
+        connection.close()
+    return total
+
+
+def measure(db, recorder: QueryRecorder, fn, repeat: int) -> tuple[int, int, float]:
+    statements = recorder.run(fn)
+    db.expunge_all()
+
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+        db.expunge_all()
+
+    return len(statements), result_bytes(statements), statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--artifacts-per-post", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    recorder = QueryRecorder(engine)
+    db = SessionLocal()
+    try:
+        fill_posts(db, args.posts, args.artifacts_per_post)
+        total = Posts.get_posts_count(db)
+
+        strategies = {
+            "joinedload": lambda offset: joinedload_page(db, offset, args.page_size),
+            "selectinload": lambda offset: selectinload_page(db, offset, args.page_size),
+            "selectinload, no content": lambda offset: selectinload_page(db, offset, args.page_size, include_content=False),
+        }
+
+        print(f"{'page':>8} {'strategy':>26} {'queries':>8} {'bytes':>10} {'ms':>8}")
+        for offset in (0, total // 2, max(total - args.page_size, 0)):
+            for name, fetch in strategies.items():
+                queries, size, ms = measure(db, recorder, lambda: fetch(offset), args.repeat)
+                print(f"{offset // args.page_size + 1:>8} {name:>26} {queries:>8} {size:>10} {ms:>8.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
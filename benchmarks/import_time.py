@@ -0,0 +1,74 @@
+"""
+Cold-start import time of the API.
+
+Usage:
+    python -m benchmarks.import_time --runs 5 --top 15
+    python -m benchmarks.import_time --budget 1.5   # exits non-zero above 1.5s, --budget 0 only reports
+
+Imports the app module in fresh interpreters with `python -X importtime` and
+reports the median total and the modules with the largest cumulative import
+time (median over the runs). Every worker pays this on start and restart, so
+the run fails above --budget (IMPORT_TIME_BUDGET by default, also checked by
+tests/test_imports.py). Dummy ImageKit credentials are used and nothing is
+contacted; the database is a SQLite file that is never opened.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.api import STUB_IMAGEKIT_ENV
+
+# Seconds for a cold `import app.app`, about 1.2s on a laptop
+IMPORT_TIME_BUDGET = 2.0
+
+
+def import_times(module: str, env: dict) -> dict[str, float]:
+    """Cumulative import time in seconds per module, for one fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # A module shows up once, where it was first imported
+        times.setdefault(name.strip(), int(cumulative) / 1e6)
+    return times
+
+
+def import_env() -> dict:
+    database_url = f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.db"
+    return dict(os.environ, **STUB_IMAGEKIT_ENV, DATABASE_URL=database_url, DATABASE_REPLICA_URLS="", CACHE_REDIS_URL="")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--budget", type=float, default=IMPORT_TIME_BUDGET, help="seconds; exit non-zero if the median total is above it (0 disables)")
+    args = parser.parse_args()
+
+    env = import_env()
+    runs = [import_times(args.module, env) for _ in range(args.runs)]
+
+    medians = {name: statistics.median(run.get(name, 0.0) for run in runs) for name in runs[0]}
+    total = medians[args.module]
+    print(f"{'module':<50} {'ms':>8}")
+    slowest = sorted((name for name in medians if name != args.module), key=medians.get, reverse=True)
+    for name in slowest[:args.top]:
+        print(f"{name:<50} {medians[name] * 1000:8.1f}")
+    print(f"{args.module + ' (total)':<50} {total * 1000:8.1f}  ({args.runs} runs, median)")
+
+    if args.budget and total > args.budget:
+        print(f"Import time {total:.3f}s is over the budget of {args.budget:.3f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Runs EXPLAIN on the queries issued by the services in app/services/ and flags
+the ones that read a table with a sequential scan.
+
+Usage:
+    python -m benchmarks.index_advisor [--no-seqscan]
+
+Runs against DATABASE_URL (Postgres, or SQLite via EXPLAIN QUERY PLAN) and
+needs at least one post with an artifact. On small tables Postgres often
+prefers a sequential scan even when an index exists; use a realistically
+sized dataset, or --no-seqscan to make it pick any usable index so that a
+remaining sequential scan means no index fits the query.
+"""
+import argparse
+import json
+
+from sqlalchemy.orm import Session
+
+from app.config.database import Base, SessionLocal, engine
+from app.models.artifact import Artifact
+from app.models.post import Post
+import app.services.artifacts as Artifacts
+import app.services.feed as Feed
+import app.services.jobs as Jobs
+import app.services.post_counts as PostCounts
+import app.services.posts as Posts
+import app.services.search as Search
+from benchmarks.utils import QueryRecorder
+
+# These read whole tables by design
+FULL_SCAN_EXPECTED = {"posts.get_all_posts", "artifacts.get_all_artifacts"}
+
+
+class ScratchSession(Session):
+    """
+    For the queries that write (job claims): commits only flush, and the
+    transaction is rolled back at the end, so the queue is left untouched.
+    """
+
+    def commit(self):
+        self.flush()
+
+
+def service_queries(db, scratch: ScratchSession, post: Post, artifact: Artifact) -> dict:
+    cursor = Posts.encode_cursor(post)
+    last_id = max(post.id - 100, 1)
+    return {
+        "posts.get_all_posts": lambda: Posts.get_all_posts(db),
+        "posts.get_posts_count": lambda: Posts.get_posts_count(db),
+        "posts.get_post_by_id": lambda: Posts.get_post_by_id(db, post.public_id),
+        "posts.get_latest_posts_with_pagination": lambda: Posts.get_latest_posts_with_pagination(db, 100, 20),
+        "posts.get_latest_posts_after_cursor": lambda: Posts.get_latest_posts_after_cursor(db, cursor, 20),
+        "posts.get_post_version": lambda: Posts.get_post_version(db, post.public_id),
+        "posts.get_page_versions": lambda: Posts.get_page_versions(db, 100, 20),
+        "posts.get_cursor_page_versions": lambda: Posts.get_cursor_page_versions(db, cursor, 20),
+        "posts.get_cursor_page_range": lambda: Posts.get_cursor_page_range(db, cursor, 20),
+        "posts.stream_posts": lambda: list(Posts.stream_posts(db, post.id, last_id)),
+        "search.search_posts": lambda: Search.search_posts(db, post.title.split()[0], None, 20),
+        "feed.get_entries_with_pagination": lambda: Feed.get_entries_with_pagination(db, 100, 20),
+        "feed.get_entries_after_cursor": lambda: Feed.get_entries_after_cursor(db, cursor, 20),
+        "feed.get_entries_page_range": lambda: Feed.get_entries_page_range(db, cursor, 20),
+        "feed.stream_entries": lambda: list(Feed.stream_entries(db, post.id, last_id)),
+        "jobs.claim_jobs": lambda: Jobs.claim_jobs(scratch, 10),
+        "jobs.requeue_stale_jobs": lambda: Jobs.requeue_stale_jobs(scratch),
+        "post_counts.get_posts_count[counter]": lambda: PostCounts.get_posts_count(db, "counter"),
+        "post_counts.get_posts_count[estimate]": lambda: PostCounts.get_posts_count(db, "estimate"),
+        "artifacts.get_all_artifacts": lambda: Artifacts.get_all_artifacts(db),
+        "artifacts.get_artifacts_count": lambda: Artifacts.get_artifacts_count(db),
+        "artifacts.get_artifact_by_id": lambda: Artifacts.get_artifact_by_id(db, artifact.public_id),
+        "artifacts.get_artifacts_between_ids": lambda: Artifacts.get_artifacts_between_ids(db, artifact.id, artifact.id + 100),
+    }
+
+
+def postgres_seq_scans(cursor, statement, parameters) -> list[str]:
+    cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    scans = []
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan":
+            scans.append(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return scans
+
+
+def sqlite_seq_scans(cursor, statement, parameters) -> list[str]:
+    cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+    scans = []
+    for row in cursor.fetchall():
+        detail = row[-1]
+        # Subqueries and FTS5 tables (searched through their own index) are
+        # scanned too, but only real tables matter here
+        table = detail.split()[1] if detail.startswith("SCAN ") else None
+        if table in Base.metadata.tables and " USING " not in detail:
+            scans.append(table)
+    return scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--no-seqscan", action="store_true", help="Postgres only: SET enable_seqscan = off")
+    args = parser.parse_args()
+
+    is_postgres = engine.dialect.name == "postgresql"
+    find_seq_scans = postgres_seq_scans if is_postgres else sqlite_seq_scans
+
+    recorder = QueryRecorder(engine)
+    db = SessionLocal()
+    scratch = ScratchSession(bind=engine)
+    connection = engine.raw_connection()
+    try:
+        post = db.query(Post).join(Post.artifacts).order_by(Post.id.desc()).first()
+        if post is None:
+            raise SystemExit("Need at least one post with an artifact, see seed.py")
+        artifact = post.artifacts[0]
+
+        cursor = connection.cursor()
+        if is_postgres and args.no_seqscan:
+            cursor.execute("SET enable_seqscan = off")
+
+        flagged = 0
+        for name, fn in service_queries(db, scratch, post, artifact).items():
+            statements = recorder.run(fn)
+            db.expunge_all()
+
+            scanned = {}
+            for statement, parameters in statements:
+                for table in find_seq_scans(cursor, statement, parameters):
+                    scanned.setdefault(table, statement)
+
+            if not scanned:
+                print(f"ok    {name}")
+            elif name in FULL_SCAN_EXPECTED:
+                print(f"ok    {name} (full scan of {', '.join(scanned)} is expected)")
+            else:
+                flagged += 1
+                print(f"SCAN  {name}: sequential scan on {', '.join(scanned)}")
+                for statement in scanned.values():
+                    print(f"      {' '.join(statement.split())}")
+        cursor.close()
+    finally:
+        connection.rollback()
+        connection.close()
+        scratch.rollback()
+        scratch.close()
+        db.close()
+
+    print(f"\n{flagged} service queries with sequential scans")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Load test for the API: many concurrent clients hammering a few endpoints,
+reporting p50/p99 latency and requests per second.
+
+Usage:
+    # Start a server per mode (sync, then DB_ASYNC=true) and compare them
+    python -m benchmarks.load_test --modes sync,async --clients 500 --duration 30
+
+    # Or load an already running server
+    python -m benchmarks.load_test --url http://localhost:8000 --clients 500
+
+Needs httpx (the `bench` extra). Servers are started against DATABASE_URL.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+DEFAULT_PATHS = ["/posts?page=1&page_size=5", "/posts?pagination=cursor&page_size=5"]
+
+
+async def client_loop(client: httpx.AsyncClient, paths: list[str], deadline: float, latencies: list[float], errors: list[int]):
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        t0 = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+                continue
+        except httpx.HTTPError:
+            errors.append(0)
+            continue
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+
+async def run_load(url: str, paths: list[str], clients: int, duration: float) -> dict:
+    latencies = []
+    errors = []
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client, paths, deadline, latencies, errors) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0,
+    }
+
+
+def start_server(mode: str, port: int, env: dict = None) -> subprocess.Popen:
+    env = dict(env or os.environ, DB_ASYNC="true" if mode == "async" else "false")
+    # Benchmark databases are created by seed.py, not migrated
+    env.setdefault("DB_AUTO_CREATE", "true")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.app:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            httpx.get(url + "/")
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"Server for mode {mode!r} did not start")
+
+
+def print_result(label: str, result: dict):
+    print(f"{label:>8} {result['rps']:>10.1f} {result['p50_ms']:>10.2f} {result['p99_ms']:>10.2f} {result['requests']:>9} {result['errors']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--modes", default="sync,async", help="comma separated: sync, async")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--path", action="append", dest="paths", help="request path, may be repeated")
+    args = parser.parse_args()
+
+    paths = args.paths or DEFAULT_PATHS
+    print(f"{'mode':>8} {'req/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'requests':>9} {'errors':>7}")
+
+    if args.url:
+        print_result("server", asyncio.run(run_load(args.url, paths, args.clients, args.duration)))
+        return
+
+    for mode in args.modes.split(","):
+        process = start_server(mode, args.port)
+        try:
+            result = asyncio.run(run_load(f"http://127.0.0.1:{args.port}", paths, args.clients, args.duration))
+        finally:
+            process.terminate()
+            process.wait()
+        print_result(mode, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+End-to-end benchmark of the media path with the local storage provider: no
+ImageKit account or network needed.
+
+Usage:
+    python -m benchmarks.media --files 200 --file-size 512 --clients 20
+
+Starts the API with STORAGE_PROVIDER=local on a fresh SQLite database and a
+temporary media directory, then measures, from concurrent clients:
+    upload    POST /posts/upload with one file per post
+    feed      GET /posts cursor pages, which sign every artifact URL
+    download  GET of each signed URL, whole file
+    range     GET of each signed URL with a 64 KiB Range (206)
+and reports req/s, MiB/s and p50/p90/p99 latency per phase. Needs httpx
+(the `bench` extra).
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.api import summarize
+from benchmarks.load_test import start_server
+
+RANGE_SIZE = 64 * 1024
+
+
+async def run_phase(requests: list, clients: int) -> dict:
+    """
+    Sends `requests` ((method, url, kwargs) tuples) from `clients` concurrent
+    clients and summarizes them, with the MiB/s received.
+    """
+    latencies = []
+    errors = 0
+    received = 0
+    queue = iter(requests)
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async def client_loop(client: httpx.AsyncClient):
+        nonlocal errors, received
+        for method, url, kwargs in queue:
+            t0 = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            if failed:
+                errors += 1
+            else:
+                latencies.append((time.perf_counter() - t0) * 1000)
+                received += len(response.content)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+    result = summarize(latencies, errors, elapsed)
+    result["mib_s"] = received / 2**20 / elapsed
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("sync", "async"), default="sync")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--files", type=int, default=200, help="posts to upload, one file each")
+    parser.add_argument("--file-size", type=int, default=512, help="KiB per file")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--clients", type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    url = f"http://127.0.0.1:{args.port}"
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{workdir}/bench.db",
+        DATABASE_REPLICA_URLS="",
+        CACHE_REDIS_URL="",
+        STORAGE_PROVIDER="local",
+        LOCAL_STORAGE_DIR=os.path.join(workdir, "media"),
+        LOCAL_STORAGE_URL=f"{url}/media",
+        LOCAL_STORAGE_SECRET="secret_bench",
+    )
+    payload = os.urandom(args.file_size * 1024)
+
+    process = start_server(args.mode, args.port, env)
+    try:
+        uploads = [
+            ("POST", url + "/posts/upload", {"data": {"title": f"Media {n}"}, "files": [("files", (f"{n}.jpg", payload, "image/jpeg"))]})
+            for n in range(args.files)
+        ]
+        results = {"upload": asyncio.run(run_phase(uploads, args.clients))}
+        # Uploads are measured by what is sent
+        results["upload"]["mib_s"] = len(payload) * results["upload"]["rps"] / 2**20
+
+        signed_urls = []
+        cursor = None
+        pages = []
+        while True:
+            params = {"pagination": "cursor", "page_size": args.page_size, **({"cursor": cursor} if cursor else {})}
+            pages.append(("GET", url + "/posts", {"params": params}))
+            page = httpx.get(url + "/posts", params=params).json()
+            signed_urls += [artifact["url"] for post in page["posts"] for artifact in post["artifacts"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        results["feed"] = asyncio.run(run_phase(pages, args.clients))
+
+        results["download"] = asyncio.run(run_phase([("GET", signed_url, {}) for signed_url in signed_urls], args.clients))
+        ranges = [("GET", signed_url, {"headers": {"Range": f"bytes=0-{RANGE_SIZE - 1}"}}) for signed_url in signed_urls]
+        results["range"] = asyncio.run(run_phase(ranges, args.clients))
+    finally:
+        process.terminate()
+        process.wait()
+
+    print(f"{args.files} files of {args.file_size} KiB, {args.clients} clients, {args.mode} mode\n")
+    print(f"{'phase':>10} {'requests':>9} {'req/s':>9} {'MiB/s':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, result in results.items():
+        print(f"{name:>10} {result['requests']:>9} {result['rps']:>9.1f} {result['mib_s']:>9.1f} {result['p50_ms']:>9.2f} {result['p90_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
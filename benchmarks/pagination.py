@@ -0,0 +1,102 @@
+"""
+Compares OFFSET pagination against keyset (cursor) pagination on GET /posts.
+
+Usage:
+    python -m benchmarks.pagination --posts 1000000 --page-size 5
+
+Runs against DATABASE_URL. If the posts table holds fewer than --posts rows,
+the missing rows are inserted first (this only happens once).
+"""
+import argparse
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from app.config.database import SessionLocal, engine, Base
+from app.models.post import Post
+import app.services.posts as Posts
+
+BATCH_SIZE = 10_000
+
+
+def fill_posts(db, target: int):
+    existing = Posts.get_posts_count(db)
+    if existing >= target:
+        return
+
+    print(f"Inserting {target - existing} posts (have {existing}, want {target})...")
+    start = datetime.now(timezone.utc) - timedelta(seconds=target)
+    for batch_start in range(existing, target, BATCH_SIZE):
+        batch_end = min(batch_start + BATCH_SIZE, target)
+        rows = []
+        for i in range(batch_start, batch_end):
+            created_at = start + timedelta(seconds=i)
+            rows.append({
+                "public_id": uuid4(),
+                "title": f"Benchmark Post {i}",
+                "content": f"This is the content for benchmark post {i}.",
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        db.execute(insert(Post), rows)
+        db.commit()
+
+
+def time_call(fn, repeat: int) -> float:
+    """Returns the median wall time of `fn` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(timings)
+
+
+def cursor_at(db, offset: int) -> str | None:
+    """Finds the cursor that points just before the row at `offset`."""
+    if offset == 0:
+        return None
+    post = (
+        db.query(Post)
+        .order_by(Post.id.desc())
+        .offset(offset - 1)
+        .limit(1)
+        .first()
+    )
+    return Posts.encode_cursor(post)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        fill_posts(db, args.posts)
+        total = Posts.get_posts_count(db)
+
+        print(f"{'page':>10} {'offset (ms)':>12} {'cursor (ms)':>12}")
+        page = 1
+        while (page - 1) * args.page_size < total:
+            offset = (page - 1) * args.page_size
+            cursor = cursor_at(db, offset)
+
+            offset_ms = time_call(lambda: Posts.get_latest_posts_with_pagination(db, offset, args.page_size), args.repeat)
+            cursor_ms = time_call(lambda: Posts.get_latest_posts_after_cursor(db, cursor, args.page_size), args.repeat)
+            db.expunge_all()
+
+            print(f"{page:>10} {offset_ms:>12.2f} {cursor_ms:>12.2f}")
+            page *= 10
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Measures GET /posts/search latency at the current table size.
+
+Usage:
+    python seed.py generate 1000000
+    python -m benchmarks.search --repeat 20 --target-ms 20
+
+Runs against DATABASE_URL and times Search.search_posts (first page and a page
+a few cursors deep) for common, combined and unmatched terms. `ranked` is the
+number of candidates the query ranks: when it equals SEARCH_MAX_CANDIDATES the
+term matches more posts and only the newest ones are ranked. Exits non-zero
+when a median is over --target-ms.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from sqlalchemy import func, select
+
+from app.config.database import SessionLocal
+import app.services.posts as Posts
+import app.services.search as Search
+
+# Words from seed.WORDS, so they match the generated dataset, and one that matches nothing
+DEFAULT_QUERIES = ["beach", "sunset beach", "coffee with friends", "the", "zebra"]
+
+
+def time_call(fn, repeat: int) -> tuple[float, float]:
+    """Returns the median and p95 wall time of `fn` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+
+
+def ranked_count(db, q: str) -> int:
+    candidates = Search.candidates(db.get_bind().dialect.name, q)
+    return db.execute(select(func.count()).select_from(candidates)).scalar()
+
+
+def cursor_after(db, q: str, pages: int, page_size: int) -> str | None:
+    cursor = None
+    for _ in range(pages):
+        _, cursor = Search.search_posts(db, q, cursor, page_size, include_content=False)
+        if cursor is None:
+            break
+    return cursor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("queries", nargs="*", default=DEFAULT_QUERIES)
+    parser.add_argument("--page-size", type=int, default=5)
+    parser.add_argument("--depth", type=int, default=10, help="pages followed before timing the deep page")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--target-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        total = Posts.get_posts_count(db)
+        print(f"{total} posts, SEARCH_MAX_CANDIDATES={Search.SEARCH_MAX_CANDIDATES}, target {args.target_ms:.0f} ms")
+        print(f"{'query':<24} {'ranked':>8} {'p50 (ms)':>10} {'p95 (ms)':>10} {'deep p50':>10}")
+
+        slowest = 0.0
+        for q in args.queries:
+            ranked = ranked_count(db, q)
+            p50, p95 = time_call(lambda: Search.search_posts(db, q, None, args.page_size), args.repeat)
+            cursor = cursor_after(db, q, args.depth, args.page_size)
+            deep = "-"
+            if cursor is not None:
+                deep_p50, _ = time_call(lambda: Search.search_posts(db, q, cursor, args.page_size), args.repeat)
+                deep = f"{deep_p50:.2f}"
+                slowest = max(slowest, deep_p50)
+            db.expunge_all()
+
+            capped = "*" if ranked >= Search.SEARCH_MAX_CANDIDATES else ""
+            print(f"{q:<24} {str(ranked) + capped:>8} {p50:>10.2f} {p95:>10.2f} {deep:>10}")
+            slowest = max(slowest, p50)
+        print("* capped: older matching posts are not ranked")
+    finally:
+        db.close()
+
+    if slowest > args.target_ms:
+        print(f"Slowest median {slowest:.2f} ms is over the target of {args.target_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
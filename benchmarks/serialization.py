@@ -0,0 +1,95 @@
+"""
+Microbenchmark of the time spent turning one feed page into JSON bytes.
+
+Usage:
+    python -m benchmarks.serialization --page-size 50 --artifacts-per-post 5
+
+Compares FastAPI's default path for a dict of ORM objects (jsonable_encoder +
+json.dumps), validation through the PostResponse model, and the direct
+row-to-bytes path in app/serialization.py. Needs no database: the posts are
+transient ORM objects.
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.artifact import Artifact
+from app.models.post import Post
+from app.schemas import FeedPageResponse
+import app.serialization as Serialization
+
+
+def make_page(page_size: int, artifacts_per_post: int) -> list[Post]:
+    now = datetime.now(timezone.utc)
+    posts = []
+    for i in range(page_size):
+        post = Post(id=i, public_id=uuid4(), title=f"Post {i}", content="Lorem ipsum dolor sit amet. " * 20, created_at=now, updated_at=now)
+        # set_committed_value leaves Artifact.post unset, as after a selectinload
+        set_committed_value(post, "artifacts", [
+            Artifact(
+                id=i * artifacts_per_post + n,
+                public_id=uuid4(),
+                post_id=i,
+                url=f"https://ik.imagekit.io/demo/{i}_{n}.jpg?ik-t=1700000000&ik-s={uuid4().hex}",
+                thumbnail_url=f"https://ik.imagekit.io/demo/tr:n-ik_ml_thumbnail/{i}_{n}.jpg",
+                file_id=uuid4().hex,
+                file_path=f"/{i}_{n}.jpg",
+                file_type="image",
+                created_at=now,
+                updated_at=now,
+            )
+            for n in range(artifacts_per_post)
+        ])
+        posts.append(post)
+    return posts
+
+
+def page_envelope(posts) -> dict:
+    return {"no_of_posts": 1000, "count_type": "exact", "posts": posts, "current_page": 1, "total_pages": 20}
+
+
+def jsonable_encoder_path(posts) -> bytes:
+    return json.dumps(jsonable_encoder(page_envelope(posts))).encode()
+
+
+def response_model_path(posts) -> bytes:
+    return FeedPageResponse.model_validate(page_envelope(posts), from_attributes=True).model_dump_json().encode()
+
+
+def orjson_path(posts) -> bytes:
+    return Serialization.dumps(page_envelope(Serialization.posts_to_dicts(posts)))
+
+
+def time_call(fn, repeat: int) -> float:
+    """Returns the median wall time of `fn` in microseconds."""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1_000_000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--artifacts-per-post", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    posts = make_page(args.page_size, args.artifacts_per_post)
+
+    print(f"{'path':>20} {'us/page':>10} {'bytes':>8}")
+    for name, fn in (("jsonable_encoder", jsonable_encoder_path), ("response model", response_model_path), ("orjson", orjson_path)):
+        body = fn(posts)
+        print(f"{name:>20} {time_call(lambda: fn(posts), args.repeat):>10.1f} {len(body):>8}")
+
+
+if __name__ == "__main__":
+    main()
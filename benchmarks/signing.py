@@ -0,0 +1,109 @@
+"""
+Microbenchmark of the cost per signed URL and per upload token.
+
+Usage:
+    python -m benchmarks.signing --urls 1000
+
+Compares signing every URL through the ImageKit SDK (what GET /signed_url did
+for each path), hmac.new() per URL, and the copied key state used by
+sign_path() and POST /signed_urls, with and without the signed URL cache.
+Upload tokens are compared the same way. The ImageKit provider is used
+whatever STORAGE_PROVIDER says; the local provider's HMAC-SHA256 signing is
+listed for comparison. Needs no network: signing is local, and dummy
+credentials are used if IMAGEKIT_* is not set.
+"""
+import argparse
+import hashlib
+import hmac
+import os
+import tempfile
+import time
+
+for name, value in (("IMAGEKIT_PUBLIC_KEY", "public_bench"), ("IMAGEKIT_PRIVATE_KEY", "private_bench"), ("IMAGEKIT_URL", "https://ik.imagekit.invalid/bench")):
+    os.environ.setdefault(name, value)
+os.environ.update(STORAGE_PROVIDER="imagekit", LOCAL_STORAGE_DIR=tempfile.mkdtemp(prefix="bench-"), LOCAL_STORAGE_SECRET="secret_bench")
+
+import app.services.artifact_processing as ArtifactProcessing
+import app.services.storage as Storage
+
+
+def sdk_sign(paths: list[str]):
+    for path in paths:
+        Storage.get_provider().sdk().url({"path": path, "signed": True, "expire_seconds": 600})
+
+
+def hmac_new_sign(paths: list[str]):
+    key = os.environ["IMAGEKIT_PRIVATE_KEY"].encode()
+    expires_at = int(time.time()) + 600
+    for path in paths:
+        hmac.new(key, f"{path.strip('/')}{expires_at}".encode(), hashlib.sha1).hexdigest()
+
+
+def copied_state_sign(paths: list[str]):
+    expires_at = int(time.time()) + 600
+    for path in paths:
+        ArtifactProcessing.sign_path(path, expires_at)
+
+
+def local_sign(paths: list[str]):
+    storage = Storage.LocalStorage()
+    expires_at = int(time.time()) + 600
+    for path in paths:
+        storage.sign_path(path, expires_at)
+
+
+def batch_cold(paths: list[str]):
+    ArtifactProcessing.signed_url_cache.clear()
+    ArtifactProcessing.generate_signed_urls(paths)
+
+
+def batch_warm(paths: list[str]):
+    ArtifactProcessing.generate_signed_urls(paths)
+
+
+def sdk_auth_params(count: int):
+    for _ in range(count):
+        Storage.get_provider().sdk().get_authentication_parameters()
+
+
+def batch_auth_params(count: int):
+    ArtifactProcessing.generate_auth_params_batch(count)
+
+
+def time_per_item(fn, arg, items: int, repeat: int) -> float:
+    """Returns the best time per item over `repeat` runs, in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best / items * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--urls", type=int, default=1000, help="paths per batch")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    paths = [f"/default/{n}_photo.jpg" for n in range(args.urls)]
+    ArtifactProcessing.signed_url_cache.maxsize = max(ArtifactProcessing.signed_url_cache.maxsize, args.urls)
+
+    print(f"{'signed URLs':>28} {'us/item':>9}")
+    for name, fn in (
+        ("ImageKit SDK", sdk_sign),
+        ("hmac.new per URL", hmac_new_sign),
+        ("copied key state", copied_state_sign),
+        ("local provider", local_sign),
+        ("batch, empty cache", batch_cold),
+        ("batch, cached", batch_warm),
+    ):
+        print(f"{name:>28} {time_per_item(fn, paths, args.urls, args.repeat):>9.2f}")
+
+    print(f"\n{'upload tokens':>28} {'us/item':>9}")
+    for name, fn in (("ImageKit SDK", sdk_auth_params), ("batch", batch_auth_params)):
+        print(f"{name:>28} {time_per_item(fn, args.urls, args.urls, args.repeat):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
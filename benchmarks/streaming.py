@@ -0,0 +1,71 @@
+"""
+Peak memory and response size of large feed pages, built in one piece and
+streamed.
+
+Usage:
+    python -m benchmarks.streaming --posts 5000 --page-size 50 1000
+
+For every page size, requests the cursor page as one JSON document and with
+?stream=ndjson and ?stream=json, in process through the TestClient, and
+reports the peak Python memory allocated while serving each (tracemalloc) and
+the body size without compression, with gzip and, if the brotli package is
+installed, with brotli. The response cache is disabled, so every request
+builds its body. The TestClient buffers whole response bodies, so the
+streamed peaks include one copy of the body on the client side.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.api import STUB_IMAGEKIT_ENV, ensure_posts
+
+
+def measure(client, path: str, encoding: str) -> tuple[float, float, int]:
+    """Returns (peak MiB, ms, bytes on the wire) for one request."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    with client.stream("GET", path, headers={"accept-encoding": encoding}) as response:
+        response.raise_for_status()
+        size = sum(len(chunk) for chunk in response.iter_raw())
+    elapsed = (time.perf_counter() - t0) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20, elapsed, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="defaults to a new SQLite database in a temporary directory")
+    parser.add_argument("--posts", type=int, default=5000, help="posts to generate first if the database has fewer")
+    parser.add_argument("--page-size", type=int, nargs="+", default=[50, 1000])
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{tempfile.mkdtemp(prefix='bench-')}/bench.db"
+    env = dict(os.environ, **STUB_IMAGEKIT_ENV, DATABASE_URL=database_url, DATABASE_REPLICA_URLS="", CACHE_REDIS_URL="", RESPONSE_CACHE_SIZE="0", DB_AUTO_CREATE="true")
+    ensure_posts(env, args.posts)
+    os.environ.update(env)
+
+    from fastapi.testclient import TestClient
+    from app.app import app
+    import app.compression as Compression
+
+    encodings = ["identity", "gzip"] + (["br"] if Compression.brotli is not None else [])
+    print(f"{'page size':>9} {'mode':>14} {'peak MiB':>9} {'ms':>8}  " + " ".join(f"{encoding + ' KiB':>13}" for encoding in encodings))
+    with TestClient(app) as client:
+        for page_size in args.page_size:
+            modes = {
+                "document": f"/posts?pagination=cursor&page_size={page_size}",
+                "stream=ndjson": f"/posts?stream=ndjson&page_size={page_size}",
+                "stream=json": f"/posts?stream=json&page_size={page_size}",
+            }
+            for mode, path in modes.items():
+                measure(client, path, "identity")  # warm up
+                peak, elapsed, _ = measure(client, path, "identity")
+                sizes = [measure(client, path, encoding)[2] for encoding in encodings]
+                print(f"{page_size:>9} {mode:>14} {peak:>9.2f} {elapsed:>8.1f}  " + " ".join(f"{size / 1024:>13.1f}" for size in sizes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Local stand-in for the ImageKit upload and file APIs used by POST /posts/upload.
+
+Usage:
+    python -m benchmarks.stub_storage --port 9000 --delay 0.2
+
+then start the API with
+    IMAGEKIT_UPLOAD_URL=http://127.0.0.1:9000/api/v1/files/upload
+    IMAGEKIT_API_URL=http://127.0.0.1:9000/v1
+
+Uploaded files are written to a temporary directory (--dir) and answered
+with ImageKit-shaped JSON. --delay adds latency per upload, to see the effect
+of concurrent uploads; --fail-every N rejects every Nth upload.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import shutil
+import tempfile
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+
+app = FastAPI()
+settings = {"dir": None, "delay": 0.0, "fail_every": 0}
+uploads = itertools.count(1)
+stored: dict[str, str] = {}
+
+
+@app.post("/api/v1/files/upload")
+async def upload(file: UploadFile = File(), fileName: str = Form()):
+    if settings["fail_every"] and next(uploads) % settings["fail_every"] == 0:
+        raise HTTPException(status_code=500, detail="Simulated upload failure")
+    await asyncio.sleep(settings["delay"])
+
+    file_id = uuid.uuid4().hex
+    name = f"{file_id}_{os.path.basename(fileName)}"
+    with open(os.path.join(settings["dir"], name), "wb") as f:
+        shutil.copyfileobj(file.file, f)
+    stored[file_id] = name
+
+    is_image = (file.content_type or "").startswith("image/")
+    return {
+        "fileId": file_id,
+        "name": name,
+        "filePath": f"/{name}",
+        "url": f"http://stub.invalid/{name}",
+        "thumbnailUrl": f"http://stub.invalid/tr:n-ik_ml_thumbnail/{name}" if is_image else None,
+        "fileType": "image" if is_image else "non-image",
+        "size": os.path.getsize(os.path.join(settings["dir"], name)),
+    }
+
+
+@app.delete("/v1/files/{file_id}", status_code=204)
+async def delete(file_id: str):
+    name = stored.pop(file_id, None)
+    if name is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    os.remove(os.path.join(settings["dir"], name))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--dir", help="where uploads are stored (default: a new temporary directory)")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds added to every upload")
+    parser.add_argument("--fail-every", type=int, default=0)
+    args = parser.parse_args()
+
+    settings.update(dir=args.dir or tempfile.mkdtemp(prefix="stub-storage-"), delay=args.delay, fail_every=args.fail_every)
+    print(f"Storing uploads in {settings['dir']}")
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
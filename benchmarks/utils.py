@@ -0,0 +1,23 @@
+from sqlalchemy import event
+
+
+class QueryRecorder:
+    """Records every statement sent through `engine` while `run` is active."""
+
+    def __init__(self, engine):
+        self.statements = []
+        self.active = False
+        event.listen(engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            self.statements.append((statement, parameters))
+
+    def run(self, fn):
+        self.statements = []
+        self.active = True
+        try:
+            fn()
+        finally:
+            self.active = False
+        return list(self.statements)
@@ -7,8 +7,6 @@ import math
 
 st.set_page_config(page_title="Simple Social", layout="wide")
 
-IMAGEKIT_UPLOAD_URL = "https://upload.imagekit.io/api/v1/files/upload"
-
 # --- STATE INITIALIZATION ---
 
 # This logic handles redirects from other pages
@@ -60,77 +58,15 @@ def upload_page():
             st.error("Please add a caption or upload at least one file.")
             return
 
-        artifacts_list = []
-
         with st.spinner("Uploading..."):
-            if uploaded_files:
-                progress = st.progress(0)
-
-                for idx, file in enumerate(uploaded_files):
-
-                    # 🔥 GET NEW AUTH PARAMS FOR EACH FILE
-                    try:
-                        auth_response = requests.get("http://localhost:8000/upload_auth_params")
-                        auth_response.raise_for_status()
-                        auth_data = auth_response.json()
-
-                        public_key = auth_data["public_key"]
-                        token = auth_data["token"]
-                        expire = auth_data["expire"]
-                        signature = auth_data["signature"]
-
-                    except Exception as e:
-                        st.error(f"Failed to get auth params: {e}")
-                        return
-
-                    # ---- UPLOAD FILE WITH THAT AUTH ----
-                    try:
-                        file_bytes = file.getvalue()
-
-                        upload_files = {
-                            'file': (file.name, file_bytes, file.type)
-                        }
-                        upload_data = {
-                            'fileName': file.name,
-                            'token': token,
-                            'expire': expire,
-                            'signature': signature,
-                            'publicKey': public_key
-                        }
-
-                        upload_response = requests.post(
-                            IMAGEKIT_UPLOAD_URL,
-                            files=upload_files,
-                            data=upload_data
-                        )
-                        upload_response.raise_for_status()
-                        upload_result = upload_response.json()
-
-                        artifacts_list.append({
-                            "file_id": upload_result.get("fileId"),
-                            "file_path": upload_result.get("filePath"),
-                            "file_type": upload_result.get("fileType"),
-                            "thumbnail_url": upload_result.get("thumbnailUrl"),
-                            "url": upload_result.get("url"),
-                        })
-
-                    except Exception as e:
-                        st.error(f"Upload failed: {e}")
-                        return
-
-                    # update progress
-                    progress.progress((idx + 1) / len(uploaded_files))
-
-                st.success("All files uploaded!")
-
-            # ---- Create post in backend ----
-            json_payload = {
-                "title": title,
-                "content": caption,
-                "artifacts": artifacts_list
-            }
-
-            response = requests.post("http://localhost:8000/posts", json=json_payload)
+            # The backend uploads the files to ImageKit concurrently and creates
+            # the post with their artifacts in the same request
+            upload_files = [("files", (file.name, file, file.type)) for file in uploaded_files or []]
+            response = requests.post(
+                "http://localhost:8000/posts/upload",
+                data={"title": title, "content": caption},
+                files=upload_files,
+            )
 
             if response.status_code == 200:
                 st.success("Posted! Redirecting to feed...")
@@ -1,12 +1,28 @@
-from app.config.database import SessionLocal, engine, Base
+import argparse
+import csv
+import io
+import math
+import multiprocessing
+import random
+import sys
+import time
+from sqlalchemy import func, insert, select, text
+from app.config.database import SessionLocal, engine
+import app.config.schema as Schema
+from app.models.artifact import Artifact
 from app.models.post import Post
-from uuid import uuid4
-from datetime import datetime, timezone
+import app.services.bulk_import as BulkImport
+import app.services.feed as Feed
+import app.services.post_counts as PostCounts
+import app.services.response_cache as ResponseCache
+from uuid import UUID, uuid4
+from datetime import datetime, timedelta, timezone
 
 def create_dummy_posts(num_posts: int = 15):
-    Base.metadata.create_all(bind=engine)
+    Schema.create_all()
     db = SessionLocal()
     try:
+        posts = []
         for i in range(1, num_posts + 1):
             post = Post(
                 public_id=uuid4(),
@@ -16,6 +32,10 @@ def create_dummy_posts(num_posts: int = 15):
                 updated_at=datetime.now(timezone.utc),
             )
             db.add(post)
+            posts.append(post)
+        db.flush()
+        Feed.refresh_entries(db, [post.id for post in posts])
+        ResponseCache.bump_generation(db, new_posts=num_posts)
         db.commit()
         print(f"Added {num_posts} dummy posts to the database.")
     except Exception as e:
@@ -24,5 +44,222 @@ def create_dummy_posts(num_posts: int = 15):
     finally:
         db.close()
 
+def import_posts(path: str, chunk_size: int = None):
+    """
+    Streams an NDJSON file (or stdin for "-") into the database chunk by chunk,
+    printing each chunk's result as it is committed.
+    """
+    Schema.create_all()
+    db = SessionLocal()
+    source = sys.stdin.buffer if path == "-" else open(path, "rb")
+    imported = rejected = failed = 0
+    started = time.perf_counter()
+    try:
+        for result in BulkImport.import_posts(db, source, chunk_size):
+            imported += result["imported"]
+            rejected += result["rejected"]
+            status = f"error: {result['error']}" if "error" in result else f"{result['imported']} imported"
+            print(f"chunk {result['chunk']} (lines {result['first_line']}-{result['last_line']}): {status}, {result['rejected']} rejected")
+            for error in result["errors"]:
+                print(f"  line {error['line']}: {error['error']}")
+            if "error" in result:
+                failed += 1
+    finally:
+        source.close()
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Imported {imported} posts in {elapsed:.1f}s ({imported / elapsed:.0f} posts/s), {rejected} lines rejected, {failed} chunks failed.")
+
+# Shape of the generated dataset. Artifacts per post and file types follow
+# typical social media mixes; content length is log-normal (median ~20 words
+# with a long tail) and posting volume grows over time.
+ARTIFACTS_PER_POST_WEIGHTS = {0: 30, 1: 40, 2: 14, 3: 7, 4: 4, 5: 2, 6: 1, 7: 1, 8: 0.5, 9: 0.3, 10: 0.2}
+FILE_TYPE_WEIGHTS = {"image": 80, "video": 20}
+CONTENT_WORDS_MU, CONTENT_WORDS_SIGMA, CONTENT_MAX_WORDS = math.log(20), 1.0, 1000
+WORDS = (
+    "the a an and or but of to in on at for with from by about after before over under "
+    "today tonight weekend morning sunset beach city street coffee food dinner friends family trip "
+    "travel hike mountain river lake park dog cat music concert game team win new old first last "
+    "best great amazing beautiful little big happy tired finally again always never love like "
+    "photo video view moment day night week year summer winter spring autumn home work project"
+).split()
+
+def generate_rows(seed: int, batch_no: int, batch_size: int, first_id: int, count: int, total: int, days: int, until: datetime):
+    """
+    Builds the post and artifact rows of one batch (`count` posts, fewer than
+    batch_size only for the last one). The rows depend only on the seed and
+    the batch position, so a dataset is reproducible whatever the number of
+    workers.
+    """
+    rng = random.Random(f"{seed}:{batch_no}")
+    span = timedelta(days=days).total_seconds()
+    posts, artifacts = [], []
+    for n in range(count):
+        index = batch_no * batch_size + n
+        # sqrt makes later periods denser, like a growing user base; timestamps
+        # still increase with ids as they would in production
+        created_at = until - timedelta(seconds=span * (1 - math.sqrt((index + 1) / total)))
+        updated_at = created_at + timedelta(hours=rng.expovariate(1 / 12)) if rng.random() < 0.05 else created_at
+        words = min(CONTENT_MAX_WORDS, max(1, int(rng.lognormvariate(CONTENT_WORDS_MU, CONTENT_WORDS_SIGMA))))
+        post_id = first_id + index
+        posts.append({
+            "id": post_id,
+            "public_id": UUID(int=rng.getrandbits(128), version=4),
+            "title": " ".join(rng.choices(WORDS, k=rng.randint(2, 10))).capitalize(),
+            "content": " ".join(rng.choices(WORDS, k=words)).capitalize() + ".",
+            "created_at": created_at,
+            "updated_at": updated_at,
+        })
+
+        (artifact_count,) = rng.choices(list(ARTIFACTS_PER_POST_WEIGHTS), weights=list(ARTIFACTS_PER_POST_WEIGHTS.values()))
+        for _ in range(artifact_count):
+            (file_type,) = rng.choices(list(FILE_TYPE_WEIGHTS), weights=list(FILE_TYPE_WEIGHTS.values()))
+            file_id = f"{rng.getrandbits(96):024x}"
+            file_path = f"/generated/{file_id}.{'jpg' if file_type == 'image' else 'mp4'}"
+            artifacts.append({
+                "public_id": UUID(int=rng.getrandbits(128), version=4),
+                "post_id": post_id,
+                "url": None,
+                "thumbnail_url": f"https://ik.imagekit.io/generated/tr:n-ik_ml_thumbnail{file_path}",
+                "file_id": file_id,
+                "file_path": file_path,
+                "file_type": file_type,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+    return posts, artifacts
+
+def copy_rows(cursor, table: str, rows: list[dict]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # Empty unquoted CSV fields are read back as NULL
+        writer.writerow(["" if value is None else value for value in row.values()])
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(rows[0])}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+def write_batch(args) -> tuple[int, int]:
+    """
+    Worker entry point: generates one batch and writes it with COPY on
+    Postgres (psycopg2) or multi-row INSERTs elsewhere.
+    """
+    posts, artifacts = generate_rows(*args)
+    if engine.dialect.driver == "psycopg2":
+        connection = engine.raw_connection()
+        try:
+            with connection.cursor() as cursor:
+                copy_rows(cursor, "posts", posts)
+                if artifacts:
+                    copy_rows(cursor, "artifacts", artifacts)
+            connection.commit()
+        finally:
+            connection.close()
+    else:
+        with engine.begin() as connection:
+            connection.execute(insert(Post), posts)
+            if artifacts:
+                connection.execute(insert(Artifact), artifacts)
+    return len(posts), len(artifacts)
+
+def init_worker():
+    # Connections inherited from the parent process must not be shared
+    engine.dispose(close=False)
+
+def generate_posts(count: int, workers: int, seed: int, batch_size: int, days: int, until: datetime):
+    """
+    Generates `count` posts with artifacts in parallel worker processes and
+    reports throughput. Post ids are assigned up front after the current
+    maximum, so workers never need to read back generated keys.
+    """
+    Schema.create_all()
+    if engine.dialect.name == "sqlite" and workers > 1:
+        print("SQLite allows a single writer, using 1 worker.")
+        workers = 1
+
+    with SessionLocal() as db:
+        first_id = (db.scalar(select(func.max(Post.id))) or 0) + 1
+
+    batch_count = math.ceil(count / batch_size)
+    batches = [
+        (seed, batch_no, batch_size, first_id, min(batch_size, count - batch_no * batch_size), count, days, until)
+        for batch_no in range(batch_count)
+    ]
+    print(f"Generating {count} posts (ids {first_id}-{first_id + count - 1}) with {workers} workers, seed {seed}...")
+
+    posts = artifacts = 0
+    started = time.perf_counter()
+    with multiprocessing.Pool(workers, initializer=init_worker) as pool:
+        for done, (batch_posts, batch_artifacts) in enumerate(pool.imap_unordered(write_batch, batches), start=1):
+            posts += batch_posts
+            artifacts += batch_artifacts
+            elapsed = time.perf_counter() - started
+            print(f"  {done}/{batch_count} batches, {posts} posts, {artifacts} artifacts, {posts / elapsed:.0f} posts/s", end="\r")
+
+    with SessionLocal() as db:
+        if engine.dialect.name == "postgresql":
+            # Ids were given explicitly, so move the sequence past them
+            db.execute(text("SELECT setval(pg_get_serial_sequence('posts', 'id'), (SELECT max(id) FROM posts))"))
+        ResponseCache.bump_generation(db, new_posts=posts)
+        db.commit()
+    if Feed.FEED_ENTRIES:
+        rebuild_feed()
+
+    elapsed = time.perf_counter() - started
+    print(f"\nGenerated {posts} posts and {artifacts} artifacts in {elapsed:.1f}s ({posts / elapsed:.0f} posts/s, {artifacts / elapsed:.0f} artifacts/s).")
+
+def rebuild_feed(batch_size: int = Feed.REBUILD_BATCH_SIZE):
+    """Regenerates the feed_entries table (see FEED_SOURCE) from posts and artifacts."""
+    Schema.create_all()
+    started = time.perf_counter()
+    written = 0
+    with SessionLocal() as db:
+        for written in Feed.rebuild(db, batch_size):
+            print(f"  {written} feed entries written", end="\r")
+        ResponseCache.bump_generation(db)
+        db.commit()
+    print(f"\nRebuilt {written} feed entries in {time.perf_counter() - started:.1f}s.")
+
+def recount_posts():
+    """Resets the posts counter (POST_COUNT_STRATEGY=counter) to the real count."""
+    Schema.create_all()
+    with SessionLocal() as db:
+        PostCounts.recount_posts(db)
+        db.commit()
+        print(f"Posts counter set to {PostCounts.get_posts_count(db, 'counter')[0]}.")
+
 if __name__ == "__main__":
-    create_dummy_posts(20) # Create 20 dummy posts
+    parser = argparse.ArgumentParser(description="Populate the database.")
+    commands = parser.add_subparsers(dest="command")
+
+    dummy = commands.add_parser("dummy", help="Create dummy posts (the default)")
+    dummy.add_argument("count", type=int, nargs="?", default=20)
+
+    importer = commands.add_parser("import", help="Import posts from an NDJSON file, one POST /posts body per line")
+    importer.add_argument("path", help='NDJSON file, or "-" for stdin')
+    importer.add_argument("--chunk-size", type=int, default=BulkImport.BULK_IMPORT_CHUNK_SIZE)
+
+    generator = commands.add_parser("generate", help="Generate a large, realistic dataset for load testing")
+    generator.add_argument("count", type=int, help="Number of posts")
+    generator.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    generator.add_argument("--seed", type=int, default=0, help="Same seed and arguments give the same dataset")
+    generator.add_argument("--batch-size", type=int, default=10_000)
+    generator.add_argument("--days", type=int, default=365, help="Time span covered by created_at")
+    generator.add_argument("--until", type=datetime.fromisoformat, default=datetime(2025, 1, 1), help="created_at of the newest post (UTC)")
+
+    rebuilder = commands.add_parser("rebuild-feed", help="Regenerate the feed_entries table from posts and artifacts")
+    rebuilder.add_argument("--batch-size", type=int, default=Feed.REBUILD_BATCH_SIZE)
+
+    commands.add_parser("recount-posts", help="Reset the posts counter used by POST_COUNT_STRATEGY=counter to the real count")
+
+    args = parser.parse_args()
+    if args.command == "import":
+        import_posts(args.path, args.chunk_size)
+    elif args.command == "generate":
+        generate_posts(args.count, args.workers, args.seed, args.batch_size, args.days, args.until)
+    elif args.command == "rebuild-feed":
+        rebuild_feed(args.batch_size)
+    elif args.command == "recount-posts":
+        recount_posts()
+    else:
+        create_dummy_posts(getattr(args, "count", 20)) # Create 20 dummy posts by default
@@ -0,0 +1,88 @@
+"""
+Production entry point for the API (main.py is the auto-reloading development
+server).
+
+Usage:
+    python serve.py                      # one worker per CPU
+    python serve.py --workers 4 --port 8080
+    python serve.py --max-requests 10000 # recycle workers now and then
+
+The database schema is checked once here, against the newest Alembic
+migration, before any worker starts (see app/config/schema.py); workers skip
+the check. Each worker logs its startup time per phase when it is ready, also
+available from /internal/startup and /metrics.
+
+Signals to the parent process:
+    SIGHUP            rolling restart: every worker is replaced by a new one,
+                      which must be ready before the old one is stopped
+    SIGTTIN/SIGTTOU   one worker more/less
+    SIGTERM/SIGINT    stop; in-flight requests get --graceful-timeout seconds
+"""
+import argparse
+import importlib.util
+import os
+import sys
+
+import uvicorn
+
+def available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def resolve(choice: str, fast: str, fallback: str) -> str:
+    # "auto" picks the faster implementation when its package is installed
+    # (the `server` extra)
+    if choice == "auto":
+        return fast if available(fast) else fallback
+    if choice == fast and not available(fast):
+        sys.exit(f"{fast} is not installed (install the `server` extra)")
+    return choice
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0")) or os.cpu_count(), help="worker processes (default: WEB_CONCURRENCY or one per CPU)")
+    parser.add_argument("--loop", choices=("auto", "uvloop", "asyncio"), default="auto")
+    parser.add_argument("--http", choices=("auto", "httptools", "h11"), default="auto")
+    parser.add_argument("--graceful-timeout", type=float, default=30, help="seconds in-flight requests get to finish on shutdown")
+    parser.add_argument("--keep-alive", type=int, default=5, help="seconds an idle connection is kept open")
+    parser.add_argument("--max-requests", type=int, help="restart a worker after this many requests")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--forwarded-allow-ips", default=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"), help="proxies trusted for X-Forwarded-* headers")
+    parser.add_argument("--access-log", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    loop = resolve(args.loop, "uvloop", "asyncio")
+    http = resolve(args.http, "httptools", "h11")
+
+    import app.config.schema as Schema
+    if not Schema.DB_AUTO_CREATE and Schema.DB_SCHEMA_CHECK:
+        try:
+            Schema.check_schema()
+        except Schema.SchemaError as e:
+            sys.exit(str(e))
+        finally:
+            # Workers are new processes and open their own connections
+            Schema.engine.dispose()
+        os.environ["DB_SCHEMA_CHECK"] = "false"
+
+    print(f"Starting {args.workers} workers on {args.host}:{args.port} (loop: {loop}, http: {http})", flush=True)
+    uvicorn.run(
+        "app.app:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_keep_alive=args.keep_alive,
+        limit_max_requests=args.max_requests,
+        backlog=args.backlog,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+        access_log=args.access_log,
+        log_level=args.log_level,
+    )
+
+if __name__ == "__main__":
+    main()
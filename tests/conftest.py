@@ -0,0 +1,95 @@
+import itertools
+import os
+import tempfile
+
+# Settings are read once, when app.config.settings is first imported, so the
+# test environment has to be in place before any app module is imported. A
+# developer's .env never overrides it (load_dotenv keeps existing variables).
+TEST_DIR = tempfile.mkdtemp(prefix="tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{TEST_DIR}/test.db",
+    DATABASE_REPLICA_URLS="",
+    DB_ASYNC="false",
+    DB_AUTO_CREATE="true",
+    CACHE_REDIS_URL="",
+    FEED_SOURCE="posts",
+    POST_COUNT_STRATEGY="exact",
+    ARTIFACT_PROCESSING="false",
+    PROFILING="false",
+    STORAGE_PROVIDER="imagekit",
+    IMAGEKIT_PUBLIC_KEY="public_test",
+    IMAGEKIT_PRIVATE_KEY="private_test",
+    IMAGEKIT_URL="https://ik.imagekit.invalid/test",
+)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.app import app
+import app.config.database as Database
+from app.config.database import Base, SessionLocal
+import app.services.artifact_processing as ArtifactProcessing
+import app.services.response_cache as ResponseCache
+import app.services.storage as Storage
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Entering the client runs the lifespan, which creates the tables
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def clean_database(client):
+    """Every test starts with empty tables and empty caches."""
+    with SessionLocal() as db:
+        for table in reversed(Base.metadata.sorted_tables):
+            db.execute(table.delete())
+        db.commit()
+    ResponseCache.response_cache.clear()
+    ArtifactProcessing.signed_url_cache.clear()
+    client.cookies.clear()
+    yield
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as db:
+        yield db
+
+
+@pytest.fixture
+def make_post(client):
+    """Creates a post through the API and returns the response body."""
+    def make_post(title="Post", content="Content", artifacts=()):
+        response = client.post("/posts", json={"title": title, "content": content, "artifacts": list(artifacts)})
+        assert response.status_code == 200, response.text
+        # Writes pin the client to fresh reads for a few seconds; tests of
+        # that send the cookie themselves
+        client.cookies.clear()
+        return response.json()
+    return make_post
+
+
+@pytest.fixture
+def replica(monkeypatch, tmp_path):
+    """An empty database standing in for a replica that lags behind."""
+    engine = create_engine(f"sqlite:///{tmp_path}/replica.db")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(Database, "replica_engines", [engine])
+    monkeypatch.setattr(Database, "_replica_cycle", itertools.cycle([engine]))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def local(monkeypatch, tmp_path):
+    """A LocalStorage provider in place of the configured one."""
+    monkeypatch.setattr(Storage, "LOCAL_STORAGE_DIR", str(tmp_path / "media"))
+    monkeypatch.setattr(Storage, "LOCAL_STORAGE_URL", "http://testserver/media")
+    monkeypatch.setattr(Storage, "LOCAL_STORAGE_SECRET", "secret_test")
+    provider = Storage.LocalStorage()
+    monkeypatch.setattr(Storage, "_provider", provider)
+    return provider
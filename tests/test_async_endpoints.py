@@ -0,0 +1,103 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+import app.async_endpoints as AsyncEndpoints
+import app.config.database as Database
+from app.models.artifact import Artifact
+
+ARTIFACT = {"file_id": "file_1", "file_path": "/photos/1.jpg", "file_type": "image", "thumbnail_url": ""}
+
+
+@pytest.fixture
+def async_client(monkeypatch):
+    """The DB_ASYNC=true endpoints, on an aiosqlite engine over the test database."""
+    # Connections are not kept between requests, so none outlives its event loop
+    engine = create_async_engine(Database.to_async_url(str(Database.engine.url)), poolclass=NullPool)
+    monkeypatch.setattr(Database, "async_engine", engine)
+    monkeypatch.setattr(Database, "AsyncSessionLocal", async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False))
+    app = FastAPI()
+    app.include_router(AsyncEndpoints.router)
+    with TestClient(app) as client:
+        yield client
+
+
+def create_post(client, title="Post", artifacts=()):
+    response = client.post("/posts", json={"title": title, "content": "Content", "artifacts": list(artifacts)})
+    assert response.status_code == 200, response.text
+    client.cookies.clear()
+    return response.json()
+
+
+def titles(response):
+    assert response.status_code == 200, response.text
+    return [post["title"] for post in response.json()["posts"]]
+
+
+def test_create_and_read_back(async_client, db):
+    post = create_post(async_client, "First", [ARTIFACT])
+
+    assert db.scalar(select(Artifact.file_id)) == "file_1"
+    response = async_client.get(f"/posts/{post['public_id']}")
+    assert response.status_code == 200
+    assert response.json()["title"] == "First"
+    assert [artifact["file_id"] for artifact in response.json()["artifacts"]] == ["file_1"]
+    assert async_client.get("/posts/00000000-0000-4000-8000-000000000000").status_code == 404
+
+
+def test_offset_pages(async_client):
+    for n in range(3):
+        create_post(async_client, f"Post {n}")
+
+    response = async_client.get("/posts", params={"page": 2, "page_size": 2})
+
+    assert titles(response) == ["Post 0"]
+    assert response.json()["no_of_posts"] == 3
+    assert async_client.get("/posts", params={"page": 3, "page_size": 2}).status_code == 404
+
+
+def test_cursor_pages(async_client):
+    for n in range(3):
+        create_post(async_client, f"Post {n}")
+
+    first = async_client.get("/posts", params={"pagination": "cursor", "page_size": 2})
+    second = async_client.get("/posts", params={"cursor": first.json()["next_cursor"], "page_size": 2})
+
+    assert titles(first) == ["Post 2", "Post 1"]
+    assert titles(second) == ["Post 0"]
+    assert second.json()["next_cursor"] is None
+    assert async_client.get("/posts", params={"cursor": "bad"}).status_code == 400
+
+
+def test_cached_pages_revalidate_and_see_new_posts(async_client):
+    create_post(async_client, "First")
+    response = async_client.get("/posts", params={"pagination": "cursor"})
+    etag = response.headers["etag"]
+
+    assert async_client.get("/posts", params={"pagination": "cursor"}, headers={"If-None-Match": etag}).status_code == 304
+
+    create_post(async_client, "Second")
+    assert titles(async_client.get("/posts", params={"pagination": "cursor"})) == ["Second", "First"]
+
+
+def test_stream(async_client):
+    for n in range(3):
+        create_post(async_client, f"Post {n}")
+
+    response = async_client.get("/posts", params={"stream": "ndjson", "page_size": 2})
+
+    assert response.status_code == 200
+    assert [json.loads(line)["title"] for line in response.text.splitlines()] == ["Post 2", "Post 1"]
+    assert "x-next-cursor" in response.headers
+
+
+def test_search(async_client):
+    create_post(async_client, "Beach sunset")
+    create_post(async_client, "Mountain lake")
+
+    assert titles(async_client.get("/posts/search", params={"q": "sunset"})) == ["Beach sunset"]
@@ -0,0 +1,62 @@
+import json
+
+import app.services.bulk_import as BulkImport
+
+
+def ndjson(*posts) -> str:
+    return "\n".join(post if isinstance(post, str) else json.dumps(post) for post in posts)
+
+
+def bulk(client, body, **params):
+    return client.post("/posts/bulk", params=params, content=body, headers={"Content-Type": "application/x-ndjson"})
+
+
+def test_posts_are_imported_in_chunks(client):
+    body = ndjson(*({"title": f"Post {n}", "content": "Content"} for n in range(5)))
+
+    response = bulk(client, body, chunk_size=2)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["imported"], result["rejected"], result["failed_chunks"]) == (5, 0, 0)
+    assert [chunk["imported"] for chunk in result["chunks"]] == [2, 2, 1]
+    page = client.get("/posts", params={"pagination": "cursor", "page_size": 10}).json()
+    assert sorted(post["title"] for post in page["posts"]) == [f"Post {n}" for n in range(5)]
+
+
+def test_artifacts_are_imported_with_their_posts(client):
+    artifact = {"file_id": "f1", "file_path": "/photos/1.jpg", "file_type": "image", "thumbnail_url": ""}
+    body = ndjson({"title": "With photo", "content": "Content", "artifacts": [artifact]}, {"title": "Without", "content": "Content"})
+
+    assert bulk(client, body).json()["imported"] == 2
+
+    posts = {post["title"]: post for post in client.get("/posts", params={"pagination": "cursor"}).json()["posts"]}
+    assert [artifact["file_path"] for artifact in posts["With photo"]["artifacts"]] == ["/photos/1.jpg"]
+    assert posts["Without"]["artifacts"] == []
+
+
+def test_invalid_lines_are_reported_and_skipped(client):
+    body = ndjson({"title": "Good", "content": "Content"}, "not json", {"title": "No content"}, "", {"title": "Also good", "content": "Content"})
+
+    result = bulk(client, body).json()
+
+    assert (result["imported"], result["rejected"]) == (2, 2)
+    assert [error["line"] for error in result["chunks"][0]["errors"]] == [2, 3]
+    assert "content" in result["chunks"][0]["errors"][1]["error"]
+
+
+def test_oversized_lines_stop_the_import(client, monkeypatch):
+    monkeypatch.setattr(BulkImport, "MAX_LINE_BYTES", 100)
+    body = ndjson({"title": "Fits", "content": "Content"}, {"title": "Too long", "content": "x" * 200})
+
+    response = bulk(client, body, chunk_size=1)
+
+    assert response.status_code == 413
+    # Chunks before the oversized line stay committed
+    assert response.json()["detail"]["imported"] == 1
+
+
+def test_iter_chunks_numbers_lines_and_skips_blanks():
+    chunks = list(BulkImport.iter_chunks(["a", "", "b", "c", "  "], chunk_size=2))
+
+    assert chunks == [(1, [(1, "a"), (3, "b")]), (2, [(4, "c")])]
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+import app.compression as Compression
+
+
+def large_page(client, make_post, encoding, **headers):
+    for n in range(10):
+        make_post(title=f"Post {n}", content="Words that compress well. " * 20)
+    return client.get("/posts", params={"pagination": "cursor", "page_size": 10}, headers={"Accept-Encoding": encoding, **headers})
+
+
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+def test_large_responses_are_compressed(client, make_post, encoding):
+    response = large_page(client, make_post, encoding)
+
+    assert response.headers["content-encoding"] == encoding
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert len(response.json()["posts"]) == 10
+
+
+def test_small_responses_are_sent_as_they_are(client, make_post):
+    make_post()
+
+    response = client.get("/posts", params={"pagination": "cursor"}, headers={"Accept-Encoding": "br"})
+
+    assert "content-encoding" not in response.headers
+
+
+def test_compressed_responses_have_weak_etags_that_revalidate(client, make_post):
+    response = large_page(client, make_post, "br")
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    revalidated = client.get("/posts", params={"pagination": "cursor", "page_size": 10}, headers={"Accept-Encoding": "br", "If-None-Match": etag})
+
+    assert revalidated.status_code == 304
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("br, gzip", "br"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("gzip", "gzip"),
+    ("*", "br"),
+    ("br;q=0, *;q=0.1", "gzip"),
+    ("identity", None),
+    ("", None),
+])
+def test_choose_encoding(accept_encoding, expected):
+    assert Compression.choose_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+def test_streamed_chunks_are_compressed(client, make_post, encoding):
+    for n in range(3):
+        make_post(title=f"Post {n}")
+
+    response = client.get("/posts", params={"stream": "ndjson", "page_size": 3}, headers={"Accept-Encoding": encoding})
+
+    assert response.headers["content-encoding"] == encoding
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert [line["title"] for line in map(json.loads, response.text.splitlines())] == ["Post 2", "Post 1", "Post 0"]
+
+
+def test_clients_without_compression_get_vary(client, make_post):
+    response = large_page(client, make_post, "identity")
+
+    assert "content-encoding" not in response.headers
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert len(response.json()["posts"]) == 10
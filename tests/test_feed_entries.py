@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.models.feed_entry import FeedEntry
+import app.services.feed as Feed
+import app.services.response_cache as ResponseCache
+
+ARTIFACT = {"file_id": "f1", "file_path": "/photos/1.jpg", "file_type": "image", "thumbnail_url": ""}
+
+REQUESTS = [
+    {"pagination": "cursor", "page_size": 2},
+    {"page": 2, "page_size": 2},
+    {"pagination": "cursor", "include_content": "false"},
+    {"stream": "json", "page_size": 10},
+]
+
+
+@pytest.fixture
+def entries(monkeypatch):
+    monkeypatch.setattr(Feed, "FEED_ENTRIES", True)
+
+
+def read_both(client, monkeypatch, params):
+    """The same request served from posts and from feed_entries."""
+    responses = []
+    for feed_entries in (False, True):
+        monkeypatch.setattr(Feed, "FEED_ENTRIES", feed_entries)
+        ResponseCache.response_cache.clear()
+        response = client.get("/posts", params=params)
+        assert response.status_code == 200, response.text
+        responses.append(response.json())
+    return responses
+
+
+@pytest.mark.parametrize("params", REQUESTS)
+def test_entries_serve_the_same_pages_as_posts(client, make_post, monkeypatch, entries, params):
+    for n in range(5):
+        make_post(title=f"Post {n}", artifacts=[ARTIFACT] if n % 2 else [])
+
+    from_posts, from_entries = read_both(client, monkeypatch, params)
+
+    assert from_entries == from_posts
+
+
+def test_rebuild_restores_missing_entries(client, db, make_post, monkeypatch, entries):
+    for n in range(5):
+        make_post(title=f"Post {n}", artifacts=[ARTIFACT])
+    db.execute(delete(FeedEntry))
+    db.commit()
+
+    written = list(Feed.rebuild(db, batch_size=2))
+
+    assert written == [2, 4, 5]
+    assert db.scalar(select(func.count()).select_from(FeedEntry)) == 5
+    from_posts, from_entries = read_both(client, monkeypatch, {"pagination": "cursor", "page_size": 10})
+    assert from_entries == from_posts
+
+
+def test_entries_are_not_written_when_disabled(db, make_post):
+    make_post()
+
+    assert db.scalar(select(func.count()).select_from(FeedEntry)) == 0
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from app.models.post import Post
+import app.services.response_cache as ResponseCache
+
+PAGES = [
+    {"pagination": "cursor", "page_size": 2},
+    {"page": 1, "page_size": 2},
+]
+
+
+@pytest.mark.parametrize("params", PAGES)
+def test_feed_pages_revalidate(client, make_post, params):
+    for n in range(3):
+        make_post(title=f"Post {n}")
+
+    response = client.get("/posts", params=params)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+    assert "last-modified" not in response.headers
+    etag = response.headers["etag"]
+
+    assert client.get("/posts", params=params, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/posts", params=params, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get("/posts", params=params, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_new_posts_change_older_offset_pages(client, make_post):
+    for n in range(4):
+        make_post(title=f"Post {n}")
+    params = {"page": 2, "page_size": 2}
+    response = client.get("/posts", params=params)
+    etag = response.headers["etag"]
+
+    make_post(title="Post 4")
+
+    # Nothing on the page was updated, yet it now holds other posts
+    for headers in ({"If-None-Match": etag}, {"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}):
+        response = client.get("/posts", params=params, headers=headers)
+        assert response.status_code == 200
+        assert [post["title"] for post in response.json()["posts"]] == ["Post 2", "Post 1"]
+        assert response.json()["no_of_posts"] == 5
+
+
+def test_single_posts_keep_last_modified(client, make_post):
+    post = make_post()
+    response = client.get(f"/posts/{post['public_id']}")
+
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    last_modified = response.headers["last-modified"]
+    assert client.get(f"/posts/{post['public_id']}", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+
+def test_post_revalidates_until_it_changes(client, db, make_post):
+    post = make_post()
+    url = f"/posts/{post['public_id']}"
+    etag = client.get(url).headers["etag"]
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    db.execute(update(Post).values(title="Edited", updated_at=datetime.now(timezone.utc) + timedelta(seconds=1)))
+    db.commit()
+    # Written behind the cache's back, so drop what it holds
+    ResponseCache.response_cache.clear()
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Edited"
+    assert response.headers["etag"] != etag
+
+
+def test_new_posts_change_the_first_page(client, make_post):
+    make_post(title="First")
+    params = {"pagination": "cursor"}
+    etag = client.get("/posts", params=params).headers["etag"]
+
+    make_post(title="Second")
+
+    response = client.get("/posts", params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [post["title"] for post in response.json()["posts"]] == ["Second", "First"]
+
+
+def test_revalidating_cached_responses_runs_no_query(client, make_post, monkeypatch):
+    post = make_post()
+    url = f"/posts/{post['public_id']}"
+    etag = client.get(url).headers["etag"]
+
+    def no_query(*args, **kwargs):
+        raise AssertionError("queried the database")
+    monkeypatch.setattr("app.services.posts.get_post_version", no_query)
+    monkeypatch.setattr("app.services.posts.get_post_by_id", no_query)
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    assert client.get(url).status_code == 200
+
+
+def test_missing_post(client):
+    assert client.get("/posts/00000000-0000-4000-8000-000000000000").status_code == 404
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.import_time import IMPORT_TIME_BUDGET, import_env, import_times
+
+
+def test_app_import_leaves_heavy_clients_unloaded(tmp_path):
+    # A fresh interpreter: the test process has already imported httpx
+    code = "import sys, app.app; print(' '.join(m for m in ('imagekitio', 'httpx') if m in sys.modules))"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path}/imports.db", "DB_AUTO_CREATE": "false"}
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+
+    assert result.stdout.strip() == ""
+
+
+def test_app_import_is_within_budget():
+    # Best of three cold imports, so a busy machine does not fail the test
+    total = min(import_times("app.app", import_env())["app.app"] for _ in range(3))
+
+    assert total <= IMPORT_TIME_BUDGET, f"import app.app took {total:.2f}s, budget {IMPORT_TIME_BUDGET}s"
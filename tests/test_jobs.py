@@ -0,0 +1,117 @@
+import json
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.models.artifact import Artifact
+from app.models.job import Job
+import app.services.artifact_processing as ArtifactProcessing
+import app.services.artifacts as Artifacts
+import app.services.jobs as Jobs
+import app.services.post_counts as PostCounts
+import app.services.response_cache as ResponseCache
+
+ARTIFACT = {"file_id": "file_1", "file_path": "/photos/1.jpg", "file_type": "image", "thumbnail_url": ""}
+
+
+@pytest.fixture(autouse=True)
+def handlers(monkeypatch):
+    monkeypatch.setattr(Jobs, "handlers", {})
+    Artifacts.register_handlers()
+
+
+@pytest.fixture
+def processing(monkeypatch):
+    monkeypatch.setattr(Artifacts, "ARTIFACT_PROCESSING", True)
+    details = {"thumbnail_url": "https://cdn.invalid/thumb.jpg", "metadata": {"width": 640, "height": 480, "size": 1000, "mime": "image/jpeg"}}
+    monkeypatch.setattr(ArtifactProcessing, "get_file_details", lambda file_id: details)
+
+
+def feed_statuses(client):
+    page = client.get("/posts", params={"pagination": "cursor"}).json()
+    return [artifact["processing_status"] for post in page["posts"] for artifact in post["artifacts"]]
+
+
+def test_processed_artifacts_show_up_in_cached_feeds(client, db, make_post, processing):
+    make_post(artifacts=[ARTIFACT])
+    assert feed_statuses(client) == ["pending"]
+    assert db.scalar(select(Job.kind)) == Jobs.PROCESS_ARTIFACTS
+
+    assert Jobs.work() == 1
+
+    assert db.scalars(select(Job)).all() == []
+    artifact = db.scalar(select(Artifact))
+    assert (artifact.processing_status, artifact.thumbnail_url) == ("done", "https://cdn.invalid/thumb.jpg")
+    assert feed_statuses(client) == ["done"]
+
+
+def test_imported_artifacts_are_processed(client, db, processing):
+    body = json.dumps({"title": "Imported", "content": "Content", "artifacts": [ARTIFACT]})
+
+    response = client.post("/posts/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 200, response.text
+    assert db.scalar(select(Artifact.processing_status)) == "pending"
+    assert Jobs.work() == 1
+    db.expire_all()
+    assert db.scalar(select(Artifact.processing_status)) == "done"
+
+
+def test_claims_never_overlap(db):
+    for n in range(5):
+        Jobs.enqueue(db, "noop", {"n": n})
+    db.commit()
+
+    first = Jobs.claim_jobs(db, 3)
+    second = Jobs.claim_jobs(db, 3)
+
+    assert len(first) == 3 and len(second) == 2
+    assert {job.payload["n"] for job in first + second} == set(range(5))
+    assert Jobs.claim_jobs(db, 3) == []
+
+
+def test_failed_jobs_are_retried_then_given_up(db, make_post, processing, monkeypatch):
+    monkeypatch.setattr(Jobs, "JOB_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(Jobs, "JOB_RETRY_DELAY", 0)
+
+    def unavailable(file_id):
+        raise ConnectionError("storage unavailable")
+    monkeypatch.setattr(ArtifactProcessing, "get_file_details", unavailable)
+    make_post(artifacts=[ARTIFACT])
+
+    assert Jobs.work() == 1
+    job = db.scalar(select(Job))
+    assert (job.status, job.attempts) == (Jobs.QUEUED, 1)
+    assert "storage unavailable" in job.last_error
+
+    assert Jobs.work() == 1
+    db.expire_all()
+    assert db.scalar(select(Job.status)) == Jobs.FAILED
+    assert db.scalar(select(Artifact.processing_status)) == "failed"
+    assert Jobs.work() == 0
+
+
+def test_stale_running_jobs_are_requeued(db):
+    Jobs.enqueue(db, "noop", {})
+    db.commit()
+    [job] = Jobs.claim_jobs(db, 1)
+    db.execute(update(Job).values(locked_at=Jobs.utcnow() - timedelta(seconds=Jobs.JOB_LOCK_TIMEOUT + 1)))
+    db.commit()
+
+    assert Jobs.requeue_stale_jobs(db) == 1
+    assert [job.id for job in Jobs.claim_jobs(db, 1)] == [job.id]
+
+
+def test_generation_bumps_are_seen_by_other_processes(db, monkeypatch):
+    monkeypatch.setattr(ResponseCache, "RESPONSE_CACHE_GENERATION_CHECK", 0)
+    before = ResponseCache.get_generation()
+
+    ResponseCache.bump_generation(db)
+    db.rollback()
+    assert ResponseCache.get_generation() == before
+
+    # What a bump in another process (worker.py, another API worker) looks like
+    PostCounts.increment_counter(db, ResponseCache.GENERATION_COUNTER)
+    db.commit()
+    assert ResponseCache.get_generation() == before + 1
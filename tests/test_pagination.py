@@ -0,0 +1,44 @@
+import pytest
+
+
+def test_cursor_pages_cover_every_post_once(client, make_post):
+    ids = [make_post(title=f"Post {n}")["public_id"] for n in range(7)]
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"pagination": "cursor", "page_size": 3, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/posts", params=params).json()
+        seen += [post["public_id"] for post in page["posts"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == list(reversed(ids))
+
+
+def test_offset_and_cursor_pages_agree(client, make_post):
+    for n in range(5):
+        make_post(title=f"Post {n}")
+
+    offset_page = client.get("/posts", params={"page": 1, "page_size": 2}).json()
+    cursor_page = client.get("/posts", params={"pagination": "cursor", "page_size": 2}).json()
+
+    assert [post["public_id"] for post in offset_page["posts"]] == [post["public_id"] for post in cursor_page["posts"]]
+    assert offset_page["no_of_posts"] == 5
+    assert offset_page["total_pages"] == 3
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/posts", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+@pytest.mark.parametrize("page_size", [0, -1, 10_000])
+@pytest.mark.parametrize("params", [{"pagination": "cursor"}, {"page": 1}, {"stream": "ndjson"}])
+def test_out_of_range_page_size_is_rejected(client, make_post, params, page_size):
+    make_post()
+    assert client.get("/posts", params={**params, "page_size": page_size}).status_code == 422
+
+
+def test_search_rejects_page_size_zero(client):
+    assert client.get("/posts/search", params={"q": "beach", "page_size": 0}).status_code == 422
@@ -0,0 +1,20 @@
+import app.config.database as Database
+
+
+def test_pool_stats_count_checkouts(client, make_post):
+    before = client.get("/internal/pool").json()["primary"]["checkouts"]
+
+    make_post()
+
+    stats = client.get("/internal/pool").json()["primary"]
+    assert stats["checkouts"] > before
+    assert stats["in_use"] == 0
+    assert stats["timeouts"] == 0
+    assert sum(stats["wait_histogram"].values()) == stats["checkouts"]
+
+
+def test_metrics_include_pools(client):
+    body = client.get("/metrics").text
+
+    for name in Database.pooled_engines:
+        assert f'app_db_pool_checkouts_total{{engine="{name}"}}' in body
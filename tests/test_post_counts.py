@@ -0,0 +1,95 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app.models.counter import Counter
+import app.config.schema as Schema
+import app.services.post_counts as PostCounts
+import app.services.response_cache as ResponseCache
+import seed
+
+
+@pytest.fixture(autouse=True)
+def counter_strategy(monkeypatch):
+    monkeypatch.setattr(PostCounts, "POST_COUNT_STRATEGY", "counter")
+
+
+def counter_value(db):
+    return db.scalar(select(Counter.value).where(Counter.name == PostCounts.POSTS_COUNTER))
+
+
+def test_counter_follows_created_posts(client, db, make_post):
+    for n in range(3):
+        make_post(title=f"Post {n}")
+
+    assert counter_value(db) == 3
+    assert PostCounts.get_posts_count(db, "counter") == (3, True)
+
+
+def test_other_strategies_leave_the_counter_alone(client, db, make_post, monkeypatch):
+    monkeypatch.setattr(PostCounts, "POST_COUNT_STRATEGY", "exact")
+    for n in range(2):
+        make_post(title=f"Post {n}")
+    assert counter_value(db) is None
+
+    PostCounts.recount_posts(db)
+    db.commit()
+    assert counter_value(db) == 2
+
+
+def test_counter_follows_bulk_import(client, db, make_post):
+    make_post()
+    body = "\n".join(json.dumps({"title": f"Imported {n}", "content": "Content"}) for n in range(4))
+
+    response = client.post("/posts/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 200, response.text
+    assert counter_value(db) == 5
+
+
+def test_increment_creates_missing_row_and_adds_up(db):
+    PostCounts.increment_posts_counter(db, by=2)
+    PostCounts.increment_posts_counter(db)
+    db.commit()
+
+    assert counter_value(db) == 3
+
+
+def test_posts_and_generation_share_one_upsert(db):
+    ResponseCache.bump_generation(db, new_posts=2)
+    ResponseCache.bump_generation(db)
+    db.commit()
+
+    assert dict(db.execute(select(Counter.name, Counter.value)).all()) == {PostCounts.POSTS_COUNTER: 2, ResponseCache.GENERATION_COUNTER: 2}
+
+
+def test_writes_skip_counters_nothing_reads(client, db, make_post, monkeypatch):
+    monkeypatch.setattr(PostCounts, "POST_COUNT_STRATEGY", "exact")
+    monkeypatch.setattr(ResponseCache, "RESPONSE_CACHE_SIZE", 0)
+
+    make_post()
+
+    assert db.scalars(select(Counter)).all() == []
+
+
+def test_create_all_seeds_counter_from_existing_posts(db, make_post):
+    for n in range(2):
+        make_post(title=f"Post {n}")
+    db.query(Counter).delete()
+    db.commit()
+
+    Schema.create_all()
+    # Existing rows are left alone
+    Schema.create_all()
+
+    assert counter_value(db) == 2
+
+
+def test_dummy_posts_are_counted(db, make_post):
+    make_post()
+
+    seed.create_dummy_posts(4)
+
+    assert counter_value(db) == 5
+    assert PostCounts.get_exact_posts_count(db) == 5
@@ -0,0 +1,49 @@
+import threading
+
+import app.profiling as Profiling
+
+
+def test_concurrent_profiled_requests_run_one_profiler():
+    first_started = threading.Event()
+    second_done = threading.Event()
+    errors = []
+
+    @Profiling.profiled_endpoint
+    def endpoint(first: bool):
+        if first:
+            first_started.set()
+            assert second_done.wait(5)
+        return "ok"
+
+    def request(profile: Profiling.RequestProfile, first: bool):
+        # Each request asked for a profile, as X-Profile: 1 does
+        profile.profiler = True
+        Profiling.current_profile.set(profile)
+        try:
+            assert endpoint(first) == "ok"
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            if not first:
+                second_done.set()
+
+    first, second = Profiling.RequestProfile(), Profiling.RequestProfile()
+    threads = [threading.Thread(target=request, args=(first, True))]
+    threads[0].start()
+    assert first_started.wait(5)
+    threads.append(threading.Thread(target=request, args=(second, False)))
+    threads[1].start()
+    for thread in threads:
+        thread.join(5)
+
+    assert errors == []
+    assert first.profiler not in (None, True)
+    assert second.profiler is None
+
+    # The profiler is free again once the first request is done
+    third = Profiling.RequestProfile()
+    thread = threading.Thread(target=request, args=(third, False))
+    thread.start()
+    thread.join(5)
+    assert errors == []
+    assert third.profiler not in (None, True)
@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+import app.config.database as Database
+
+
+@pytest.fixture(autouse=True)
+def use_replica(replica):
+    return replica
+
+
+def feed(client):
+    return [post["title"] for post in client.get("/posts", params={"pagination": "cursor"}).json()["posts"]]
+
+
+def test_reads_go_to_the_replica(client, make_post):
+    post = make_post(title="First")
+
+    assert feed(client) == []
+    assert client.get(f"/posts/{post['public_id']}").status_code == 404
+    assert client.get("/posts", params={"stream": "ndjson"}).text == ""
+
+
+def test_writers_read_from_the_primary(client):
+    response = client.post("/posts", json={"title": "First", "content": "Content"})
+    post = response.json()
+
+    # The client keeps the cookie from the write
+    assert feed(client) == ["First"]
+    assert client.get(f"/posts/{post['public_id']}").status_code == 200
+
+
+@pytest.mark.parametrize("cookie", [str(time.time() - 1), "not a time", ""])
+def test_expired_or_invalid_cookies_read_from_the_replica(client, make_post, cookie):
+    make_post(title="First")
+    client.cookies.set(Database.READ_PRIMARY_COOKIE, cookie)
+
+    assert feed(client) == []
+
+
+def test_sticky_cookie_lasts_replica_sticky_seconds(client):
+    response = client.post("/posts", json={"title": "First", "content": "Content"})
+
+    until = float(response.cookies[Database.READ_PRIMARY_COOKIE])
+    assert until == pytest.approx(time.time() + Database.REPLICA_STICKY_SECONDS, abs=2)
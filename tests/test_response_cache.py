@@ -0,0 +1,84 @@
+import time
+
+from sqlalchemy import update
+
+import app.config.database as Database
+from app.models.counter import Counter
+from app.models.post import Post
+import app.services.response_cache as ResponseCache
+
+
+def titles(response):
+    assert response.status_code == 200, response.text
+    return [post["title"] for post in response.json()["posts"]]
+
+
+def feed(client):
+    return titles(client.get("/posts", params={"pagination": "cursor"}))
+
+
+def test_recent_writers_bypass_the_cache(client, db, make_post):
+    make_post(title="First")
+    assert feed(client) == ["First"]
+
+    # Written by another worker, whose generation bump this process missed
+    db.add(Post(title="Second", content="Content"))
+    db.commit()
+    assert feed(client) == ["First"]
+
+    client.cookies.set(Database.READ_PRIMARY_COOKIE, str(time.time() + 5))
+    assert feed(client) == ["Second", "First"]
+
+    # ... without filling it either
+    client.cookies.clear()
+    assert feed(client) == ["First"]
+
+
+def test_writes_set_the_cookie_without_replicas(client):
+    response = client.post("/posts", json={"title": "Post", "content": "Content"})
+
+    assert Database.READ_PRIMARY_COOKIE in response.cookies
+
+
+def catch_up(replica, db):
+    """Copies the primary's posts and counters to the replica."""
+    with replica.begin() as connection:
+        for table in (Post.__table__, Counter.__table__):
+            connection.execute(table.delete())
+            rows = [dict(row._mapping) for row in db.execute(table.select())]
+            if rows:
+                connection.execute(table.insert(), rows)
+
+
+def test_lagging_replicas_do_not_fill_the_cache(client, db, make_post, replica):
+    make_post(title="First")
+
+    # The replica has not seen the post, so its empty page is not cached
+    assert feed(client) == []
+    assert client.get("/posts", params={"page": 1}).json()["posts"] == []
+
+    catch_up(replica, db)
+    assert feed(client) == ["First"]
+    assert titles(client.get("/posts", params={"page": 1})) == ["First"]
+
+    # Cached now, even once the replica loses the post again
+    with replica.begin() as connection:
+        connection.execute(Post.__table__.delete())
+    assert feed(client) == ["First"]
+    assert titles(client.get("/posts", params={"page": 1})) == ["First"]
+
+
+def test_lagging_replicas_do_not_fill_post_details(client, db, make_post, replica):
+    post = make_post(title="First")
+    catch_up(replica, db)
+    url = f"/posts/{post['public_id']}"
+    assert client.get(url).json()["title"] == "First"
+
+    # An edit bumps the generation; the replica still has the old title
+    db.execute(update(Post).values(title="Edited"))
+    ResponseCache.bump_generation(db)
+    db.commit()
+    assert client.get(url).json()["title"] == "First"
+
+    catch_up(replica, db)
+    assert client.get(url).json()["title"] == "Edited"
@@ -0,0 +1,56 @@
+import logging
+
+import pytest
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, text
+
+import app.config.schema as Schema
+
+
+@pytest.fixture
+def database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/schema.db")
+    yield engine
+    engine.dispose()
+
+
+def stamp(engine, revision: str):
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        connection.execute(text("DELETE FROM alembic_version"))
+        connection.execute(text("INSERT INTO alembic_version VALUES (:revision)"), {"revision": revision})
+
+
+def revisions() -> list[str]:
+    """Newest first."""
+    script = ScriptDirectory.from_config(Config(Schema.ALEMBIC_CONFIG))
+    return [revision.revision for revision in script.walk_revisions()]
+
+
+def test_unmigrated_database_is_refused(database):
+    with pytest.raises(Schema.SchemaError, match="no Alembic revision"):
+        Schema.check_schema(database)
+
+
+def test_database_at_head_passes(database):
+    stamp(database, revisions()[0])
+
+    Schema.check_schema(database)
+
+
+def test_database_behind_is_refused(database):
+    stamp(database, revisions()[1])
+
+    with pytest.raises(Schema.SchemaError, match="alembic upgrade head"):
+        Schema.check_schema(database)
+
+
+def test_database_ahead_is_only_logged(database, caplog):
+    stamp(database, "ffffffffffff")
+
+    with caplog.at_level(logging.WARNING, logger="uvicorn.error"):
+        Schema.check_schema(database)
+
+    assert "newer than this code" in caplog.text
+
@@ -0,0 +1,57 @@
+import pytest
+
+
+def search(client, q, **params):
+    response = client.get("/posts/search", params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_title_matches_rank_above_content_matches(client, make_post):
+    make_post(title="Weekend plans", content="Going to the beach")
+    make_post(title="Beach day", content="Sun and sand")
+    make_post(title="Dinner", content="Pasta again")
+
+    titles = [post["title"] for post in search(client, "beach")["posts"]]
+
+    assert titles == ["Beach day", "Weekend plans"]
+
+
+def test_terms_are_stemmed_and_anded(client, make_post):
+    make_post(title="Hiking", content="We hiked up the mountain")
+    make_post(title="Mountain", content="A view of the lake")
+
+    assert [post["title"] for post in search(client, "hike mountains")["posts"]] == ["Hiking"]
+
+
+def test_cursor_pages_cover_every_match_once(client, make_post):
+    ids = {make_post(title=f"Coffee {n}")["public_id"] for n in range(7)}
+    make_post(title="Tea")
+
+    seen = []
+    cursor = None
+    while True:
+        page = search(client, "coffee", page_size=3, **({"cursor": cursor} if cursor else {}))
+        seen += [post["public_id"] for post in page["posts"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(ids) and set(seen) == ids
+
+
+@pytest.mark.parametrize("q", ['"unbalanced', "title:coffee", "coffee OR", "NEAR(a b)", "*"])
+def test_query_syntax_is_not_interpreted(client, make_post, q):
+    make_post(title="Coffee")
+
+    search(client, q)
+
+
+def test_bad_requests(client):
+    assert client.get("/posts/search", params={"q": "  "}).status_code == 400
+    assert client.get("/posts/search", params={"q": "coffee", "cursor": "nope"}).status_code == 400
+
+
+def test_candidate_cap_is_documented(client):
+    description = client.get("/openapi.json").json()["paths"]["/posts/search"]["get"]["description"]
+    assert "SEARCH_MAX_CANDIDATES" in description
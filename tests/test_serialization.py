@@ -0,0 +1,23 @@
+from datetime import datetime, timedelta, timezone
+
+import app.serialization as Serialization
+
+
+def test_created_post_matches_what_is_read_back(client, make_post):
+    created = make_post()
+
+    fetched = client.get(f"/posts/{created['public_id']}").json()
+    listed = client.get("/posts", params={"pagination": "cursor"}).json()["posts"][0]
+
+    for field in ("created_at", "updated_at"):
+        assert created[field] == fetched[field] == listed[field]
+        assert created[field].endswith("+00:00")
+
+
+def test_as_utc():
+    naive = datetime(2026, 1, 2, 3, 4, 5)
+    utc = naive.replace(tzinfo=timezone.utc)
+
+    assert Serialization.as_utc(naive) == utc
+    assert Serialization.as_utc(utc) == utc
+    assert Serialization.as_utc(datetime(2026, 1, 2, 5, 4, 5, tzinfo=timezone(timedelta(hours=2)))) == utc
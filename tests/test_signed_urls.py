@@ -0,0 +1,71 @@
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import app.services.artifact_processing as ArtifactProcessing
+import app.services.cache as Cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """time.time() under the test's control, for the URL windows and the caches."""
+    now = [1_800_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def expiry(url: str) -> int:
+    return int(parse_qs(urlsplit(url).query)["ik-t"][0])
+
+
+def test_urls_are_reused_within_a_window(clock):
+    first = ArtifactProcessing.generate_signed_url("/photos/1.jpg")
+    hits = ArtifactProcessing.signed_url_cache.hits
+    clock[0] += 60
+    second = ArtifactProcessing.generate_signed_url("/photos/1.jpg")
+
+    assert first == second
+    assert ArtifactProcessing.signed_url_cache.hits == hits + 1
+
+
+def test_served_urls_are_never_close_to_expiring(clock):
+    margin = ArtifactProcessing.SIGNED_URL_REFRESH_MARGIN
+    for _ in range(30):
+        url = ArtifactProcessing.generate_signed_url("/photos/1.jpg")
+        remaining = expiry(url) - clock[0]
+        assert margin <= remaining <= 600
+        clock[0] += 37
+
+
+def test_new_window_signs_again(clock):
+    first = ArtifactProcessing.generate_signed_url("/photos/1.jpg")
+    _, bucket_end, _ = ArtifactProcessing.signed_url_window(600, clock[0])
+    clock[0] = bucket_end
+
+    second = ArtifactProcessing.generate_signed_url("/photos/1.jpg")
+
+    assert second != first
+    assert expiry(second) > expiry(first)
+
+
+def test_batches_match_single_urls(clock):
+    paths = ["/photos/1.jpg", "/photos/2.jpg", "/photos/1.jpg"]
+
+    urls = ArtifactProcessing.generate_signed_urls(paths)
+
+    assert list(urls) == ["/photos/1.jpg", "/photos/2.jpg"]
+    assert urls == {path: ArtifactProcessing.generate_signed_url(path) for path in paths}
+
+
+def test_lru_cache_expires_and_evicts(clock):
+    cache = Cache.LRUCache(2)
+    cache.set("a", 1, ttl=10)
+    cache.set("b", 2, ttl=10)
+    cache.get("a")
+    cache.set("c", 3, ttl=10)
+
+    # "b" was the least recently used
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    clock[0] += 10
+    assert cache.get("a") is None
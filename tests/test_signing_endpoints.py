@@ -0,0 +1,37 @@
+import app.services.artifact_processing as ArtifactProcessing
+
+
+def test_signed_urls_batch(client):
+    paths = ["/photos/1.jpg", "/photos/2.jpg", "/photos/1.jpg"]
+
+    response = client.post("/signed_urls", json={"file_paths": paths})
+
+    assert response.status_code == 200
+    urls = response.json()["signed_urls"]
+    assert sorted(urls) == ["/photos/1.jpg", "/photos/2.jpg"]
+    assert urls["/photos/1.jpg"] == client.get("/signed_url", params={"file_path": "/photos/1.jpg"}).json()
+
+
+def test_signed_urls_batch_limit(client, monkeypatch):
+    monkeypatch.setattr(ArtifactProcessing, "SIGNING_BATCH_MAX", 2)
+
+    response = client.post("/signed_urls", json={"file_paths": ["/a", "/b", "/c"]})
+
+    assert response.status_code == 400
+
+
+def test_auth_params_batch(client, local):
+    params = client.get("/upload_auth_params/batch", params={"count": 3}).json()
+
+    assert len(params) == 3
+    assert len({p["token"] for p in params}) == 3
+    assert len({p["expire"] for p in params}) == 1
+    assert all(local.verify_auth_params(p["token"], p["expire"], p["signature"]) for p in params)
+
+
+def test_auth_params_batch_count_bounds(client, monkeypatch):
+    monkeypatch.setattr(ArtifactProcessing, "SIGNING_BATCH_MAX", 5)
+
+    for count in (0, 6):
+        assert client.get("/upload_auth_params/batch", params={"count": count}).status_code == 400
+    assert len(client.get("/upload_auth_params/batch", params={"count": 5}).json()) == 5
@@ -0,0 +1,114 @@
+import asyncio
+import io
+import os
+import time
+from urllib.parse import urlsplit
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.datastructures import Headers, UploadFile
+
+import app.media_endpoints as MediaEndpoints
+import app.services.artifact_processing as ArtifactProcessing
+import app.services.storage as Storage
+
+
+@pytest.fixture
+def media(local):
+    app = FastAPI()
+    app.include_router(MediaEndpoints.router)
+    return TestClient(app)
+
+
+def upload_file(name: str, data: bytes, content_type: str = "image/jpeg") -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename=name, headers=Headers({"content-type": content_type}))
+
+
+def path_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}"
+
+
+def test_provider_interface_is_abstract():
+    with pytest.raises(TypeError):
+        Storage.StorageProvider()
+
+    class Incomplete(Storage.StorageProvider):
+        def sign_path(self, file_path, expires_at):
+            return file_path
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_upload_then_download_with_signed_url(local, media):
+    data = os.urandom(200_000)
+    artifact = asyncio.run(local.upload(upload_file("../My photo.jpg", data)))
+
+    assert artifact.file_path == f"/{artifact.file_id}/My_photo.jpg"
+    assert artifact.file_type == "image"
+    assert local.file_details(artifact.file_id)["metadata"]["size"] == len(data)
+
+    url = local.sign_path(artifact.file_path, int(time.time()) + 60)
+    response = media.get(path_of(url))
+    assert response.status_code == 200
+    assert response.content == data
+
+    partial = media.get(path_of(url), headers={"Range": "bytes=100-199"})
+    assert partial.status_code == 206
+    assert partial.content == data[100:200]
+
+
+def test_bad_signatures_are_refused(local, media):
+    artifact = asyncio.run(local.upload(upload_file("a.jpg", b"data")))
+    expires = int(time.time()) + 60
+    url = path_of(local.sign_path(artifact.file_path, expires))
+
+    assert media.get(url.replace("signature=", "signature=0")).status_code == 403
+    assert media.get(url.replace(str(expires), str(expires + 1))).status_code == 403
+    expired = path_of(local.sign_path(artifact.file_path, int(time.time()) - 1))
+    assert media.get(expired).status_code == 403
+
+
+def test_paths_outside_the_root_are_not_served(local, media, tmp_path):
+    (tmp_path / "secret.txt").write_text("secret")
+
+    assert local.local_path("../secret.txt") is None
+    assert local.local_path("/") is None
+    # Correctly signed, but still outside the media directory
+    expires = int(time.time()) + 60
+    response = media.get("/media/%2E%2E/secret.txt", params={"expires": expires, "signature": local.hmac_sign(f"../secret.txt{expires}")})
+    assert response.status_code in (403, 404)
+    assert response.content != b"secret"
+
+
+def test_direct_upload_with_auth_params(local, media):
+    params = ArtifactProcessing.generate_auth_params()
+    form = {"token": params["token"], "expire": str(params["expire"]), "signature": params["signature"]}
+
+    response = media.post("/media/upload", data=form, files={"file": ("clip.mp4", b"video", "video/mp4")})
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["fileType"] == "video"
+    assert media.get(path_of(body["url"])).content == b"video"
+
+    forged = media.post("/media/upload", data={**form, "signature": "0" * 64}, files={"file": ("a.jpg", b"x", "image/jpeg")})
+    assert forged.status_code == 403
+
+
+def test_failed_uploads_delete_the_other_files(local, monkeypatch):
+    save = local.save
+
+    def failing_save(file):
+        if file.filename == "bad.jpg":
+            raise OSError("disk full")
+        return save(file)
+    monkeypatch.setattr(local, "save", failing_save)
+
+    files = [upload_file("good.jpg", b"good"), upload_file("bad.jpg", b"bad")]
+    with pytest.raises(Storage.UploadError, match="disk full"):
+        asyncio.run(Storage.upload_files(files))
+
+    assert os.listdir(local.root) == []
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+import app.streaming as Streaming
+
+
+@pytest.fixture(autouse=True)
+def small_batches(monkeypatch):
+    # Several batches per page, so streams have several chunks
+    monkeypatch.setattr(Streaming, "STREAM_BATCH_SIZE", 2)
+
+
+def stream(client, stream_format, encoding, **params):
+    response = client.get("/posts", params={"stream": stream_format, **params}, headers={"Accept-Encoding": encoding})
+    assert response.status_code == 200, response.text
+    return response
+
+
+@pytest.mark.parametrize("encoding", ["br", "gzip", "identity"])
+def test_ndjson_stream_is_labelled_and_decodes(client, make_post, encoding):
+    ids = [make_post(title=f"Post {n}")["public_id"] for n in range(5)]
+
+    response = stream(client, "ndjson", encoding, page_size=10)
+
+    assert response.headers.get("content-encoding") == (None if encoding == "identity" else encoding)
+    assert "accept-encoding" in response.headers["vary"].lower()
+    # httpx decodes the body according to Content-Encoding
+    posts = [json.loads(line) for line in response.text.splitlines()]
+    assert [post["public_id"] for post in posts] == list(reversed(ids))
+
+
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+def test_json_stream_matches_the_cursor_page(client, make_post, encoding):
+    for n in range(5):
+        make_post(title=f"Post {n}")
+
+    streamed = stream(client, "json", encoding, page_size=3)
+    page = client.get("/posts", params={"pagination": "cursor", "page_size": 3}).json()
+
+    assert streamed.headers["content-encoding"] == encoding
+    assert streamed.json() == page
+    assert streamed.headers["x-next-cursor"] == page["next_cursor"]
+
+
+def test_ndjson_stream_follows_cursors(client, make_post):
+    ids = [make_post(title=f"Post {n}")["public_id"] for n in range(5)]
+
+    seen = []
+    cursor = None
+    while True:
+        response = stream(client, "ndjson", "br", page_size=2, **({"cursor": cursor} if cursor else {}))
+        seen += [json.loads(line)["public_id"] for line in response.text.splitlines()]
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+
+    assert seen == list(reversed(ids))
+
+
+def test_empty_stream(client):
+    assert stream(client, "ndjson", "br").text == ""
+    assert stream(client, "json", "br").json() == {"posts": [], "next_cursor": None, "page_size": 5}
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+import app.services.posts as Posts
+import app.services.storage as Storage
+
+
+def files(*names):
+    return [("files", (name, f"data of {name}".encode(), "image/jpeg")) for name in names]
+
+
+def test_files_become_artifacts_in_order(client, local):
+    response = client.post("/posts/upload", data={"title": "Trip", "content": "Photos"}, files=files("a.jpg", "b.jpg", "c.jpg"))
+
+    assert response.status_code == 200, response.text
+    artifacts = response.json()["artifacts"]
+    assert [artifact["file_path"].rsplit("/", 1)[1] for artifact in artifacts] == ["a.jpg", "b.jpg", "c.jpg"]
+    for artifact in artifacts:
+        with open(local.local_path(artifact["file_path"]), "rb") as f:
+            assert f.read() == f"data of {artifact['file_path'].rsplit('/', 1)[1]}".encode()
+
+
+def test_post_without_files(client, local):
+    response = client.post("/posts/upload", data={"title": "Just text"})
+
+    assert response.status_code == 200, response.text
+    assert response.json()["artifacts"] == []
+
+
+def test_failed_upload_creates_no_post(client, local, monkeypatch):
+    async def unavailable(file):
+        raise Storage.UploadError(f"Uploading {file.filename!r} failed")
+    monkeypatch.setattr(local, "upload", unavailable)
+
+    response = client.post("/posts/upload", data={"title": "Trip"}, files=files("a.jpg"))
+
+    assert response.status_code == 502
+    assert client.get("/posts", params={"pagination": "cursor"}).json()["posts"] == []
+
+
+def test_files_are_deleted_if_the_post_is_not_created(client, local, monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("database down")
+    monkeypatch.setattr(Posts, "create_post", broken)
+
+    with pytest.raises(RuntimeError):
+        client.post("/posts/upload", data={"title": "Trip"}, files=files("a.jpg", "b.jpg"))
+
+    assert os.listdir(local.root) == []
@@ -0,0 +1,54 @@
+"""
+Runs queued background jobs (see app/services/jobs.py).
+
+Usage:
+    python worker.py                   # poll until interrupted
+    python worker.py --concurrency 4   # four polling threads
+    python worker.py --drain           # run what is queued, then exit
+
+Start as many worker processes as needed: jobs are claimed with SKIP LOCKED,
+so workers never pick up the same job. SIGTERM and Ctrl-C let the current
+batch finish before exiting.
+"""
+import argparse
+import logging
+import signal
+import threading
+
+from app.config.database import SessionLocal
+import app.services.artifacts as Artifacts
+import app.services.jobs as Jobs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=1, help="polling threads in this process")
+    parser.add_argument("--batch-size", type=int, default=Jobs.JOB_BATCH_SIZE, help="jobs claimed per poll")
+    parser.add_argument("--poll-interval", type=float, default=Jobs.JOB_POLL_INTERVAL, help="seconds to wait when the queue is empty")
+    parser.add_argument("--drain", action="store_true", help="exit once the queue is empty")
+    args = parser.parse_args()
+
+    Artifacts.register_handlers()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(threadName)s %(levelname)s %(message)s")
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    threads = [
+        threading.Thread(target=Jobs.run_worker, args=(stop, args.batch_size, args.poll_interval, args.drain), name=f"worker-{n}")
+        for n in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    # Joined with a timeout so the main thread stays responsive to signals
+    while any(thread.is_alive() for thread in threads):
+        for thread in threads:
+            thread.join(timeout=0.5)
+
+    db = SessionLocal()
+    try:
+        logging.info("Stopped; jobs left by status: %s", Jobs.queue_stats(db))
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()